@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# Build benchmark: boilerplate Dockerfile vs the optimized profile
+#
+# Scaffolds one synthetic project per Dockerfile profile (generate.py's
+# DOCKERFILE_PROFILES) with a theme and a plugin under wp-content, then,
+# with the local Docker daemon (BuildKit), measures for each profile:
+#
+#   cold   docker build --no-cache: every layer rebuilt from the base image
+#   warm   rebuild after editing one theme file, with the layer cache; this
+#          is the build every content commit pays
+#   size   size of the resulting image
+#
+# The base image is pulled once up front so neither profile pays for it.
+# --no-cache bypasses the layer cache but not BuildKit cache mounts (as on a
+# CI builder that keeps its cache); --prune also drops the cache mounts
+# before each cold build, which affects every build on the machine.
+#
+# The boilerplate Dockerfile does not build as written (Debian has no
+# `mysql-client` package), so it is benchmarked with the smallest edits that
+# make it build; they are listed in the output.
+# The static analysis from dockerfile_analyzer.py is printed for both
+# profiles, with or without Docker.
+#
+# Usage:
+#   python3 bench_dockerfile.py [--runs N] [--files N] [--prune] [--output bench.json]
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import bench_validator
+import dockerfile_analyzer
+import generate
+import scaffold
+
+DEFAULT_RUNS = 3
+DEFAULT_FILES = 200
+FROM_LINE = re.compile(r'^\s*FROM\s+(?:--\S+\s+)*(\S+)(?:\s+AS\s+(\S+))?', re.M | re.I)
+
+# edits that make the boilerplate buildable: (pattern, replacement, note)
+BUILDABLE_EDITS = (
+    (re.compile(r'^(COPY\s.*?)\s+(?:[0-9]*>\S*|\|\|).*$', re.M), r'\1',
+     'dropped the shell redirect and `|| true` from COPY'),
+    (re.compile(r'(?<![-\w])mysql-client\b'), 'default-mysql-client',
+     'installed default-mysql-client (Debian has no mysql-client package)'),
+)
+
+
+class BenchError(Exception):
+    pass
+
+
+def buildable(text):
+    """(Dockerfile text, [note, ...]) with the edits needed for it to build."""
+    notes = []
+    for pattern, replacement, note in BUILDABLE_EDITS:
+        text, count = pattern.subn(replacement, text)
+        if count:
+            notes.append(note)
+    return text, notes
+
+
+def make_project(root, profile, files):
+    """Scaffold `root` with `profile`'s Dockerfile and a synthetic theme and plugin."""
+    variables = scaffold.site_variables('bench-%s' % profile)
+    rendered = scaffold.render_files(variables, profile=profile)
+    dockerfile, notes = buildable(rendered['Dockerfile'].decode('utf-8'))
+    rendered['Dockerfile'] = dockerfile.encode('utf-8')
+    for rel, data in rendered.items():
+        generate.write_if_changed(os.path.join(root, rel), data)
+    theme = os.path.join(root, 'wp-content', 'themes', 'bench')
+    plugin = os.path.join(root, 'wp-content', 'plugins', 'bench')
+    bench_validator._write(os.path.join(theme, 'style.css'), '/*\nTheme Name: Bench\n*/\n')
+    for i in range(files):
+        target = theme if i % 2 else plugin
+        bench_validator._write(os.path.join(target, 'inc', 'part-%d.php' % i),
+                               '<?php\nfunction bench_%d() { return %d; }\n' % (i, i))
+    return dockerfile, notes
+
+
+def _docker(*args, check=True):
+    proc = subprocess.run(('docker',) + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          env=dict(os.environ, DOCKER_BUILDKIT='1'))
+    if check and proc.returncode != 0:
+        tail = proc.stderr.decode(errors='replace').strip().splitlines()[-5:]
+        raise BenchError('docker %s failed:\n%s' % (args[0], '\n'.join(tail)))
+    return proc.stdout.decode(errors='replace').strip()
+
+
+def base_images(texts):
+    """Images the Dockerfiles build FROM, leaving out their own stage names."""
+    images, stages = set(), set()
+    for text in texts:
+        for image, alias in FROM_LINE.findall(text):
+            images.add(image)
+            if alias:
+                stages.add(alias)
+    return sorted(images - stages)
+
+
+def timed_build(root, tag, no_cache=False):
+    """Seconds for one `docker build` of `root`."""
+    start = time.perf_counter()
+    _docker('build', '-q', '-t', tag, *(('--no-cache',) if no_cache else ()), root)
+    return time.perf_counter() - start
+
+
+def touch_theme(root, run):
+    """Edit a theme file the way a content commit would."""
+    with open(os.path.join(root, 'wp-content', 'themes', 'bench', 'style.css'), 'a', encoding='utf-8') as f:
+        f.write('.edit-%d { color: #%06x; }\n' % (run, run))
+
+
+def bench_profile(root, profile, runs, prune, log=None):
+    tag = 'grw-bench-dockerfile:%s' % profile
+    cold, warm = [], []
+    for _ in range(runs):
+        if prune:
+            _docker('builder', 'prune', '-f', '--filter', 'type=exec.cachemount')
+        cold.append(timed_build(root, tag, no_cache=True))
+    for run in range(runs):
+        touch_theme(root, run)
+        warm.append(timed_build(root, tag))
+    size = int(_docker('image', 'inspect', '--format', '{{.Size}}', tag))
+    layers = len(_docker('history', '-q', tag).split())
+    result = {
+        'cold': bench_validator.summarize([s * 1000 for s in cold]),
+        'warm': bench_validator.summarize([s * 1000 for s in warm]),
+        'image_bytes': size,
+        'image_layers': layers,
+    }
+    if log:
+        log('%-12s cold p50 %7.1f s  warm p50 %7.1f s  image %s (%d layers)' % (
+            profile, result['cold']['p50_ms'] / 1000, result['warm']['p50_ms'] / 1000,
+            _format_mb(size), layers))
+    return result
+
+
+def _format_mb(n):
+    return '%.1f MB' % (n / 1e6)
+
+
+def static_analysis(dockerfiles):
+    """{profile: analyzer summary} of each profile's Dockerfile as written."""
+    report = {}
+    for profile, text in dockerfiles.items():
+        analysis = dockerfile_analyzer.analyze(text)
+        report[profile] = {
+            'layers': analysis.layers,
+            'amplification': round(analysis.amplification, 2),
+            'errors': len(analysis.errors),
+            'warnings': len(analysis.warnings),
+        }
+    return report
+
+
+def format_static(report):
+    lines = ['%-12s %7s %14s %7s %9s' % ('profile', 'layers', 'amplification', 'errors', 'warnings')]
+    for profile, row in report.items():
+        lines.append('%-12s %7d %13.1f× %7d %9d' % (
+            profile, row['layers'], row['amplification'], row['errors'], row['warnings']))
+    return '\n'.join(lines)
+
+
+def format_comparison(results, baseline='boilerplate'):
+    base = results.get(baseline)
+    if not base:
+        return ''
+    lines = []
+    for profile, row in results.items():
+        if profile == baseline:
+            continue
+        for key in ('cold', 'warm'):
+            ratio = row[key]['p50_ms'] / base[key]['p50_ms'] if base[key]['p50_ms'] else 0
+            lines.append('%s %s build: %.1f s -> %.1f s (%+.0f%%)' % (
+                profile, key, base[key]['p50_ms'] / 1000, row[key]['p50_ms'] / 1000, (ratio - 1) * 100))
+        lines.append('%s image: %s -> %s (%+.0f%%)' % (
+            profile, _format_mb(base['image_bytes']), _format_mb(row['image_bytes']),
+            (row['image_bytes'] / float(base['image_bytes']) - 1) * 100))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare Docker build times and image size per Dockerfile profile.')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='builds per measurement (default: 3)')
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES,
+                        help='synthetic theme/plugin files (default: %d)' % DEFAULT_FILES)
+    parser.add_argument('--profiles', default=','.join(generate.DOCKERFILE_PROFILES),
+                        help='comma-separated Dockerfile profiles to build')
+    parser.add_argument('--prune', action='store_true',
+                        help='drop BuildKit cache mounts before each cold build (machine-wide)')
+    parser.add_argument('--output', metavar='FILE', help='write results JSON here')
+    args = parser.parse_args(argv)
+
+    profiles = [p.strip() for p in args.profiles.split(',') if p.strip()]
+    unknown = set(profiles) - set(generate.DOCKERFILE_PROFILES)
+    if unknown:
+        parser.error('unknown profile(s): %s' % ', '.join(sorted(unknown)))
+
+    templates = generate.Templates()
+    written = {p: templates.render(generate.DOCKERFILE_PROFILES[p]) for p in profiles}
+    static = static_analysis(written)
+    print(format_static(static))
+    print()
+
+    if not shutil.which('docker'):
+        print('❌ docker not found; build timings need a local Docker daemon with BuildKit', file=sys.stderr)
+        return 2
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='grw-bench-docker-') as tmp:
+        try:
+            for image in base_images(written.values()):
+                _docker('pull', '-q', image)
+            for profile in profiles:
+                root = os.path.join(tmp, profile)
+                _, notes = make_project(root, profile, args.files)
+                for note in notes:
+                    print('⚠️ %s: %s' % (profile, note))
+                results[profile] = bench_profile(root, profile, args.runs, args.prune,
+                                                 log=lambda line: print(line, flush=True))
+        except BenchError as e:
+            print('❌ %s' % e, file=sys.stderr)
+            return 1
+
+    comparison = format_comparison(results)
+    if comparison:
+        print()
+        print(comparison)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'docker': _docker('version', '--format', '{{.Server.Version}}', check=False),
+                    'runs': args.runs,
+                    'files': args.files,
+                    'pruned_cache_mounts': args.prune,
+                    'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                },
+                'static': static,
+                'results': results,
+            }, f, indent=2)
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
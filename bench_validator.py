@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# Benchmark suite for the setup validator
+#
+# Generates synthetic projects in a temporary directory and times each
+# validator over repeated cold and warm runs:
+#
+#   minimal    the five required files only
+#   realistic  the boilerplate plus a few themes and plugins
+#   large      a wp-content tree with many themes and plugins
+#   fleet      many realistic projects validated in one go
+#
+# Tools timed per scenario:
+#   shell      bash validate-setup.sh (one run per project)
+#   py-cli     python3 validate_setup.py as a subprocess (includes interpreter start)
+#   py         validate_setup.validate() in-process
+#   fleet      validate_fleet.run_fleet() over the whole fleet (fleet scenario only)
+#
+# "cold" runs start without a result cache, "warm" runs reuse the cache the
+# previous run left behind. Results are written as JSON with p50/p95 per
+# scenario/tool/mode; --compare flags regressions against a stored baseline.
+#
+# Usage:
+#   python3 bench_validator.py [--runs N] [--scenarios minimal,large] [--output bench.json]
+#   python3 bench_validator.py --compare baseline.json [--threshold 0.2]
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import generate
+import scaffold
+import validate_cache
+import validate_fleet
+import validate_setup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SHELL_VALIDATOR = os.path.join(HERE, 'validate-setup.sh')
+PY_VALIDATOR = os.path.join(HERE, 'validate_setup.py')
+
+SCENARIOS = ('minimal', 'realistic', 'large', 'fleet')
+DEFAULT_RUNS = 10
+DEFAULT_FLEET_SIZE = 50
+DEFAULT_THRESHOLD = 0.20
+
+
+def boilerplate_files():
+    """{path: content} of the boilerplate, exactly as scaffold.py writes it for the demo site."""
+    rendered = scaffold.render_files(scaffold.site_variables(generate.DEFAULTS['site']))
+    return {rel: data.decode('utf-8') for rel, data in rendered.items()}
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def make_project(root, kind, files):
+    """Materialize one synthetic project of `kind` under `root`."""
+    for rel, content in files.items():
+        if kind != 'minimal' or rel in validate_setup.REQUIRED_FILES:
+            _write(os.path.join(root, rel), content)
+    if kind == 'minimal':
+        return
+    themes, plugins, per_dir = (2, 3, 8) if kind == 'realistic' else (40, 120, 60)
+    php = '<?php\n// synthetic file %d\nfunction f_%d() { return %d; }\n'
+    css = '/* synthetic */\n.c%d { margin: %dpx; }\n'
+    for t in range(themes):
+        base = os.path.join(root, 'wp-content', 'themes', 'theme-%d' % t)
+        _write(os.path.join(base, 'style.css'), '/*\nTheme Name: Theme %d\n*/\n' % t)
+        for i in range(per_dir):
+            _write(os.path.join(base, 'inc', 'part-%d.php' % i), php % (i, i, i))
+            _write(os.path.join(base, 'css', 'part-%d.css' % i), css % (i, i))
+    for p in range(plugins):
+        base = os.path.join(root, 'wp-content', 'plugins', 'plugin-%d' % p)
+        _write(os.path.join(base, 'plugin-%d.php' % p), '<?php\n/* Plugin Name: Plugin %d */\n' % p)
+        for i in range(per_dir):
+            _write(os.path.join(base, 'includes', 'class-%d.php' % i), php % (i, i, i))
+
+
+def make_git(root):
+    """Turn `root` into a git checkout on main with an origin remote (no history)."""
+    subprocess.run(['git', 'init', '-q', '-b', 'main', root], check=True)
+    subprocess.run(['git', '-C', root, 'remote', 'add', 'origin',
+                    'https://github.com/example/wordpress-render-demo.git'], check=True)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, int(math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    return {
+        'runs': len(samples),
+        'min_ms': round(min(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+    }
+
+
+def clear_caches(roots):
+    for root in roots:
+        shutil.rmtree(os.path.join(root, validate_cache.CACHE_DIR), ignore_errors=True)
+
+
+def time_runs(run, roots, runs, mode):
+    """Milliseconds per call of run(); cold mode clears result caches before each call."""
+    samples = []
+    if mode == 'warm':
+        run()  # populate the cache
+    for _ in range(runs):
+        if mode == 'cold':
+            clear_caches(roots)
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _quiet(cmd, cwd):
+    subprocess.run(cmd, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def tools_for(scenario, roots, shell):
+    """{tool: callable} validating every root once."""
+    tools = {}
+    if shell and shutil.which('bash'):
+        tools['shell'] = lambda: [_quiet(['bash', SHELL_VALIDATOR], r) for r in roots]
+    if scenario != 'fleet':
+        tools['py-cli'] = lambda: [_quiet([sys.executable, PY_VALIDATOR, r], r) for r in roots]
+        tools['py'] = lambda: [validate_setup.validate(r, cache=True) for r in roots]
+    else:
+        tools['fleet'] = lambda: list(validate_fleet.run_fleet(roots))
+    return tools
+
+
+def run_benchmarks(scenarios, runs, fleet_size, shell=True, log=None):
+    files = boilerplate_files()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='grw-bench-') as tmp:
+        for scenario in scenarios:
+            if scenario == 'fleet':
+                roots = [os.path.join(tmp, 'fleet', 'site-%03d' % i) for i in range(fleet_size)]
+                for root in roots:
+                    make_project(root, 'realistic', files)
+                    make_git(root)
+            else:
+                roots = [os.path.join(tmp, scenario)]
+                make_project(roots[0], scenario, files)
+                make_git(roots[0])
+            for tool, run in tools_for(scenario, roots, shell).items():
+                # the shell validator has no cache, so cold and warm are the same
+                for mode in (('cold',) if tool == 'shell' else ('cold', 'warm')):
+                    stats = summarize(time_runs(run, roots, runs, mode))
+                    results['%s/%s/%s' % (scenario, tool, mode)] = stats
+                    if log:
+                        log('%-28s p50 %9.2f ms  p95 %9.2f ms' % (
+                            '%s/%s/%s' % (scenario, tool, mode), stats['p50_ms'], stats['p95_ms']))
+    return {
+        'meta': {
+            'validator_version': validate_setup.VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'runs': runs,
+            'fleet_size': fleet_size,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """[(key, baseline_p50, current_p50, ratio, regressed)] for keys present in both."""
+    rows = []
+    for key, stats in sorted(current['results'].items()):
+        base = baseline.get('results', {}).get(key)
+        if not base or not base.get('p50_ms'):
+            continue
+        ratio = stats['p50_ms'] / base['p50_ms']
+        rows.append((key, base['p50_ms'], stats['p50_ms'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_comparison(rows, threshold):
+    lines = ['%-28s %12s %12s %8s' % ('benchmark', 'baseline p50', 'current p50', 'change')]
+    for key, base, cur, ratio, regressed in rows:
+        lines.append('%-28s %9.2f ms %9.2f ms %+7.1f%%%s' % (
+            key, base, cur, (ratio - 1) * 100, '  ❌ REGRESSION' if regressed else ''))
+    regressions = sum(1 for row in rows if row[4])
+    if regressions:
+        lines.append('❌ %d regression%s beyond +%d%%' % (
+            regressions, '' if regressions == 1 else 's', threshold * 100))
+    else:
+        lines.append('✅ No regressions beyond +%d%%' % (threshold * 100))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the setup validators.')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='timed runs per benchmark')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='comma-separated subset of: %s' % ', '.join(SCENARIOS))
+    parser.add_argument('--fleet-size', type=int, default=DEFAULT_FLEET_SIZE)
+    parser.add_argument('--no-shell', dest='shell', action='store_false',
+                        help='skip timing validate-setup.sh')
+    parser.add_argument('--output', metavar='FILE', help='write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare p50s with a stored results JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative p50 slowdown counted as a regression (default: 0.20)')
+    args = parser.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error('unknown scenario(s): %s' % ', '.join(sorted(unknown)))
+
+    current = run_benchmarks(scenarios, args.runs, args.fleet_size, args.shell,
+                             log=lambda line: print(line, flush=True))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare(current, baseline, args.threshold)
+        print()
+        print(format_comparison(rows, args.threshold))
+        return 1 if any(row[4] for row in rows) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
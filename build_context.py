@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# Docker build-context size scanner
+#
+# Render clones the repository and sends it to the Docker daemon as the
+# build context, so a file ends up in the context when git tracks it (it is
+# not matched by .gitignore) and .dockerignore does not exclude it. This
+# walks the project with os.scandir on a thread pool, applies both ignore
+# files through matchers compiled to regular expressions once, and reports
+# the context size and the biggest files and directories in it.
+#
+# The .git directory is never counted. Nested .gitignore files apply to
+# their own subtree, as in git.
+#
+# Usage:
+#   python3 build_context.py [PROJECT_DIR] [--budget 50MB] [--top N]
+
+import argparse
+import heapq
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BUDGET = 50 * 1024 * 1024
+DEFAULT_TOP = 10
+
+_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'KIB': 1024, 'M': 1024 ** 2, 'MB': 1024 ** 2,
+          'MIB': 1024 ** 2, 'G': 1024 ** 3, 'GB': 1024 ** 3, 'GIB': 1024 ** 3}
+
+
+def parse_size(text):
+    """'50MB', '1.5G', '2048' -> bytes (binary units)."""
+    match = re.match(r'^\s*([0-9]*\.?[0-9]+)\s*([A-Za-z]*)\s*$', str(text))
+    if not match or match.group(2).upper() not in _UNITS:
+        raise ValueError('invalid size %r' % text)
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def format_size(n):
+    for unit in ('B', 'KiB', 'MiB'):
+        if n < 1024:
+            return '%d %s' % (n, unit) if unit == 'B' else '%.1f %s' % (n, unit)
+        n /= 1024.0
+    return '%.2f GiB' % n
+
+
+def _glob_to_regex(pattern):
+    """Translate one glob (no leading/trailing slash handling) to a regex body."""
+    out, i, n = [], 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 2] == '**':
+                # '**/' matches zero or more directories, a trailing '**' everything
+                if pattern[i:i + 3] == '**/':
+                    out.append('(?:.*/)?')
+                    i += 3
+                else:
+                    out.append('.*')
+                    i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', '^') else i + 1)
+            if j == -1:
+                out.append(r'\[')
+            else:
+                body = pattern[i + 1:j]
+                if body[:1] in ('!', '^'):
+                    body = '^' + body[1:]
+                out.append('[%s]' % body.replace('\\', '\\\\'))
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreMatcher:
+    """Compiled ignore rules; last matching pattern wins, `!` re-includes.
+
+    flavor='git': patterns without an inner slash match at any depth, and a
+    file inside an excluded directory can never be re-included.
+    flavor='docker': patterns are anchored at the context root and also
+    exclude everything below a matching directory.
+    """
+
+    def __init__(self, lines, flavor='git'):
+        self.flavor = flavor
+        self.rules = []   # (regex, negate, dir_only)
+        for line in lines:
+            rule = self._compile(line)
+            if rule is not None:
+                self.rules.append(rule)
+        self.has_negation = any(neg for _, neg, _ in self.rules)
+        # Without negations the answer is "does any rule match", so all rules
+        # collapse into two alternations (files and directories).
+        if not self.has_negation:
+            any_rules = [r.pattern for r, _, dir_only in self.rules if not dir_only]
+            dir_rules = [r.pattern for r, _, _ in self.rules]
+            self._files = re.compile('|'.join(any_rules)) if any_rules else None
+            self._dirs = re.compile('|'.join(dir_rules)) if dir_rules else None
+
+    def _compile(self, line):
+        line = line.rstrip('\n')
+        if self.flavor == 'git':
+            # trailing unescaped spaces are ignored
+            line = re.sub(r'(?<!\\) +$', '', line)
+        else:
+            line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith('\\'):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+
+        if self.flavor == 'docker':
+            line = os.path.normpath(line).replace(os.sep, '/').lstrip('/')
+            if line == '.':
+                return None
+            # a matching directory excludes its whole subtree
+            body = '^%s(?:/.*)?$' % _glob_to_regex(line)
+            dir_only = False
+        else:
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                return None
+            body = _glob_to_regex(line)
+            body = ('^%s$' if anchored else '^(?:.*/)?%s$') % body
+        return re.compile(body), negate, dir_only
+
+    def decide(self, rel, is_dir=False):
+        """True (ignored), False (re-included by `!`) or None (no rule matched)."""
+        if not self.has_negation:
+            regex = self._dirs if is_dir else self._files
+            return True if regex and regex.match(rel) else None
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                result = not negate
+        return result
+
+    def ignored(self, rel, is_dir=False):
+        return bool(self.decide(rel, is_dir))
+
+    def may_reinclude(self):
+        """Whether a directory excluded by these rules must still be walked."""
+        return self.flavor == 'docker' and self.has_negation
+
+
+def _git_ignored(chain, rel, is_dir):
+    """Apply .gitignore matchers from the root down; a deeper decision wins."""
+    result = False
+    for prefix, matcher in chain:
+        decision = matcher.decide(rel[len(prefix):] if prefix else rel, is_dir)
+        if decision is not None:
+            result = decision
+    return result
+
+
+def _read_lines(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+class ContextReport:
+    def __init__(self, root, total, files, excluded, top_files, top_dirs, budget, dir_sizes=None):
+        self.root = root
+        self.total = total
+        self.files = files
+        self.excluded = excluded
+        self.top_files = top_files     # [(size, rel), ...] largest first
+        self.top_dirs = top_dirs       # [(size, rel), ...] largest first
+        self.budget = budget
+        self.dir_sizes = dir_sizes or {}   # {rel dir: bytes in the context under it}
+
+    def size_of(self, rel):
+        """Bytes of the context under `rel` (a file, a directory or '.'); None for globs or missing paths."""
+        rel = os.path.normpath(rel.lstrip('/')).replace(os.sep, '/')
+        if rel == '.':
+            return self.total
+        if rel in self.dir_sizes:
+            return self.dir_sizes[rel]
+        path = os.path.join(self.root, rel)
+        if os.path.isdir(path):
+            return 0    # nothing in it is in the context
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return None
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.total > self.budget
+
+
+def scan(root='.', budget=DEFAULT_BUDGET, top=DEFAULT_TOP, workers=None):
+    """Walk `root` and measure what a Docker build of it would send as context."""
+    docker = IgnoreMatcher(_read_lines(os.path.join(root, '.dockerignore')), 'docker')
+
+    lock = threading.Lock()
+    totals = {'bytes': 0, 'files': 0, 'excluded': 0}
+    dir_sizes = {}
+    biggest = []  # min-heap of (size, rel), bounded to `top`
+
+    def scan_dir(rel_dir, chain):
+        """Scan one directory; returns (subdirectory, gitignore chain) pairs still to walk."""
+        subdirs, size, count, excluded, local_big = [], 0, 0, 0, []
+        path = os.path.join(root, rel_dir) if rel_dir else root
+        lines = _read_lines(os.path.join(path, '.gitignore'))
+        if lines:
+            chain = chain + ((rel_dir + '/' if rel_dir else '', IgnoreMatcher(lines, 'git')),)
+        try:
+            it = os.scandir(path)
+        except OSError:
+            return subdirs
+        with it:
+            for entry in it:
+                rel = rel_dir + '/' + entry.name if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    if rel == '.git':
+                        continue
+                    if _git_ignored(chain, rel, True):
+                        excluded += 1
+                        continue
+                    if docker.ignored(rel, True) and not docker.may_reinclude():
+                        excluded += 1
+                        continue
+                    subdirs.append((rel, chain))
+                    continue
+                if _git_ignored(chain, rel, False) or docker.ignored(rel):
+                    excluded += 1
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                size += st.st_size
+                count += 1
+                if len(local_big) < top:
+                    heapq.heappush(local_big, (st.st_size, rel))
+                elif st.st_size > local_big[0][0]:
+                    heapq.heapreplace(local_big, (st.st_size, rel))
+        with lock:
+            totals['bytes'] += size
+            totals['files'] += count
+            totals['excluded'] += excluded
+            parent = rel_dir
+            while parent:
+                dir_sizes[parent] = dir_sizes.get(parent, 0) + size
+                parent = parent.rpartition('/')[0]
+            for item in local_big:
+                if len(biggest) < top:
+                    heapq.heappush(biggest, item)
+                elif item[0] > biggest[0][0]:
+                    heapq.heapreplace(biggest, item)
+        return subdirs
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) * 4)) as pool:
+        pending = [pool.submit(scan_dir, '', ())]
+        while pending:
+            future = pending.pop()
+            pending.extend(pool.submit(scan_dir, d, chain) for d, chain in future.result())
+
+    # Report the largest directories, skipping a parent whose size is almost
+    # entirely one child that is reported anyway.
+    dirs = sorted(((s, d) for d, s in dir_sizes.items() if s), reverse=True)
+    top_dirs = []
+    for size, d in dirs:
+        if len(top_dirs) >= top:
+            break
+        if any(c.startswith(d + '/') and cs >= size * 0.9 for cs, c in dirs):
+            continue
+        top_dirs.append((size, d))
+
+    return ContextReport(root, totals['bytes'], totals['files'], totals['excluded'],
+                         sorted(biggest, reverse=True), top_dirs, budget, dir_sizes)
+
+
+def format_context(report):
+    lines = ['Build context: %s in %d files (%d paths excluded by .gitignore/.dockerignore)' % (
+        format_size(report.total), report.files, report.excluded)]
+    if report.top_dirs:
+        lines.append('Largest directories:')
+        lines += ['  %10s  %s/' % (format_size(s), d) for s, d in report.top_dirs]
+    if report.top_files:
+        lines.append('Largest files:')
+        lines += ['  %10s  %s' % (format_size(s), f) for s, f in report.top_files]
+    if report.budget is not None:
+        if report.over_budget:
+            lines.append('❌ Build context exceeds budget of %s' % format_size(report.budget))
+        else:
+            lines.append('✅ Build context within budget of %s' % format_size(report.budget))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the Docker build context of a project.')
+    parser.add_argument('root', nargs='?', default='.')
+    parser.add_argument('--budget', type=parse_size, default=DEFAULT_BUDGET,
+                        help='fail above this size, e.g. 50MB (default: 50MB)')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='offenders to list')
+    args = parser.parse_args(argv)
+    report = scan(args.root, args.budget, args.top)
+    print(format_context(report))
+    return 1 if report.over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,32 @@
 
-import plotly.graph_objects as go
+# Architecture diagram for the WordPress-Render-GitHub integration.
+# Rendered to SVG by diagram_svg.py (no plotly/kaleido, no browser); PNG
+# and PDF are only produced on request (--png, --formats) and need
+# cairosvg or rsvg-convert. All outputs of a run are exported in one batch
+# (diagram_export.ExportSession); --timings shows the time per figure.
+#
+# With --from, the diagram is instead derived from each project's
+# render.yaml and deploy workflow (topology.py) and written into the
+# project; renders are cached by topology hash and shared across projects.
+#
+# With --timeline, it draws deploy-timeline.svg from recorded deploy phase
+# timings (deploy_timings.py): a Gantt chart of the latest deploys and
+# p50/p95 trends per phase, aggregated while streaming the store.
+#
+# Usage:
+#   python3 chart_script.py [--png] [--formats svg,png,pdf] [--out-dir DIR]
+#   python3 chart_script.py --from PROJECT_DIR [PROJECT_DIR ...] [--png] [--jobs N] [--timings]
+#   python3 chart_script.py --timeline deploy-timings.jsonl [--window day] [--out-dir DIR]
+
+import argparse
+import os
+import sys
+import time
+
+import deploy_timings
+import diagram_export
+import diagram_svg
+import topology
 
 # Define component positions (x, y coordinates)
 positions = {
@@ -33,79 +60,76 @@ components = {
     'Users': {'label': 'Internet<br>Users', 'color': '#964325'}
 }
 
-fig = go.Figure()
+TITLE = 'WordPress-Render-GitHub Integration'
+X_RANGE = (-0.5, 6.5)
+Y_RANGE = (0.5, 5.5)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the architecture diagram.')
+    parser.add_argument('--png', action='store_true', help='also write architecture.png')
+    parser.add_argument('--formats', default='svg',
+                        help='comma-separated output formats: %s (default: svg)' % ', '.join(diagram_export.FORMATS))
+    parser.add_argument('--out-dir', default='.', help='where to write the images (default: .)')
+    parser.add_argument('--from', dest='projects', nargs='+', metavar='PROJECT_DIR',
+                        help="derive the diagram from each project's render.yaml and workflow")
+    parser.add_argument('--timeline', metavar='STORE',
+                        help='draw deploy-timeline.svg from a deploy timing store (JSON Lines)')
+    parser.add_argument('--window', choices=sorted(deploy_timings.WINDOWS), default='day',
+                        help='trend granularity for --timeline (default: day)')
+    parser.add_argument('--cache-dir', help='topology render cache (default: %s)' % topology.default_cache_dir())
+    parser.add_argument('-j', '--jobs', type=int, default=diagram_export.DEFAULT_WORKERS,
+                        help='export worker processes for PNG/PDF (default: %d)' % diagram_export.DEFAULT_WORKERS)
+    parser.add_argument('--timings', action='store_true', help='print the export time of every output')
+    args = parser.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    if args.png and 'png' not in formats:
+        formats.append('png')
+    unknown = set(formats) - set(diagram_export.FORMATS)
+    if unknown:
+        parser.error('unknown format(s): %s' % ', '.join(sorted(unknown)))
 
-# Add arrows (edges)
-for start, end, label in connections:
-    x0, y0 = positions[start]
-    x1, y1 = positions[end]
-    
-    # Add arrow line
-    fig.add_trace(go.Scatter(
-        x=[x0, x1],
-        y=[y0, y1],
-        mode='lines',
-        line=dict(color='#333333', width=2),
-        hoverinfo='skip',
-        showlegend=False
-    ))
-    
-    # Add arrowhead
-    fig.add_annotation(
-        x=x1, y=y1,
-        ax=x0, ay=y0,
-        xref='x', yref='y',
-        axref='x', ayref='y',
-        showarrow=True,
-        arrowhead=2,
-        arrowsize=1.5,
-        arrowwidth=2,
-        arrowcolor='#333333',
-        text=''
-    )
-    
-    # Add label on arrow
-    mid_x, mid_y = (x0 + x1) / 2, (y0 + y1) / 2
-    fig.add_annotation(
-        x=mid_x, y=mid_y,
-        text=label,
-        showarrow=False,
-        font=dict(size=10, color='#13343b'),
-        bgcolor='rgba(243, 243, 238, 0.9)',
-        bordercolor='#21808d',
-        borderwidth=1,
-        borderpad=4
-    )
+    start = time.perf_counter()
+    figures = []  # (output path without extension, svg, note)
+    if args.timeline:
+        errors = {}
+        try:
+            agg = deploy_timings.aggregate(deploy_timings.iter_records(args.timeline, errors), args.window)
+        except OSError as e:
+            print('❌ %s: %s' % (args.timeline, e.strerror), file=sys.stderr)
+            return 2
+        if errors.get('bad'):
+            print('⚠️ skipped %d malformed line(s) in %s' % (errors['bad'], args.timeline), file=sys.stderr)
+        figures.append((os.path.join(args.out_dir, 'deploy-timeline'),
+                        deploy_timings.render_timeline_svg(agg), ' (%d deploys)' % agg.records))
+    elif not args.projects:
+        svg = diagram_svg.render_svg(positions, connections, components, TITLE, X_RANGE, Y_RANGE)
+        figures.append((os.path.join(args.out_dir, 'architecture'), svg, ''))
+    else:
+        for root in args.projects:
+            svg, digest, cached = topology.project_diagram(root, args.cache_dir, TITLE)
+            figures.append((os.path.join(root, 'architecture'), svg, ' (topology %s, %s)' % (
+                digest[:12], 'cached' if cached else 'rendered')))
 
-# Add nodes (components)
-for comp_name, details in components.items():
-    x, y = positions[comp_name]
-    
-    # Add node shape
-    fig.add_trace(go.Scatter(
-        x=[x],
-        y=[y],
-        mode='markers+text',
-        marker=dict(size=60, color=details['color'], line=dict(color='#13343b', width=2)),
-        text=details['label'],
-        textposition='middle center',
-        textfont=dict(size=11, color='#13343b', family='Arial Black'),
-        hoverinfo='text',
-        hovertext=comp_name,
-        showlegend=False
-    ))
+    with diagram_export.ExportSession(workers=args.jobs) as session:
+        for base, svg, _ in figures:
+            session.submit(svg, base, formats)
+    notes = {base: note for base, _, note in figures}
 
-# Update layout
-fig.update_layout(
-    title='WordPress-Render-GitHub Integration',
-    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[-0.5, 6.5]),
-    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False, range=[0.5, 5.5]),
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='#F3F3EE'
-)
+    failed = [r for r in session.results if r.error]
+    if args.timings:
+        print(diagram_export.format_results(session.results, session.startup))
+    else:
+        for r in session.results:
+            if r.error:
+                print('❌ %s: %s' % (r.path, r.error), file=sys.stderr)
+            else:
+                print('%s %s%s' % ('✅ wrote' if r.written else '·  unchanged', r.path, notes[r.figure]))
+    print('%d figure%s exported in %.1f ms' % (
+        len(figures), '' if len(figures) == 1 else 's', (time.perf_counter() - start) * 1000))
+    return 1 if failed else 0
 
-fig.update_traces(cliponaxis=False)
 
-# Save the figure
-fig.write_image('architecture.png')
-fig.write_image('architecture.svg', format='svg')
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+# Local stand-in for Apache serving a WordPress page, with and without the
+# HTTP delivery profile (templates/files/apache-delivery.conf)
+#
+# Reads the rendered profile and applies what it configures: compressed
+# types and encodings, ExpiresByType lifetimes, the Cache-Control set for
+# hashed file names and ?ver= URLs, and the If-None-Match edit that lets
+# compressed responses revalidate. "stock" is Apache's default: ETag
+# and Last-Modified, nothing else. A sample page (theme and core CSS/JS with
+# ?ver=, a font, uploads) is served from 127.0.0.1 to a browser model with
+# an HTTP cache (max-age, Expires, heuristic freshness of 10% of the age
+# since Last-Modified, conditional requests) over three visits:
+#
+#   first visit     empty cache
+#   next day        same browser, one day later
+#   theme update    a day after that, style.css edited and its ?ver bumped
+#
+# and reports the responses and bytes transferred (status line, headers,
+# body) per visit. Fails unless the profile transfers fewer bytes on the
+# first visit, sends fewer requests on later visits, refetches only the
+# updated asset after the theme update, answers a revalidated compressed
+# asset with a 304, and keeps `immutable` to hashed file names (?ver= URLs
+# get a bounded max-age, since themes do not always bump the version). Brotli is measured when the `brotli` module
+# is installed; otherwise the gzip fallback is.
+#
+# Usage:
+#   python3 delivery_standin.py [--conf apache-delivery.conf]     run the checks
+#   python3 delivery_standin.py --serve [--stock] [--port 8080]   just serve
+
+import argparse
+import email.utils
+import gzip
+import http.client
+import mimetypes
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import generate
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CONF_TEMPLATE = 'files/apache-delivery.conf'
+DAY = 86400
+HEURISTIC = 0.1     # share of the age since Last-Modified browsers treat as fresh
+GZIP_LEVEL = 6      # mod_deflate's default
+ACCEPT = 'br, gzip' if brotli else 'gzip'
+
+UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': DAY, 'week': 7 * DAY,
+         'month': 30 * DAY, 'year': 365 * DAY}
+FILTER_LINE = re.compile(r'^\s*AddOutputFilterByType\s+(\S+)\s+(.+)$')
+EXPIRES_LINE = re.compile(r'^\s*ExpiresByType\s+(\S+)\s+"access plus (\d+) (\w+?)s?"\s*$')
+FILES_MATCH = re.compile(r'^\s*<FilesMatch\s+"(.+)">\s*$')
+IF_LINE = re.compile(r'^\s*<(?:Else)?If\s+"(.+)">\s*$')
+IF_TEST = re.compile(r'%\{(QUERY_STRING|REQUEST_URI)\}\s*=~\s*/(.+?)/(?=\s|$)')
+CACHE_CONTROL = re.compile(r'^\s*Header\s+set\s+Cache-Control\s+"(.+)"\s*$')
+ETAG_EDIT = re.compile(r'^\s*RequestHeader\s+edit\s+"If-None-Match"\s+"((?:[^"\\]|\\.)*)"\s+"((?:[^"\\]|\\.)*)"')
+BROTLI_QUALITY = re.compile(r'^\s*BrotliCompressionQuality\s+(\d+)')
+LINK = re.compile(r'(?:href|src)="(/[^"]+)"')
+
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('application/javascript', '.js')
+
+
+class Policy:
+    """What an Apache delivery config does to a response; empty = stock Apache."""
+
+    def __init__(self):
+        self.compress = set()          # content types run through the filters
+        self.encodings = []            # in preference order, e.g. ['br', 'gzip']
+        self.brotli_quality = 11       # mod_brotli's default
+        self.expires = {}              # content type -> seconds
+        self.assets = None             # FilesMatch regex the versioned rules sit in
+        self.versioned = []            # <If>/<ElseIf> in order: ([(QUERY_STRING|REQUEST_URI, regex)],
+                                       # Cache-Control); any test matches a rule, the first rule wins
+        self.etag_edit = None          # (regex, replacement) for If-None-Match
+
+    @classmethod
+    def from_conf(cls, text):
+        policy = cls()
+        for line in text.splitlines():
+            match = FILTER_LINE.match(line)
+            if match:
+                for name in match.group(1).split(';'):
+                    encoding = {'BROTLI_COMPRESS': 'br', 'DEFLATE': 'gzip'}.get(name.upper())
+                    if encoding and encoding not in policy.encodings:
+                        policy.encodings.append(encoding)
+                policy.compress.update(match.group(2).split())
+                continue
+            match = EXPIRES_LINE.match(line)
+            if match and match.group(3) in UNITS:
+                policy.expires[match.group(1)] = int(match.group(2)) * UNITS[match.group(3)]
+                continue
+            match = BROTLI_QUALITY.match(line)
+            if match:
+                policy.brotli_quality = int(match.group(1))
+                continue
+            match = FILES_MATCH.match(line)
+            if match:
+                policy.assets = re.compile(match.group(1))
+                continue
+            match = IF_LINE.match(line)
+            if match:
+                tests = [(var, re.compile(rx)) for var, rx in IF_TEST.findall(match.group(1))]
+                policy.versioned.append((tests, None))
+                continue
+            match = CACHE_CONTROL.match(line)
+            if match and policy.versioned and policy.versioned[-1][1] is None:
+                policy.versioned[-1] = (policy.versioned[-1][0], match.group(1))
+                continue
+            match = ETAG_EDIT.match(line)
+            if match:
+                pattern, replacement = (g.replace('\\"', '"') for g in match.groups())
+                policy.etag_edit = (re.compile(pattern), re.sub(r'\$(\d)', r'\\\1', replacement))
+        if 'br' in policy.encodings and brotli is None:
+            policy.encodings.remove('br')
+        return policy
+
+    def encoding(self, content_type, accept):
+        if content_type not in self.compress:
+            return None
+        accepted = {part.split(';')[0].strip() for part in (accept or '').split(',')}
+        return next((e for e in self.encodings if e in accepted), None)
+
+    def version_control(self, path, query):
+        """Cache-Control of the first versioned rule the URL matches, or None."""
+        if not (self.assets and self.assets.search(path)):
+            return None
+        values = {'QUERY_STRING': query, 'REQUEST_URI': path}
+        for tests, cache_control in self.versioned:
+            if cache_control and any(rx.search(values[var]) for var, rx in tests):
+                return cache_control
+        return None
+
+    def cache_headers(self, path, query, content_type, now):
+        cache_control = self.version_control(path, query)
+        if cache_control:
+            return [('Cache-Control', cache_control)]
+        seconds = self.expires.get(content_type)
+        if seconds is None:
+            return []
+        return [('Cache-Control', 'max-age=%d' % seconds),
+                ('Expires', email.utils.formatdate(now + seconds, usegmt=True))]
+
+    def if_none_match(self, value):
+        if value and self.etag_edit:
+            return self.etag_edit[0].sub(self.etag_edit[1], value)
+        return value
+
+
+def compress(data, encoding, policy):
+    if encoding == 'br':
+        return brotli.compress(data, quality=policy.brotli_quality)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+
+class Site(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, docroot, policy, port=0):
+        super().__init__(('127.0.0.1', port), Handler)
+        self.docroot = docroot
+        self.policy = policy
+
+    @property
+    def base(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        path = urllib.parse.unquote(url.path)
+        full = os.path.normpath(os.path.join(server.docroot, (path.strip('/') or 'index.html')))
+        if not full.startswith(server.docroot) or not os.path.isfile(full):
+            return self._send(404, b'not found', [('Content-Type', 'text/plain')])
+        with open(full, 'rb') as f:
+            data = f.read()
+        content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+        now = time.time()
+        headers = [('Content-Type', content_type)]
+        # .html stands in for PHP output: no validators, no cache headers
+        etag = None
+        if not full.endswith('.html'):
+            st = os.stat(full)
+            etag = '"%x-%x"' % (st.st_size, int(st.st_mtime * 1e6))
+            headers.append(('Last-Modified', email.utils.formatdate(st.st_mtime, usegmt=True)))
+            headers += server.policy.cache_headers(path, url.query, content_type, now)
+        encoding = server.policy.encoding(content_type, self.headers.get('Accept-Encoding'))
+        if content_type in server.policy.compress:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if etag:
+            # like mod_deflate/mod_brotli: compressed variants get a suffixed ETag
+            headers.append(('ETag', etag[:-1] + '-%s"' % encoding if encoding else etag))
+            wanted = server.policy.if_none_match(self.headers.get('If-None-Match'))
+            if wanted and etag in [t.strip() for t in wanted.split(',')]:
+                return self._send(304, b'', headers)
+        if encoding:
+            data = compress(data, encoding, server.policy)
+            headers.append(('Content-Encoding', encoding))
+        self._send(200, data, headers)
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+
+class Visit:
+    __slots__ = ('requests', 'statuses', 'bytes', 'from_cache', 'fetched')
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.bytes = 0
+        self.from_cache = 0
+        self.fetched = []      # (status, url) per request
+
+
+class Browser:
+    """One browser with an HTTP cache, on a simulated clock (`offset` seconds ahead)."""
+
+    def __init__(self, base, accept=ACCEPT):
+        parts = urllib.parse.urlsplit(base)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+        self.accept = accept
+        self.cache = {}        # url -> (body, headers, fresh until)
+
+    def _get(self, url, validators, visit):
+        headers = {'Accept-Encoding': self.accept}
+        headers.update(validators)
+        self.conn.request('GET', url, headers=headers)
+        resp = self.conn.getresponse()
+        body = resp.read()
+        raw = 'HTTP/1.1 %d %s\r\n' % (resp.status, resp.reason)
+        raw += ''.join('%s: %s\r\n' % item for item in resp.getheaders()) + '\r\n'
+        visit.requests += 1
+        visit.statuses[resp.status] = visit.statuses.get(resp.status, 0) + 1
+        visit.bytes += len(raw.encode('latin-1')) + len(body)
+        visit.fetched.append((resp.status, url))
+        return resp.status, dict(resp.getheaders()), body
+
+    @staticmethod
+    def lifetime(headers):
+        match = re.search(r'max-age=(\d+)', headers.get('Cache-Control', ''))
+        if match:
+            return int(match.group(1))
+        date = headers.get('Date')
+        if date and headers.get('Expires'):
+            return email.utils.mktime_tz(email.utils.parsedate_tz(headers['Expires'])) - \
+                email.utils.mktime_tz(email.utils.parsedate_tz(date))
+        if date and headers.get('Last-Modified'):
+            age = email.utils.mktime_tz(email.utils.parsedate_tz(date)) - \
+                email.utils.mktime_tz(email.utils.parsedate_tz(headers['Last-Modified']))
+            return HEURISTIC * max(0, age)
+        return 0
+
+    def fetch(self, url, now, visit):
+        cached = self.cache.get(url)
+        if cached and now < cached[2]:
+            visit.from_cache += 1
+            return cached[0], cached[1]
+        validators = {}
+        if cached and cached[1].get('ETag'):
+            validators['If-None-Match'] = cached[1]['ETag']
+        if cached and cached[1].get('Last-Modified'):
+            validators['If-Modified-Since'] = cached[1]['Last-Modified']
+        status, headers, body = self._get(url, validators, visit)
+        if status == 304 and cached:
+            headers = dict(cached[1], **headers)
+            body = cached[0]
+        elif headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        elif headers.get('Content-Encoding') == 'br':
+            body = brotli.decompress(body)
+        self.cache[url] = (body, headers, now + self.lifetime(headers))
+        return body, headers
+
+    def visit(self, offset=0):
+        """Load / and every asset it links to, as of `offset` seconds from now."""
+        now = time.time() + offset
+        visit = Visit()
+        page, _ = self.fetch('/', now, visit)
+        for url in LINK.findall(page.decode('utf-8')):
+            self.fetch(url, now, visit)
+        return visit
+
+    def close(self):
+        self.conn.close()
+
+
+def _text(rng, kind, size):
+    """Compressible synthetic CSS/JS/HTML of about `size` bytes."""
+    words = ['wp', 'block', 'entry', 'site', 'header', 'content', 'nav', 'menu', 'post', 'title',
+             'widget', 'footer', 'button', 'image', 'caption', 'gallery', 'columns', 'group']
+    out, total = [], 0
+    while total < size:
+        name = '-'.join(rng.choice(words) for _ in range(3))
+        if kind == 'css':
+            chunk = '.%s{margin:%dpx %dpx;color:#%06x;display:flex}\n' % (
+                name, rng.randrange(32), rng.randrange(32), rng.randrange(1 << 24))
+        elif kind == 'js':
+            chunk = 'function %s(e){return e&&e.%s?e.%s(%d):null}\n' % (
+                name.replace('-', '_'), rng.choice(words), rng.choice(words), rng.randrange(1000))
+        else:
+            chunk = '<div class="%s"><p>%s</p></div>\n' % (name, ' '.join(rng.choice(words) for _ in range(12)))
+        out.append(chunk)
+        total += len(chunk)
+    return ''.join(out)
+
+
+# sample page assets: (path, kind, bytes, ?ver= or None)
+ASSETS = (
+    ('/wp-includes/css/dist/block-library/style.min.css', 'css', 90000, '6.3.2'),
+    ('/wp-content/themes/demo/style.css', 'css', 40000, '1.0'),
+    ('/wp-includes/js/jquery/jquery.min.js', 'js', 87000, '3.7.0'),
+    ('/wp-content/themes/demo/js/navigation.js', 'js', 5000, '1.0'),
+    ('/wp-content/themes/demo/js/app.3f9a1c2e.js', 'js', 12000, None),
+    ('/wp-content/themes/demo/fonts/inter.woff2', 'binary', 30000, None),
+    ('/wp-content/themes/demo/logo.svg', 'svg', 4000, None),
+    ('/wp-content/uploads/2023/10/hero.jpg', 'binary', 120000, None),
+    ('/wp-content/uploads/2023/10/photo-1.webp', 'binary', 50000, None),
+    ('/wp-content/uploads/2023/10/photo-2.webp', 'binary', 50000, None),
+    ('/favicon.ico', 'binary', 1500, None),
+)
+THEME_CSS = '/wp-content/themes/demo/style.css'
+HASHED_JS = '/wp-content/themes/demo/js/app.3f9a1c2e.js'
+MAX_VER_AGE = 30 * DAY   # longest a ?ver= URL may stay fresh without revalidating
+
+
+def write_page(docroot, versions):
+    links = []
+    for path, kind, _, ver in ASSETS:
+        url = '%s?ver=%s' % (path, versions.get(path, ver)) if ver else path
+        if kind == 'css':
+            links.append('<link rel="stylesheet" href="%s">' % url)
+        elif kind == 'js':
+            links.append('<script src="%s"></script>' % url)
+        elif path.endswith('.woff2'):
+            links.append('<link rel="preload" as="font" href="%s">' % url)
+        else:
+            links.append('<img src="%s">' % url)
+    body = _text(random.Random(7), 'html', 30000)
+    html = '<!DOCTYPE html>\n<html><head>\n%s\n</head><body>\n%s</body></html>\n' % ('\n'.join(links), body)
+    with open(os.path.join(docroot, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def make_site(docroot, built=DAY):
+    """Sample WordPress page under `docroot`; files dated `built` seconds ago (the image build)."""
+    rng = random.Random(1)
+    stamp = time.time() - built
+    for path, kind, size, _ in ASSETS:
+        full = os.path.join(docroot, path.lstrip('/'))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        if kind == 'binary':
+            data = rng.randbytes(size)
+        elif kind == 'svg':
+            data = ('<svg xmlns="http://www.w3.org/2000/svg">\n%s</svg>\n'
+                    % ''.join('<path d="M%d %dL%d %d"/>\n' % tuple(rng.randrange(100) for _ in range(4))
+                              for _ in range(size // 30))).encode('utf-8')
+        else:
+            data = _text(rng, kind, size).encode('utf-8')
+        with open(full, 'wb') as f:
+            f.write(data)
+        os.utime(full, (stamp, stamp))
+    write_page(docroot, {})
+
+
+def update_theme(docroot):
+    """Edit style.css and bump its ?ver=, as a theme deploy does."""
+    with open(os.path.join(docroot, THEME_CSS.lstrip('/')), 'a', encoding='utf-8') as f:
+        f.write('.site-header{background:#123456}\n')
+    write_page(docroot, {THEME_CSS: '1.1'})
+
+
+VISITS = (('first visit', 0), ('next day', DAY), ('theme update', 2 * DAY))
+
+
+def measure(docroot, policy):
+    """{visit name: Visit} for one profile, on a fresh copy of the sample site."""
+    make_site(docroot)
+    site = Site(docroot, policy).start()
+    browser = Browser(site.base)
+    results = {}
+    try:
+        for name, offset in VISITS:
+            if name == 'theme update':
+                update_theme(docroot)
+            results[name] = browser.visit(offset)
+    finally:
+        browser.close()
+        site.shutdown()
+        site.server_close()
+    return results
+
+
+def revalidates(docroot, policy, path='/wp-content/themes/demo/logo.svg'):
+    """Status of a conditional request for a compressed asset with the ETag it was served with."""
+    site = Site(docroot, policy).start()
+    conn = http.client.HTTPConnection('127.0.0.1', site.server_address[1], timeout=10)
+    try:
+        conn.request('GET', path, headers={'Accept-Encoding': ACCEPT})
+        resp = conn.getresponse()
+        resp.read()
+        etag = resp.getheader('ETag')
+        conn.request('GET', path, headers={'Accept-Encoding': ACCEPT, 'If-None-Match': etag})
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status
+    finally:
+        conn.close()
+        site.shutdown()
+        site.server_close()
+
+
+def _kb(n):
+    return '%.1f KB' % (n / 1024.0)
+
+
+def format_visits(profiles):
+    lines = ['%-10s %-13s %9s %-16s %10s' % ('profile', 'visit', 'requests', 'responses', 'bytes')]
+    for profile, visits in profiles.items():
+        for name, visit in visits.items():
+            statuses = ' '.join('%d×%d' % (n, s) for s, n in sorted(visit.statuses.items()))
+            lines.append('%-10s %-13s %9d %-16s %10s' % (profile, name, visit.requests, statuses, _kb(visit.bytes)))
+    return '\n'.join(lines)
+
+
+def run_checks(conf_text, tmp):
+    policy = Policy.from_conf(conf_text)
+    stock = measure(os.path.join(tmp, 'stock'), Policy())
+    tuned = measure(os.path.join(tmp, 'delivery'), policy)
+    print(format_visits({'stock': stock, 'delivery': tuned}))
+    print()
+
+    checks = []
+    before, after = stock['first visit'].bytes, tuned['first visit'].bytes
+    checks.append((after < before, 'first visit: %s -> %s (%+.0f%%)'
+                   % (_kb(before), _kb(after), (after / float(before) - 1) * 100)))
+    for name in ('next day', 'theme update'):
+        before, after = stock[name].requests, tuned[name].requests
+        checks.append((after < before, '%s: %d -> %d requests, %s -> %s' % (
+            name, before, after, _kb(stock[name].bytes), _kb(tuned[name].bytes))))
+    refetched = sorted(url.split('?')[0] for status, url in tuned['theme update'].fetched if url != '/')
+    checks.append((refetched == [THEME_CSS], 'theme update refetches only %s (got %s)'
+                   % (THEME_CSS, ', '.join(refetched) or 'nothing')))
+    hashed = policy.version_control(HASHED_JS, '') or 'nothing'
+    checks.append(('immutable' in hashed, 'hashed file name %s: %s' % (HASHED_JS.rsplit('/', 1)[1], hashed)))
+    versioned = policy.version_control(THEME_CSS, 'ver=1.0') or 'nothing'
+    lifetime = Browser.lifetime({'Cache-Control': versioned})
+    checks.append(('immutable' not in versioned and 0 < lifetime <= MAX_VER_AGE,
+                   '?ver= URL: %s (at most %d days, not immutable)' % (versioned, MAX_VER_AGE // DAY)))
+    status = revalidates(os.path.join(tmp, 'delivery'), policy)
+    checks.append((status == 304, 'revalidating a compressed asset by ETag answers %d' % status))
+    return checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the Apache delivery profile on a sample WordPress page.')
+    parser.add_argument('--conf', help='delivery config to measure (default: the rendered %s)' % CONF_TEMPLATE)
+    parser.add_argument('--serve', action='store_true', help='only serve the sample page until interrupted')
+    parser.add_argument('--stock', action='store_true', help='with --serve: Apache defaults, no profile')
+    parser.add_argument('--port', type=int, default=8080, help='port for --serve (default: 8080)')
+    args = parser.parse_args(argv)
+
+    if args.conf:
+        with open(args.conf, encoding='utf-8') as f:
+            conf_text = f.read()
+    else:
+        conf_text = generate.Templates().render(CONF_TEMPLATE)
+
+    if args.serve:
+        docroot = tempfile.mkdtemp(prefix='grw-delivery-')
+        make_site(docroot)
+        site = Site(docroot, Policy() if args.stock else Policy.from_conf(conf_text), args.port)
+        print('serving %s at %s/' % (docroot, site.base))
+        try:
+            site.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if brotli is None:
+        print('⚠️ brotli module not installed: measuring the gzip fallback (Brotli is smaller still)')
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='grw-delivery-') as tmp:
+        checks = run_checks(conf_text, os.path.realpath(tmp))
+    failed = 0
+    for passed, message in checks:
+        failed += not passed
+        print('%s %s' % ('✅' if passed else '❌', message))
+    print('%s in %.2fs' % ('✅ delivery profile checks passed' if not failed else '❌ %d check(s) failed' % failed,
+                           time.perf_counter() - start))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
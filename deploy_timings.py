@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# Deploy timing store and timeline charts
+#
+# QUICK_REFERENCE.md quotes typical timings (webhook instant, Docker build
+# 2-3 minutes, restart 30 seconds); this records the real ones. Each deploy
+# is one line appended to a JSON Lines file:
+#
+#   {"deploy": "dep-123", "site": "my-blog", "at": 1760000000.0,
+#    "phases": [["webhook", 0.0, 0.4], ["build", 0.4, 151.2], ["restart", 151.2, 183.0]]}
+#
+# where each phase is [name, start, end] in seconds from the deploy's start.
+# Lines are appended with a single O_APPEND write, so concurrent recorders
+# do not interleave.
+#
+# Reading never loads the file: records are streamed, per-phase durations go
+# into log-bucketed histograms (about 2% resolution) per time window, and
+# only the last few deploys are kept for the Gantt chart. Memory depends on
+# the number of phases and windows, not on the number of records.
+#
+# Usage:
+#   python3 deploy_timings.py record --site my-blog webhook=0.4 build=150.8 restart=31.8 [--store FILE]
+#   python3 deploy_timings.py summary [--store FILE] [--window day|week|hour]
+#   python3 chart_script.py --timeline deploys.jsonl     (renders deploy-timeline.svg)
+
+import argparse
+import collections
+import json
+import math
+import os
+import sys
+import time
+from xml.sax.saxutils import escape
+
+import diagram_svg
+
+DEFAULT_STORE = 'deploy-timings.jsonl'
+GANTT_DEPLOYS = 10
+WINDOWS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# histogram bucket i holds durations in [GROWTH**i, GROWTH**(i+1)) seconds
+GROWTH = 1.02
+_LOG_GROWTH = math.log(GROWTH)
+# durations below this are counted as zero
+FLOOR = 0.001
+
+PHASE_COLORS = ('#1FB8CD', '#DB4545', '#2E8B57', '#5D878F', '#D2BA4C', '#B4413C', '#964325')
+
+
+def make_record(site, phases, deploy=None, at=None):
+    """A store record from sequential (name, seconds) phases."""
+    at = time.time() if at is None else at
+    spans, clock = [], 0.0
+    for name, seconds in phases:
+        spans.append([name, round(clock, 3), round(clock + seconds, 3)])
+        clock += seconds
+    return {'deploy': deploy or '%s-%d' % (site, int(at * 1000)), 'site': site,
+            'at': round(at, 3), 'phases': spans}
+
+
+def append(path, record):
+    """Append one record as a single write (atomic for O_APPEND on local filesystems)."""
+    line = (json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n').encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def iter_records(path, errors=None):
+    """Stream valid records from the store; malformed lines are counted in errors['bad']."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                phases = record['phases']
+                if not isinstance(phases, list) or not all(
+                        len(p) == 3 and isinstance(p[0], str) and p[2] >= p[1] for p in phases):
+                    raise ValueError
+                float(record.get('at', 0))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                if errors is not None:
+                    errors['bad'] = errors.get('bad', 0) + 1
+                continue
+            yield record
+
+
+class Histogram:
+    """Log-bucketed duration histogram: fixed memory per distinct bucket, ~2% error."""
+
+    __slots__ = ('buckets', 'count', 'total', 'zeros')
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.zeros = 0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds < FLOOR:
+            self.zeros += 1
+            return
+        i = int(math.floor(math.log(seconds) / _LOG_GROWTH))
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def percentile(self, pct):
+        """Nearest-rank percentile, reported as the bucket's geometric midpoint."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(pct / 100.0 * self.count)))
+        if rank <= self.zeros:
+            return 0.0
+        seen = self.zeros
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return GROWTH ** (i + 0.5)
+        return GROWTH ** (max(self.buckets) + 0.5)
+
+
+class Aggregate:
+    """Everything the charts need, built in one streaming pass."""
+
+    def __init__(self, window='day', keep=GANTT_DEPLOYS):
+        self.window = WINDOWS[window]
+        self.phases = []                      # first-seen order
+        self.overall = {}                     # phase -> Histogram
+        self.trend = {}                       # (window start, phase) -> Histogram
+        self.recent = collections.deque(maxlen=keep)
+        self.records = 0
+
+    def add(self, record):
+        self.records += 1
+        bucket = int(float(record.get('at', 0)) // self.window) * self.window
+        for name, start, end in record['phases']:
+            if name not in self.overall:
+                self.phases.append(name)
+                self.overall[name] = Histogram()
+            duration = float(end) - float(start)
+            self.overall[name].add(duration)
+            self.trend.setdefault((bucket, name), Histogram()).add(duration)
+        self.recent.append(record)
+
+    def windows(self):
+        return sorted({w for w, _ in self.trend})
+
+
+def aggregate(records, window='day', keep=GANTT_DEPLOYS):
+    agg = Aggregate(window, keep)
+    for record in records:
+        agg.add(record)
+    return agg
+
+
+def _duration(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 1:
+        return '%d ms' % round(seconds * 1000)
+    if seconds < 120:
+        return '%.1f s' % seconds
+    return '%.1f min' % (seconds / 60.0)
+
+
+def format_summary(agg):
+    lines = ['%d deploys, %d phases' % (agg.records, len(agg.phases)),
+             '%-16s %8s %10s %10s %10s' % ('phase', 'count', 'p50', 'p95', 'mean')]
+    for name in agg.phases:
+        h = agg.overall[name]
+        lines.append('%-16s %8d %10s %10s %10s' % (name, h.count, _duration(h.percentile(50)),
+                                                   _duration(h.percentile(95)), _duration(h.total / h.count)))
+    return '\n'.join(lines)
+
+
+def render_timeline_svg(agg, title='Deploy timeline', width=diagram_svg.WIDTH):
+    """Gantt chart of the most recent deploys above p50/p95 trend lines per phase."""
+    font, ink, paper = diagram_svg.FONT, diagram_svg.INK, diagram_svg.PAPER
+    colors = {name: PHASE_COLORS[i % len(PHASE_COLORS)] for i, name in enumerate(agg.phases)}
+    left, right = 170, 40
+    plot_w = width - left - right
+    row_h, gantt_top = 22, 80
+    deploys = list(agg.recent)
+    gantt_h = max(1, len(deploys)) * row_h
+    trend_top = gantt_top + gantt_h + 90
+    trend_h = 260
+    height = trend_top + trend_h + 80
+    out = ['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">'
+           % (width, height, width, height),
+           '<rect width="100%%" height="100%%" fill="%s"/>' % paper,
+           '<text x="%d" y="40" font-family="%s" font-size="17" fill="%s">%s</text>'
+           % (left, font, ink, escape('%s (%d deploys)' % (title, agg.records)))]
+
+    def text(x, y, s, size=11, anchor='start', color=ink):
+        out.append('<text x="%.1f" y="%.1f" font-family="%s" font-size="%d" fill="%s" text-anchor="%s">%s</text>'
+                   % (x, y, font, size, color, anchor, escape(s)))
+
+    # Gantt: one row per recent deploy, bars at each phase's offset
+    longest = max([p[2] for d in deploys for p in d['phases']] or [1.0]) or 1.0
+    text(left, gantt_top - 12, 'Last %d deploys' % len(deploys), 12)
+    for row, record in enumerate(deploys):
+        y = gantt_top + row * row_h
+        text(left - 8, y + row_h * 0.65, '%s %s' % (record.get('site', ''), time.strftime(
+            '%m-%d %H:%M', time.gmtime(float(record.get('at', 0))))), 10, 'end')
+        for name, start, end in record['phases']:
+            x0 = left + float(start) / longest * plot_w
+            w = max(1.0, (float(end) - float(start)) / longest * plot_w)
+            out.append('<rect x="%.1f" y="%.1f" width="%.1f" height="%d" fill="%s"><title>%s</title></rect>'
+                       % (x0, y + 3, w, row_h - 6, colors[name], escape('%s: %s' % (name, _duration(end - start)))))
+    text(left + plot_w, gantt_top + gantt_h + 16, _duration(longest), 10, 'end')
+    text(left, gantt_top + gantt_h + 16, '0', 10)
+
+    # trends: p50 solid, p95 dashed, per phase, log-scaled seconds
+    windows = agg.windows()
+    values = [h.percentile(p) for h in agg.trend.values() for p in (50, 95)]
+    values = [v for v in values if v] or [1.0]
+    lo, hi = math.log10(min(values)), math.log10(max(values))
+    if hi - lo < 1e-9:
+        lo, hi = lo - 0.5, hi + 0.5
+    text(left, trend_top - 12, 'p50 (solid) and p95 (dashed) per phase, per %s' % {
+        3600: 'hour', 86400: 'day', 7 * 86400: 'week'}[agg.window], 12)
+    out.append('<rect x="%d" y="%d" width="%d" height="%d" fill="none" stroke="#cccccc"/>'
+               % (left, trend_top, plot_w, trend_h))
+
+    def ty(v):
+        return trend_top + trend_h - (math.log10(v) - lo) / (hi - lo) * trend_h
+
+    def tx(i):
+        return left + (plot_w / 2.0 if len(windows) == 1 else i / float(len(windows) - 1) * plot_w)
+
+    for v in (10 ** lo, 10 ** ((lo + hi) / 2), 10 ** hi):
+        text(left - 8, ty(v) + 4, _duration(v), 10, 'end')
+    index = {w: i for i, w in enumerate(windows)}
+    for name in agg.phases:
+        for pct, dash in ((50, ''), (95, ' stroke-dasharray="5,4"')):
+            points = ['%.1f,%.1f' % (tx(index[w]), ty(max(h.percentile(pct), 10 ** lo)))
+                      for (w, phase), h in sorted(agg.trend.items()) if phase == name and h.percentile(pct)]
+            if points:
+                out.append('<polyline points="%s" fill="none" stroke="%s" stroke-width="2"%s/>'
+                           % (' '.join(points), colors[name], dash))
+    if windows:
+        for i in sorted({0, len(windows) - 1}):
+            text(tx(i), trend_top + trend_h + 16, time.strftime('%Y-%m-%d', time.gmtime(windows[i])), 10, 'middle')
+
+    # legend
+    y = height - 30
+    for i, name in enumerate(agg.phases):
+        x = left + i * 150
+        out.append('<rect x="%d" y="%d" width="12" height="12" fill="%s"/>' % (x, y - 10, colors[name]))
+        h = agg.overall[name]
+        text(x + 18, y, '%s p50 %s' % (name, _duration(h.percentile(50))), 11)
+    out.append('</svg>')
+    return '\n'.join(out) + '\n'
+
+
+def _phase_arg(text):
+    name, sep, seconds = text.partition('=')
+    try:
+        value = float(seconds)
+    except ValueError:
+        value = -1
+    if not sep or not name or value < 0:
+        raise argparse.ArgumentTypeError('expected PHASE=SECONDS, got %r' % text)
+    return name, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Record and summarize deploy phase timings.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    rec = sub.add_parser('record', help='append one deploy')
+    rec.add_argument('--store', default=DEFAULT_STORE, help='JSON Lines file (default: %s)' % DEFAULT_STORE)
+    rec.add_argument('--site', required=True)
+    rec.add_argument('--deploy', help='deploy id (default: SITE-<epoch ms>)')
+    rec.add_argument('phases', nargs='+', type=_phase_arg, metavar='PHASE=SECONDS',
+                     help='phases in the order they ran')
+    summ = sub.add_parser('summary', help='p50/p95 per phase')
+    summ.add_argument('--store', default=DEFAULT_STORE, help='JSON Lines file (default: %s)' % DEFAULT_STORE)
+    summ.add_argument('--window', choices=sorted(WINDOWS), default='day')
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        append(args.store, make_record(args.site, args.phases, args.deploy))
+        return 0
+    errors = {}
+    try:
+        agg = aggregate(iter_records(args.store, errors), args.window)
+    except OSError as e:
+        print('❌ %s: %s' % (args.store, e.strerror), file=sys.stderr)
+        return 2
+    print(format_summary(agg))
+    if errors.get('bad'):
+        print('⚠️ skipped %d malformed line(s)' % errors['bad'], file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# Batched export of diagrams to several formats
+#
+# Writing an SVG is a string write, but every raster or PDF export pays the
+# rasterizer's startup: importing cairosvg, or spawning rsvg-convert. An
+# ExportSession keeps a small pool of worker processes alive for the whole
+# batch; each worker picks and loads its rasterizer once (cairosvg stays
+# imported between figures), so the startup is paid once per worker rather
+# than once per image. SVG outputs are written directly by the session.
+#
+#   with ExportSession(workers=2) as session:
+#       for name, svg in figures:
+#           session.submit(svg, os.path.join(out, name), ('svg', 'png'))
+#   for result in session.results: ...
+#
+# Every output is reported with its own export time, so the amortization
+# over a batch is visible.
+
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import diagram_svg
+import generate
+
+FORMATS = ('svg', 'png', 'pdf')
+DEFAULT_WORKERS = 2
+
+_backend = None
+
+
+class ExportResult:
+    __slots__ = ('figure', 'format', 'path', 'seconds', 'written', 'error')
+
+    def __init__(self, figure, fmt, path, seconds, written=True, error=None):
+        self.figure = figure
+        self.format = fmt
+        self.path = path
+        self.seconds = seconds
+        self.written = written    # False when an identical file was already there
+        self.error = error
+
+
+def _load_backend():
+    """('cairosvg', module) or ('rsvg', path); chosen once per process."""
+    global _backend
+    if _backend is None:
+        try:
+            import cairosvg
+            _backend = ('cairosvg', cairosvg)
+        except ImportError:
+            rsvg = shutil.which('rsvg-convert')
+            _backend = ('rsvg', rsvg) if rsvg else ('none', None)
+    return _backend
+
+
+def _init_worker():
+    _load_backend()
+
+
+def _init_worker_probe(_):
+    return os.getpid()
+
+
+def _rasterize(svg, path, fmt, scale):
+    """Worker: render one SVG to png/pdf; returns (seconds, error)."""
+    start = time.perf_counter()
+    kind, backend = _load_backend()
+    try:
+        if kind == 'cairosvg':
+            convert = backend.svg2png if fmt == 'png' else backend.svg2pdf
+            convert(bytestring=svg.encode('utf-8'), write_to=path, scale=scale)
+        elif kind == 'rsvg':
+            proc = subprocess.run([backend, '--zoom', str(scale), '--format', fmt, '--output', path],
+                                  input=svg.encode('utf-8'), stderr=subprocess.PIPE)
+            if proc.returncode != 0:
+                raise diagram_svg.RasterizeError(proc.stderr.decode(errors='replace').strip())
+        else:
+            raise diagram_svg.RasterizeError(
+                '%s output needs cairosvg (pip install cairosvg) or rsvg-convert (librsvg)' % fmt.upper())
+    except Exception as e:
+        return time.perf_counter() - start, str(e) or e.__class__.__name__
+    return time.perf_counter() - start, None
+
+
+class ExportSession:
+    """Exports many figures to many formats over one long-lived worker pool."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, scale=2.0):
+        self.workers = workers
+        self.scale = scale
+        self.results = []
+        self.startup = 0.0          # seconds spent starting the pool and loading rasterizers
+        self._pool = None
+        self._pending = []
+
+    def _get_pool(self):
+        if self._pool is None:
+            start = time.perf_counter()
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            # start every worker (and its rasterizer) now, so the first
+            # figures' timings do not include it
+            list(self._pool.map(_init_worker_probe, range(self.workers)))
+            self.startup = time.perf_counter() - start
+        return self._pool
+
+    def submit(self, svg, base, formats=('svg',), figure=None):
+        """Queue `svg` for export to `base`.<fmt> in every format; SVG is written right away."""
+        figure = figure or base
+        for fmt in formats:
+            if fmt not in FORMATS:
+                raise ValueError('unknown format %r (one of %s)' % (fmt, ', '.join(FORMATS)))
+            path = '%s.%s' % (base, fmt)
+            if fmt == 'svg':
+                start = time.perf_counter()
+                written = generate.write_if_changed(path, svg.encode('utf-8'))
+                self.results.append(ExportResult(figure, fmt, path, time.perf_counter() - start, written))
+                continue
+            future = self._get_pool().submit(_rasterize, svg, path, fmt, self.scale)
+            self._pending.append((figure, fmt, path, future))
+
+    def wait(self):
+        """Collect every queued export into `results`."""
+        for figure, fmt, path, future in self._pending:
+            seconds, error = future.result()
+            self.results.append(ExportResult(figure, fmt, path, seconds, error is None, error))
+        self._pending = []
+        return self.results
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def format_results(results, startup=0.0):
+    """Per-figure export times, one line per figure."""
+    figures = {}
+    for r in results:
+        figures.setdefault(r.figure, []).append(r)
+    lines = []
+    for figure, rs in figures.items():
+        parts = []
+        for r in rs:
+            if r.error:
+                parts.append('%s ❌ %s' % (r.format, r.error))
+            else:
+                parts.append('%s %.1f ms%s' % (r.format, r.seconds * 1000, '' if r.written else ' (unchanged)'))
+        lines.append('%s %s: %s' % ('❌' if any(r.error for r in rs) else '✅', figure, ', '.join(parts)))
+    total = sum(r.seconds for r in results)
+    lines.append('%d output%s from %d figure%s, %.1f ms exporting%s' % (
+        len(results), '' if len(results) == 1 else 's', len(figures), '' if len(figures) == 1 else 's',
+        total * 1000, ', %.1f ms worker startup (once)' % (startup * 1000) if startup else ''))
+    return '\n'.join(lines)
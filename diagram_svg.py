@@ -0,0 +1,128 @@
+# Dependency-free SVG renderer for the architecture diagram
+#
+# Draws the same picture chart_script.py used to build with plotly: round
+# nodes with multi-line labels, arrows between them with boxed labels, a
+# title and the paper background, from the `positions`, `connections` and
+# `components` data. The SVG is assembled as text in a few milliseconds; no
+# browser or plotly/kaleido is involved.
+#
+# PNG/PDF output is optional and goes through diagram_export.py, which
+# needs a rasterizer: the cairosvg package if it is installed, else the
+# rsvg-convert binary (librsvg).
+
+import math
+from xml.sax.saxutils import escape
+
+WIDTH = 1200
+HEIGHT = 800
+# plot area margins, as plotly's defaults (left, right, top, bottom)
+MARGIN = (80, 80, 100, 80)
+
+PAPER = '#F3F3EE'
+INK = '#13343b'
+EDGE = '#333333'
+LABEL_BG = 'rgba(243, 243, 238, 0.9)'
+LABEL_BORDER = '#21808d'
+FONT = 'Arial, Helvetica, sans-serif'
+NODE_FONT = "'Arial Black', Arial, sans-serif"
+
+NODE_SIZE = 60          # marker diameter in px
+NODE_FONT_SIZE = 11
+EDGE_FONT_SIZE = 10
+TITLE_FONT_SIZE = 17
+# average glyph width relative to the font size, used to size label boxes
+GLYPH_WIDTH = 0.6
+
+
+class RasterizeError(Exception):
+    pass
+
+
+def _lines(label):
+    return [part.strip() for part in label.split('<br>')]
+
+
+def _fmt(n):
+    return ('%.2f' % n).rstrip('0').rstrip('.')
+
+
+def _ranges(positions, x_range, y_range):
+    xs = [x for x, _ in positions.values()]
+    ys = [y for _, y in positions.values()]
+    x_range = x_range or (min(xs) - 0.5, max(xs) + 0.5)
+    y_range = y_range or (min(ys) - 1.0, max(ys) + 1.0)
+    return x_range, y_range
+
+
+def _text(x, y, lines, size, font, color, weight=None):
+    """Centered multi-line <text>; `y` is the vertical middle of the block."""
+    first = y - (len(lines) - 1) * size * 1.2 / 2 + size * 0.35
+    attrs = 'x="%s" y="%s" font-family="%s" font-size="%d" fill="%s" text-anchor="middle"' % (
+        _fmt(x), _fmt(first), escape(font, {'"': '&quot;'}), size, color)
+    if weight:
+        attrs += ' font-weight="%s"' % weight
+    spans = ''.join('<tspan x="%s" dy="%s">%s</tspan>' % (
+        _fmt(x), '0' if i == 0 else _fmt(size * 1.2), escape(line)) for i, line in enumerate(lines))
+    return '<text %s>%s</text>' % (attrs, spans)
+
+
+def render_svg(positions, connections, components, title='', x_range=None, y_range=None,
+               width=WIDTH, height=HEIGHT):
+    """SVG document (str) for the diagram.
+
+    positions: {node: (x, y)} in data units; connections: [(from, to, label)];
+    components: {node: {'label': 'Line 1<br>Line 2', 'color': '#rrggbb'}}.
+    Labels may use <br> for line breaks, as in plotly.
+    """
+    (x0, x1), (y0, y1) = _ranges(positions, x_range, y_range)
+    left, right, top, bottom = MARGIN
+    plot_w, plot_h = width - left - right, height - top - bottom
+
+    def px(pos):
+        x, y = pos
+        return (left + (x - x0) / float(x1 - x0) * plot_w,
+                top + (y1 - y) / float(y1 - y0) * plot_h)
+
+    radius = NODE_SIZE / 2.0
+    out = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">'
+        % (width, height, width, height),
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="6" '
+        'markerHeight="6" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="%s"/>'
+        '</marker></defs>' % EDGE,
+        '<rect width="100%%" height="100%%" fill="%s"/>' % PAPER,
+    ]
+    if title:
+        out.append('<text x="%d" y="%d" font-family="%s" font-size="%d" fill="%s">%s</text>' % (
+            left, top // 2, FONT, TITLE_FONT_SIZE, INK, escape(title)))
+
+    labels = []
+    for start, end, label in connections:
+        (ax, ay), (bx, by) = px(positions[start]), px(positions[end])
+        length = math.hypot(bx - ax, by - ay) or 1.0
+        ux, uy = (bx - ax) / length, (by - ay) / length
+        # stop at the node rims so the arrowheads stay visible
+        sx, sy = ax + ux * (radius + 2), ay + uy * (radius + 2)
+        ex, ey = bx - ux * (radius + 4), by - uy * (radius + 4)
+        out.append('<line x1="%s" y1="%s" x2="%s" y2="%s" stroke="%s" stroke-width="2" '
+                   'marker-end="url(#arrow)"/>' % (_fmt(sx), _fmt(sy), _fmt(ex), _fmt(ey), EDGE))
+        if label:
+            labels.append(((ax + bx) / 2, (ay + by) / 2, _lines(label)))
+
+    for x, y, lines in labels:
+        w = max(len(line) for line in lines) * EDGE_FONT_SIZE * GLYPH_WIDTH + 8
+        h = len(lines) * EDGE_FONT_SIZE * 1.2 + 8
+        out.append('<rect x="%s" y="%s" width="%s" height="%s" fill="%s" stroke="%s" stroke-width="1"/>'
+                   % (_fmt(x - w / 2), _fmt(y - h / 2), _fmt(w), _fmt(h), LABEL_BG, LABEL_BORDER))
+        out.append(_text(x, y, lines, EDGE_FONT_SIZE, FONT, INK))
+
+    for name, details in components.items():
+        x, y = px(positions[name])
+        out.append('<circle cx="%s" cy="%s" r="%s" fill="%s" stroke="%s" stroke-width="2">'
+                   '<title>%s</title></circle>' % (_fmt(x), _fmt(y), _fmt(radius),
+                                                   details['color'], INK, escape(name)))
+        out.append(_text(x, y, _lines(details['label']), NODE_FONT_SIZE, NODE_FONT, INK, 'bold'))
+
+    out.append('</svg>')
+    return '\n'.join(out) + '\n'
+
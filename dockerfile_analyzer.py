@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# Dockerfile build-performance analyzer
+#
+# Parses a Dockerfile (continuation lines, comments, instruction flags) and
+# reports what slows the image build down:
+#   - layer count of the final stage
+#   - instruction order that busts the build cache (dependency installs
+#     placed after COPY of frequently edited content such as wp-content)
+#   - package-manager layers without a BuildKit cache mount
+#   - layer size amplification: `chown -R`/`chmod -R` in a separate RUN
+#     rewrites every copied file into a new layer, storing it twice. With
+#     the build context at hand it is measured in bytes copied; without it
+#     it is estimated from the number of COPY instructions rewritten
+#   - lines that are not valid Dockerfile syntax (e.g. shell redirects or
+#     `|| true` on COPY, which does not run a shell)
+#
+# Errors and exceeded thresholds fail the analysis; warnings do not.
+#
+# Usage:
+#   python3 dockerfile_analyzer.py [Dockerfile] [--context DIR] [--max-layers N] [--max-amplification X]
+
+import argparse
+import json
+import os
+import re
+import shlex
+import sys
+
+import build_context
+
+INSTRUCTIONS = frozenset((
+    'FROM', 'RUN', 'CMD', 'LABEL', 'MAINTAINER', 'EXPOSE', 'ENV', 'ADD', 'COPY',
+    'ENTRYPOINT', 'VOLUME', 'USER', 'WORKDIR', 'ARG', 'ONBUILD', 'STOPSIGNAL',
+    'HEALTHCHECK', 'SHELL',
+))
+LAYER_INSTRUCTIONS = frozenset(('RUN', 'COPY', 'ADD'))
+
+MAX_LAYERS = 8
+MAX_AMPLIFICATION = 1.5
+
+ERROR = 'error'
+WARNING = 'warning'
+
+# COPY sources that change with nearly every commit of a WordPress site
+VOLATILE_SOURCES = re.compile(r'^(\.|\./|(\./)?wp-content(/.*)?|(\./)?(themes|plugins|uploads)(/.*)?)$')
+SHELL_OPERATORS = re.compile(r'^(\|\||&&|\||;|[0-9]*>>?.*|<.*|&>.*)$')
+PACKAGE_INSTALL = re.compile(
+    r'\b(apt-get|apt|apk|yum|dnf)\s+(-\S+\s+)*(install|add)\b'
+    r'|\b(pip3?|composer|npm|yarn|pecl|docker-php-ext-install)\s+(install|require|add)?'
+)
+APT_UPDATE = re.compile(r'\bapt(-get)?\s+update\b')
+RECURSIVE_REWRITE = re.compile(r'\b(chown|chmod|chgrp)\s+(?:-\S*\s+)*-\S*R\S*\s+(?:-\S+\s+)*\S+\s+(\S+)')
+
+
+class Instruction:
+    __slots__ = ('lineno', 'keyword', 'args', 'flags', 'stage')
+
+    def __init__(self, lineno, keyword, args, flags, stage):
+        self.lineno = lineno
+        self.keyword = keyword
+        self.args = args
+        self.flags = flags
+        self.stage = stage
+
+    def words(self):
+        """Arguments as a list, for both JSON (exec) and shell form."""
+        text = self.args.strip()
+        if text.startswith('['):
+            try:
+                value = json.loads(text)
+                if isinstance(value, list):
+                    return [str(v) for v in value]
+            except ValueError:
+                pass
+        try:
+            return shlex.split(text, comments=False)
+        except ValueError:
+            return text.split()
+
+    def __repr__(self):
+        return 'Instruction(%d, %r, %r)' % (self.lineno, self.keyword, self.args)
+
+
+class Finding:
+    __slots__ = ('level', 'lineno', 'message')
+
+    def __init__(self, level, lineno, message):
+        self.level = level
+        self.lineno = lineno
+        self.message = message
+
+    def __str__(self):
+        return 'Dockerfile:%s %s' % (self.lineno, self.message) if self.lineno else self.message
+
+
+def parse(text):
+    """Instructions of a Dockerfile, with continuation lines joined."""
+    escape = '\\'
+    instructions = []
+    stage = -1
+    buf, start = [], None
+    lines = text.splitlines()
+    for lineno, raw in enumerate(lines, 1):
+        line = raw.rstrip()
+        stripped = line.strip()
+        if start is None:
+            if not stripped:
+                continue
+            if stripped.startswith('#'):
+                match = re.match(r'#\s*escape\s*=\s*(\S)', stripped)
+                if match and not instructions:
+                    escape = match.group(1)
+                continue
+            start = lineno
+        elif stripped.startswith('#'):
+            continue  # comments may sit between continuation lines
+        if line.endswith(escape):
+            buf.append(line[:-1])
+            continue
+        buf.append(line)
+        logical = ' '.join(part.strip() for part in buf if part.strip())
+        keyword, _, args = logical.partition(' ')
+        keyword = keyword.upper()
+        flags = {}
+        args = args.strip()
+        while args.startswith('--'):
+            flag, _, rest = args.partition(' ')
+            name, _, value = flag[2:].partition('=')
+            flags.setdefault(name, []).append(value)
+            args = rest.strip()
+        if keyword == 'FROM':
+            stage += 1
+        instructions.append(Instruction(start, keyword, args, flags, max(stage, 0)))
+        buf, start = [], None
+    if buf:
+        logical = ' '.join(part.strip() for part in buf)
+        instructions.append(Instruction(start, logical.partition(' ')[0].upper(), '', {}, max(stage, 0)))
+    return instructions
+
+
+def _covers(path, target):
+    """True if rewriting `path` recursively rewrites everything under `target`."""
+    path, target = path.rstrip('/') or '/', target.rstrip('/') or '/'
+    return target == path or target.startswith(path + '/') or path == '/'
+
+
+class Analysis:
+    def __init__(self, instructions, findings, layers, amplification, max_layers, max_amplification,
+                 measured=False):
+        self.instructions = instructions
+        self.findings = findings
+        self.layers = layers
+        self.amplification = amplification
+        self.max_layers = max_layers
+        self.max_amplification = max_amplification
+        self.measured = measured    # amplification in bytes, not estimated from instruction counts
+
+    @property
+    def errors(self):
+        return [f for f in self.findings if f.level == ERROR]
+
+    @property
+    def warnings(self):
+        return [f for f in self.findings if f.level == WARNING]
+
+    @property
+    def passed(self):
+        return not self.errors
+
+
+def analyze(text, max_layers=MAX_LAYERS, max_amplification=MAX_AMPLIFICATION, source_size=None):
+    """Analysis of a Dockerfile. `source_size(path)` gives the bytes a COPY
+    source sends from the build context (None if unknown); without it size
+    amplification is estimated from instruction counts."""
+    instructions = parse(text)
+    findings = []
+
+    def error(ins, message):
+        findings.append(Finding(ERROR, ins.lineno if ins else None, message))
+
+    def warning(ins, message):
+        findings.append(Finding(WARNING, ins.lineno if ins else None, message))
+
+    for ins in instructions:
+        if ins.keyword not in INSTRUCTIONS:
+            error(ins, 'unknown instruction %r' % ins.keyword)
+    if not instructions or instructions[0].keyword not in ('FROM', 'ARG'):
+        error(instructions[0] if instructions else None, 'Dockerfile must start with FROM')
+
+    final = max((i.stage for i in instructions), default=0)
+    stage = [i for i in instructions if i.stage == final and i.keyword in INSTRUCTIONS]
+    layers = sum(1 for i in stage if i.keyword in LAYER_INSTRUCTIONS)
+
+    copies = []          # (instruction, destination, bytes or None) of COPY/ADD in the final stage
+    volatile_copy = None
+    rewritten = []       # copies a recursive permission change stores again
+    for ins in stage:
+        if ins.keyword in ('COPY', 'ADD'):
+            words = ins.words()
+            bad = [w for w in words if SHELL_OPERATORS.match(w)]
+            if bad:
+                error(ins, '%s does not run a shell; %r would be treated as a path '
+                           '(remove redirects and `|| true`, use .dockerignore instead)'
+                      % (ins.keyword, ' '.join(words[words.index(bad[0]):])))
+                words = words[:words.index(bad[0])]
+            if len(words) < 2:
+                error(ins, '%s needs at least one source and a destination' % ins.keyword)
+                continue
+            sources, dest = words[:-1], words[-1]
+            size = None
+            if source_size is not None and 'from' not in ins.flags:
+                sizes = [source_size(s) for s in sources]
+                size = None if None in sizes else sum(sizes)
+            copies.append((ins, dest, size))
+            if volatile_copy is None and 'from' not in ins.flags \
+                    and any(VOLATILE_SOURCES.match(s) for s in sources):
+                volatile_copy = ins
+
+        elif ins.keyword == 'RUN':
+            cmd = ins.args
+            cached = any('type=cache' in m for m in ins.flags.get('mount', ()))
+            if APT_UPDATE.search(cmd):
+                if not PACKAGE_INSTALL.search(cmd):
+                    warning(ins, 'apt-get update without install in the same RUN leaves a stale package index layer')
+                if not cached:
+                    warning(ins, 'package lists are re-downloaded whenever this layer rebuilds; '
+                                 'use RUN --mount=type=cache,target=/var/cache/apt')
+            if volatile_copy is not None and PACKAGE_INSTALL.search(cmd):
+                warning(ins, 'dependency install runs after COPY at line %d; every content change '
+                             'reinstalls it (move it above the COPY)' % volatile_copy.lineno)
+            for match in RECURSIVE_REWRITE.finditer(cmd):
+                path = match.group(2)
+                hit = [copy for copy in copies if _covers(path, copy[1])]
+                if hit:
+                    rewritten += hit
+                    c = hit[-1][0]
+                    warning(ins, 'recursive %s of %s rewrites every file from %s at line %d into a new layer; '
+                                 'use %s --chown=... instead' % (match.group(1), path, c.keyword, c.lineno, c.keyword))
+
+    copied = sum(c[2] for c in copies if c[2] is not None)
+    measured = any(c[2] is not None for c in copies) and all(c[2] is not None for c in rewritten)
+    if measured:
+        amplification = 1.0 + sum(c[2] for c in rewritten) / float(copied) if copied else 1.0
+    else:
+        amplification = 1.0 + len(rewritten) / float(len(copies)) if copies else 1.0
+    if layers > max_layers:
+        error(None, '%d layers in the final stage (max %d); merge related RUN steps' % (layers, max_layers))
+    if amplification > max_amplification:
+        if measured:
+            error(None, 'copied content (%s) is stored %.1f× (max %.1f×) because of recursive permission rewrites'
+                  % (build_context.format_size(copied), amplification, max_amplification))
+        else:
+            error(None, 'copied content is stored ~%.1f× (max %.1f×, estimated from instruction counts) because '
+                        'of recursive permission rewrites' % (amplification, max_amplification))
+    findings.sort(key=lambda f: (f.level != ERROR, f.lineno or 0))
+    return Analysis(instructions, findings, layers, amplification, max_layers, max_amplification, measured)
+
+
+def format_analysis(analysis):
+    lines = ['%d instructions, %d layers in final stage (max %d), size amplification %.1f×%s (max %.1f×)' % (
+        len(analysis.instructions), analysis.layers, analysis.max_layers,
+        analysis.amplification, '' if analysis.measured else ' (estimated)', analysis.max_amplification)]
+    for f in analysis.findings:
+        lines.append('%s %s' % ('❌' if f.level == ERROR else '⚠️', f))
+    lines.append('✅ Dockerfile build analysis passed' if analysis.passed
+                 else '❌ Dockerfile build analysis failed')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analyze a Dockerfile for build-performance problems.')
+    parser.add_argument('dockerfile', nargs='?', default='Dockerfile')
+    parser.add_argument('--context', help="build context to measure COPY sources in (default: the Dockerfile's "
+                                          'directory)')
+    parser.add_argument('--max-layers', type=int, default=MAX_LAYERS)
+    parser.add_argument('--max-amplification', type=float, default=MAX_AMPLIFICATION)
+    args = parser.parse_args(argv)
+    try:
+        with open(args.dockerfile, encoding='utf-8') as f:
+            text = f.read()
+    except OSError as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 1
+    context = build_context.scan(args.context or os.path.dirname(os.path.abspath(args.dockerfile)), top=1)
+    analysis = analyze(text, args.max_layers, args.max_amplification, context.size_of)
+    print(format_analysis(analysis))
+    return 0 if analysis.passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# Drift index for the deployment files embedded in the docs
+#
+# The Dockerfile, render.yaml, deploy.yml, .gitignore and validate-setup.sh
+# are copied into several guides. generate.py keeps the generated copies in
+# sync, but any doc can still be edited by hand. This indexes every fenced
+# code block in the docs in one pass per file, recording its language, the
+# heading it sits under and the sha256 of its normalized content, works out
+# which deployment file a block is a copy of, and reports the copies that
+# disagree with the canonical source in templates/files/.
+#
+# Normalization ignores trailing whitespace, a common indentation and
+# leading/trailing blank lines. The per-file index is cached in
+# .validate-cache/drift-index.json keyed on (mtime, size), so unchanged
+# docs are not read again.
+#
+# Usage:
+#   python3 drift_index.py [DOC ...] [--list] [--diff] [--no-cache]
+
+import argparse
+import difflib
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import generate
+from validate_cache import CACHE_DIR, RACY_WINDOW, write_atomic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = 'drift-index.json'
+INDEX_VERSION = 1
+
+DOC_PATTERNS = ('*.md', '*.txt')
+
+# artifact -> (fence languages a copy may use, words naming it in a heading or
+# in the prose just above the block), and the template it is rendered from
+ARTIFACTS = {
+    'Dockerfile': (('dockerfile', 'docker'), ('dockerfile',)),
+    'render.yaml': (('yaml', 'yml'), ('render.yaml',)),
+    '.github/workflows/deploy.yml': (('yaml', 'yml'),
+                                     ('deploy.yml', 'github actions workflow', 'github workflow')),
+    '.gitignore': (('', 'gitignore'), ('.gitignore',)),
+    'validate-setup.sh': (('bash', 'sh', 'shell'), ('validate-setup.sh', 'validation script')),
+}
+SOURCES = {
+    'Dockerfile': 'files/Dockerfile',
+    'render.yaml': 'files/render.yaml',
+    '.github/workflows/deploy.yml': 'files/deploy.yml',
+    '.gitignore': 'files/gitignore',
+    'validate-setup.sh': 'files/validate-setup.sh',
+}
+
+_FENCE = re.compile(r'^( {0,3})(`{3,}|~{3,})\s*([^`\s]*)[^`]*$')
+_HEADING = re.compile(r'^ {0,3}#{1,6}\s+(.*?)\s*#*\s*$')
+# prose lines that name the file the next block belongs in
+_PATH_HINT = re.compile(r'(?:\*\*Path:\*\*|Open file:)\s*`([^`]+)`', re.I)
+
+
+def _unindent(line, indent):
+    """Drop up to `indent` leading spaces, as a fence indented that far does."""
+    stripped = len(line) - len(line.lstrip(' '))
+    return line[min(indent, stripped):]
+
+
+def normalize(text):
+    """Content with trailing whitespace, common indentation and outer blank lines removed."""
+    lines = [line.rstrip() for line in text.replace('\r\n', '\n').split('\n')]
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    indent = min((len(l) - len(l.lstrip(' ')) for l in lines if l), default=0)
+    return '\n'.join(l[indent:] for l in lines) + '\n' if lines else ''
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize(text).encode('utf-8')).hexdigest()
+
+
+def classify(lang, heading, hints):
+    """Which artifact a block is a copy of, or None.
+
+    An explicit `Path:`/`Open file:` hint decides on its own; otherwise the
+    heading, then the other prose since the heading. The fence language
+    must fit either way.
+    """
+    lang = lang.lower()
+    paths = [m.group(1) for m in map(_PATH_HINT.search, hints) if m]
+    if paths:
+        artifact = paths[-1].lstrip('./')
+        artifact = artifact if artifact in ARTIFACTS else '.' + artifact
+        if artifact in ARTIFACTS and lang in ARTIFACTS[artifact][0]:
+            return artifact
+        return None
+    for scope in (heading.lower(), ' '.join(h.lower() for h in hints)):
+        if not scope:
+            continue
+        for artifact, (langs, words) in ARTIFACTS.items():
+            if lang in langs and any(w in scope for w in words):
+                return artifact
+    return None
+
+
+def extract(text):
+    """Every fenced block in one pass: [{line, lang, heading, artifact, hash}, ...].
+
+    Only the first block under a heading can be a copy of a given artifact,
+    so follow-up snippets ("check the syntax") are not mistaken for one.
+    """
+    blocks = []
+    heading, hints, claimed = '', [], set()
+    fence = None  # (char, length, indent, start line, lang, body lines)
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if fence is not None:
+            match = _FENCE.match(line)
+            if (match and match.group(2)[0] == fence[0] and len(match.group(2)) >= fence[1]
+                    and not match.group(3) and not line.strip().strip(fence[0])):
+                _, _, _, start, lang, body = fence
+                body_text = '\n'.join(body)
+                artifact = classify(lang, heading, hints)
+                if artifact in claimed:
+                    artifact = None
+                if artifact:
+                    claimed.add(artifact)
+                blocks.append({'line': start, 'lang': lang, 'heading': heading,
+                               'artifact': artifact, 'hash': content_hash(body_text)})
+                fence = None
+            else:
+                body = fence[5]
+                body.append(_unindent(line, fence[2]))
+            continue
+        match = _FENCE.match(line)
+        if match:
+            fence = (match.group(2)[0], len(match.group(2)), len(match.group(1)),
+                     lineno, match.group(3), [])
+            continue
+        match = _HEADING.match(line)
+        if match:
+            heading, hints, claimed = match.group(1), [], set()
+        elif line.strip():
+            hints.append(line.strip())
+            del hints[:-6]
+    return blocks
+
+
+def block_text(path, line):
+    """Raw content of the block whose opening fence is at `line` (for --diff)."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        lines = f.read().splitlines()
+    match = _FENCE.match(lines[line - 1])
+    indent, fence = len(match.group(1)), match.group(2)
+    body = []
+    for l in lines[line:]:
+        m = _FENCE.match(l)
+        if m and m.group(2)[0] == fence[0] and len(m.group(2)) >= len(fence) and not m.group(3):
+            break
+        body.append(_unindent(l, indent))
+    return '\n'.join(body)
+
+
+class DriftIndex:
+    """Per-document block index, persisted and reused while (mtime, size) match."""
+
+    def __init__(self, root=HERE, cache=True):
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, INDEX_FILE) if cache else None
+        self.files = {}
+        self.reads = 0
+        self._dirty = False
+        if self.path:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.files = data.get('files') or {}
+            except (OSError, ValueError, AttributeError):
+                pass
+
+    def blocks(self, rel):
+        path = os.path.join(self.root, rel)
+        st = os.stat(path)
+        known = self.files.get(rel)
+        if known and known['stat'] == [st.st_mtime_ns, st.st_size]:
+            return known['blocks']
+        with open(path, encoding='utf-8', errors='replace') as f:
+            blocks = extract(f.read())
+        self.reads += 1
+        if time.time() - st.st_mtime > RACY_WINDOW:
+            self.files[rel] = {'stat': [st.st_mtime_ns, st.st_size], 'blocks': blocks}
+            self._dirty = True
+        return blocks
+
+    def save(self, keep=None):
+        if keep is not None:
+            for rel in set(self.files) - set(keep):
+                del self.files[rel]
+                self._dirty = True
+        if not self.path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            ignore = os.path.join(os.path.dirname(self.path), '.gitignore')
+            if not os.path.exists(ignore):
+                with open(ignore, 'w') as f:
+                    f.write('# Created by validate_setup.py\n*\n')
+            data = {'version': INDEX_VERSION, 'files': self.files}
+            write_atomic(self.path, json.dumps(data, separators=(',', ':')).encode())
+        except OSError:
+            return
+        self._dirty = False
+
+
+def default_docs(root=HERE):
+    docs = set()
+    for pattern in DOC_PATTERNS:
+        docs.update(os.path.relpath(p, root) for p in glob.glob(os.path.join(root, pattern)))
+    return sorted(docs)
+
+
+def canonical_hashes(templates=None):
+    """{artifact: hash} of each deployment file as generate.py renders it."""
+    templates = templates or generate.Templates()
+    return {artifact: content_hash(templates.render(name)) for artifact, name in SOURCES.items()}
+
+
+def find_drift(index, docs, canonical):
+    """{artifact: {hash: [(doc, line, heading), ...]}} for every artifact with copies."""
+    copies = {artifact: {} for artifact in ARTIFACTS}
+    for rel in docs:
+        for block in index.blocks(rel):
+            if block['artifact']:
+                copies[block['artifact']].setdefault(block['hash'], []).append(
+                    (rel, block['line'], block['heading']))
+    for artifact, h in canonical.items():
+        copies[artifact].setdefault(h, []).insert(0, ('templates/' + SOURCES[artifact], 0, 'canonical'))
+    return copies
+
+
+def format_drift(copies, canonical, root=HERE, diff=False):
+    lines = []
+    for artifact, variants in copies.items():
+        count = sum(len(places) for places in variants.values()) - 1
+        if len(variants) == 1:
+            lines.append('✅ %s: %d embedded %s the template' % (
+                artifact, count, 'copy matches' if count == 1 else 'copies match'))
+            continue
+        drifted = sum(len(p) for h, p in variants.items() if h != canonical[artifact])
+        lines.append('❌ %s: %d embedded cop%s, %d disagree%s with the template' % (
+            artifact, count, 'y' if count == 1 else 'ies', drifted, 's' if drifted == 1 else ''))
+        for h, places in variants.items():
+            if h == canonical[artifact]:
+                continue
+            for rel, line, heading in places:
+                lines.append('   %s:%d (%s)' % (rel, line, heading))
+                if diff:
+                    source = generate.Templates().render(SOURCES[artifact])
+                    copy = block_text(os.path.join(root, rel), line)
+                    lines.extend('     ' + d.rstrip('\n') for d in difflib.unified_diff(
+                        normalize(source).splitlines(True), normalize(copy).splitlines(True),
+                        'templates/' + SOURCES[artifact], '%s:%d' % (rel, line), n=1))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find embedded deployment files that drifted.')
+    parser.add_argument('docs', nargs='*', metavar='DOC',
+                        help='documents to index (default: %s in the repo)' % ' '.join(DOC_PATTERNS))
+    parser.add_argument('--list', action='store_true', help='print the block index and exit')
+    parser.add_argument('--diff', action='store_true', help='show how each drifted copy differs')
+    parser.add_argument('--no-cache', dest='cache', action='store_false')
+    args = parser.parse_args(argv)
+
+    index = DriftIndex(HERE, args.cache)
+    docs = [os.path.relpath(os.path.abspath(d), HERE) for d in args.docs] or default_docs()
+    try:
+        if args.list:
+            for rel in docs:
+                for b in index.blocks(rel):
+                    print('%s:%d\t%s\t%s\t%s\t%s' % (rel, b['line'], b['lang'] or '-', b['hash'][:12],
+                                                     b['artifact'] or '-', b['heading']))
+            return 0
+        canonical = canonical_hashes()
+        copies = find_drift(index, docs, canonical)
+    except (OSError, generate.TemplateError) as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 2
+    finally:
+        index.save(keep=None if args.docs else docs)
+    print(format_drift(copies, canonical, HERE, args.diff))
+    return 1 if any(len(v) > 1 for v in copies.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# Single entry point that renders every generated artifact
+#
+# All deployment files live once, in templates/files/ (Dockerfile,
+# render.yaml, deploy.yml, gitignore, validate-setup.sh, deploy_client.py,
+# classify_changes.py).
+# The guides in templates/ embed them with an include directive on a line
+# of its own:
+#
+#   %%include files/Dockerfile%%
+#
+# The directive's indentation is applied to every included line, and
+# included templates may include others. Per-site values are written as
+# %%name%% (e.g. %%site%%, %%region%%); the checked-in guides are rendered
+# with DEFAULTS, the demo site's values.
+#
+# generate.py builds the dependency graph from templates to outputs and
+# only rewrites outputs whose rendered content hash differs from what is on
+# disk, via a temp file plus rename. A manifest of input hashes
+# (.generate-manifest.json, gitignored) lets it skip rendering outputs whose
+# templates have not changed at all, so editing one template touches only
+# the outputs that include it.
+#
+# Usage:
+#   python3 generate.py [OUTPUT ...] [--check] [--force] [--explain TEMPLATE]
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import stat
+import sys
+
+import php_tuning
+from validate_cache import write_atomic
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(HERE, 'templates')
+MANIFEST = '.generate-manifest.json'
+
+# output path (relative to the output directory) -> template name
+ARTIFACTS = {
+    'validate-setup.sh': 'files/validate-setup.sh',
+    'STEP_BY_STEP_GUIDE.txt': 'STEP_BY_STEP_GUIDE.txt',
+    'wordpress-demo-files.md': 'wordpress-demo-files.md',
+    'wordpress-render-demo.md': 'wordpress-render-demo.md',
+}
+
+# project path -> template, for tools that materialize a project (scaffold.py)
+PROJECT_FILES = {
+    'Dockerfile': 'files/Dockerfile',
+    'render.yaml': 'files/render.yaml',
+    '.github/workflows/deploy.yml': 'files/deploy.yml',
+    '.github/scripts/classify_changes.py': 'files/classify_changes.py',
+    '.github/scripts/deploy_client.py': 'files/deploy_client.py',
+    '.gitignore': 'files/gitignore',
+    'README.md': 'files/README.md',
+}
+
+# Dockerfile profile -> template. "boilerplate" is the Dockerfile the guides
+# walk through; "optimized" is a multi-stage build with BuildKit apt cache
+# mounts and COPY --chown, ordered so wp-content edits only rebuild the
+# final content layer (bench_dockerfile.py compares the two).
+DOCKERFILE_PROFILES = {
+    'boilerplate': 'files/Dockerfile',
+    'optimized': 'files/Dockerfile.optimized',
+}
+DEFAULT_PROFILE = 'boilerplate'
+
+# profile -> {project path: template}: files a profile's Dockerfile COPYs
+# besides wp-content. The optimized image carries PHP and Apache settings
+# sized for the plan (values from php_tuning.py) and the HTTP delivery
+# profile (compression, cache headers, ETags).
+PROFILE_FILES = {
+    'boilerplate': {},
+    'optimized': {
+        php_tuning.PHP_INI: 'files/php-tuning.ini',
+        php_tuning.MPM_CONF: 'files/mpm_prefork.conf',
+        'config/apache-delivery.conf': 'files/apache-delivery.conf',
+    },
+}
+
+# deploy mode -> {project path: template} overriding PROJECT_FILES. With
+# "hook" the workflow calls the deploy hook and Render builds the
+# Dockerfile; with "prebuilt" the workflow builds the image once (layers
+# cached in GitHub Actions), pushes it to GHCR tagged by commit, and has
+# Render deploy that tag through deploy_client.py.
+DEPLOY_MODES = {
+    'hook': {},
+    'prebuilt': {
+        'render.yaml': 'files/render.prebuilt.yaml',
+        '.github/workflows/deploy.yml': 'files/deploy.prebuilt.yml',
+    },
+}
+DEFAULT_DEPLOY = 'hook'
+
+# object cache -> {included template: template rendered in its place}. The
+# render.yaml templates include three slots that are empty by default (so
+# the guides are unaffected); "keyvalue" fills them with a Render Key Value
+# service, the web service's env vars pointing at it, and the wp-config
+# constants the Redis Object Cache plugin reads.
+OBJECT_CACHES = {
+    'none': {},
+    'keyvalue': {
+        'files/render-cache-service.yaml': 'files/render-cache-service.keyvalue.yaml',
+        'files/render-cache-env.yaml': 'files/render-cache-env.keyvalue.yaml',
+        'files/wp-config-cache.php': 'files/wp-config-cache.keyvalue.php',
+    },
+}
+DEFAULT_OBJECT_CACHE = 'none'
+
+# the demo site the checked-in guides describe
+DEFAULTS = {
+    'site': 'wordpress-demo',
+    'database': 'wordpress-db-demo',
+    'region': 'singapore',
+    'plan': 'free',
+    'disk_gb': '10',
+    'branch': 'main',
+    'repo': 'wordpress-render-demo',
+    'github_owner': 'YOUR-USERNAME',
+    'site_url': 'https://wordpress-demo-xxxxx.onrender.com',
+    'image': 'ghcr.io/your-username/wordpress-render-demo',
+    'cache': 'wordpress-cache-demo',
+    'cache_plan': 'free',
+    'cache_policy': 'allkeys-lru',
+}
+DEFAULTS.update(php_tuning.variables(DEFAULTS['plan']))
+
+INCLUDE = re.compile(r'^([ \t]*)%%include ([^%\s]+)%%[ \t]*$')
+VARIABLE = re.compile(r'%%([a-z_]+)%%')
+
+WRITTEN = 'written'
+UNCHANGED = 'unchanged'
+SKIPPED = 'skipped'
+STALE = 'stale'
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TemplateError(Exception):
+    pass
+
+
+class Templates:
+    """Template sources under `directory`, each read once."""
+
+    def __init__(self, directory=TEMPLATE_DIR):
+        self.directory = directory
+        self._text = {}
+
+    def text(self, name):
+        if name not in self._text:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, encoding='utf-8', newline='') as f:
+                    self._text[name] = f.read()
+            except OSError as e:
+                raise TemplateError('cannot read template %s: %s' % (name, e.strerror))
+        return self._text[name]
+
+    def includes(self, name):
+        """Templates `name` includes directly, in order."""
+        found = []
+        for line in self.text(name).splitlines():
+            match = INCLUDE.match(line)
+            if match and match.group(2) not in found:
+                found.append(match.group(2))
+        return found
+
+    def closure(self, name, _stack=()):
+        """`name` plus everything it includes, transitively."""
+        if name in _stack:
+            raise TemplateError('include cycle: %s' % ' -> '.join(_stack + (name,)))
+        names = [name]
+        for inc in self.includes(name):
+            for n in self.closure(inc, _stack + (name,)):
+                if n not in names:
+                    names.append(n)
+        return names
+
+    def iter_render(self, name, variables=None, overrides=None, _stack=()):
+        """Rendered lines of `name`, one at a time, with %%name%% filled from
+        `variables` (default DEFAULTS). Includes are streamed as well, so
+        memory does not grow with the size of the output. `overrides` maps
+        an included template to the one rendered in its place."""
+        if name in _stack:
+            raise TemplateError('include cycle: %s' % ' -> '.join(_stack + (name,)))
+        variables = DEFAULTS if variables is None else variables
+        overrides = overrides or {}
+
+        def substitute(match):
+            if match.group(1) not in variables:
+                raise TemplateError('%s: undefined variable %%%%%s%%%%' % (name, match.group(1)))
+            return str(variables[match.group(1)])
+
+        for line in self.text(name).splitlines(True):
+            match = INCLUDE.match(line.rstrip('\n'))
+            if not match:
+                yield VARIABLE.sub(substitute, line) if '%%' in line else line
+                continue
+            indent = match.group(1)
+            last = '\n'
+            included = overrides.get(match.group(2), match.group(2))
+            for last in self.iter_render(included, variables, overrides, _stack + (name,)):
+                yield indent + last if last.strip() else last
+            if line.endswith('\n') and not last.endswith('\n'):
+                yield '\n'
+
+    def render(self, name, variables=None, overrides=None):
+        return ''.join(self.iter_render(name, variables, overrides))
+
+
+def project_files(profile=DEFAULT_PROFILE, deploy=DEFAULT_DEPLOY):
+    """PROJECT_FILES with the Dockerfile (and config) of `profile` and the files of `deploy` mode."""
+    if profile not in DOCKERFILE_PROFILES:
+        raise TemplateError('unknown Dockerfile profile %r (one of %s)'
+                            % (profile, ', '.join(DOCKERFILE_PROFILES)))
+    if deploy not in DEPLOY_MODES:
+        raise TemplateError('unknown deploy mode %r (one of %s)' % (deploy, ', '.join(DEPLOY_MODES)))
+    files = dict(PROJECT_FILES)
+    files['Dockerfile'] = DOCKERFILE_PROFILES[profile]
+    files.update(PROFILE_FILES[profile])
+    files.update(DEPLOY_MODES[deploy])
+    return files
+
+
+def build_graph(templates, artifacts=None):
+    """{output: [template, ...]} — every template each output depends on."""
+    artifacts = ARTIFACTS if artifacts is None else artifacts
+    return {output: templates.closure(name) for output, name in artifacts.items()}
+
+
+def dependents(graph, template):
+    """Outputs that must be regenerated when `template` changes."""
+    return sorted(output for output, deps in graph.items() if template in deps)
+
+
+def _load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return sha256(f.read())
+    except OSError:
+        return None
+
+
+def write_if_changed(path, data):
+    """Atomically write bytes unless the file already holds them; True if written."""
+    if _file_hash(path) == sha256(data):
+        return False
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_atomic(path, data)
+    os.chmod(path, mode)
+    return True
+
+
+def generate(out_dir=HERE, outputs=None, check=False, force=False, templates=None, artifacts=None):
+    """Render the selected outputs; returns [(output, status), ...].
+
+    status is WRITTEN, UNCHANGED (rendered, identical on disk), SKIPPED
+    (no input changed since the last run) or, with check=True, STALE
+    (would be rewritten; nothing is written in check mode).
+    """
+    templates = templates or Templates()
+    artifacts = ARTIFACTS if artifacts is None else artifacts
+    selected = list(artifacts) if not outputs else list(outputs)
+    unknown = [o for o in selected if o not in artifacts]
+    if unknown:
+        raise TemplateError('unknown output(s): %s' % ', '.join(unknown))
+
+    graph = build_graph(templates, {o: artifacts[o] for o in selected})
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = _load_manifest(manifest_path)
+    statuses = []
+    for output in selected:
+        inputs = {name: sha256(templates.text(name).encode('utf-8')) for name in graph[output]}
+        inputs['%%defaults%%'] = sha256(json.dumps(DEFAULTS, sort_keys=True).encode())
+        path = os.path.join(out_dir, output)
+        on_disk = _file_hash(path)
+        known = manifest.get(output)
+        if not force and known and known.get('inputs') == inputs and known.get('output') == on_disk:
+            statuses.append((output, SKIPPED))
+            continue
+
+        data = templates.render(artifacts[output]).encode('utf-8')
+        if check:
+            statuses.append((output, STALE if sha256(data) != on_disk else UNCHANGED))
+            continue
+        written = write_if_changed(path, data)
+        manifest[output] = {'inputs': inputs, 'output': sha256(data)}
+        statuses.append((output, WRITTEN if written else UNCHANGED))
+
+    if not check:
+        try:
+            write_if_changed(manifest_path, (json.dumps(manifest, indent=1, sort_keys=True) + '\n').encode())
+        except OSError:
+            pass
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render generated artifacts from templates/.')
+    parser.add_argument('outputs', nargs='*', metavar='OUTPUT',
+                        help='outputs to render (default: all of %s)' % ', '.join(ARTIFACTS))
+    parser.add_argument('--out-dir', default=HERE, help='where outputs are written (default: repo root)')
+    parser.add_argument('--check', action='store_true',
+                        help='write nothing; exit 1 if any output is out of date')
+    parser.add_argument('--force', action='store_true', help='re-render even if no template changed')
+    parser.add_argument('--explain', metavar='TEMPLATE',
+                        help='list the outputs that depend on TEMPLATE and exit')
+    args = parser.parse_args(argv)
+
+    templates = Templates()
+    try:
+        if args.explain:
+            for output in dependents(build_graph(templates), args.explain):
+                print(output)
+            return 0
+        statuses = generate(args.out_dir, args.outputs, args.check, args.force, templates)
+    except TemplateError as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 2
+
+    icons = {WRITTEN: '✅ wrote', UNCHANGED: '·  unchanged', SKIPPED: '·  up to date', STALE: '❌ stale'}
+    for output, status in statuses:
+        print('%s %s' % (icons[status], output))
+    if args.check and any(status == STALE for _, status in statuses):
+        print('Run python3 generate.py to regenerate', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# In-process git repository inspection
+#
+# Answers "is this a git repository, which remotes does it have and which
+# branch is checked out" by reading .git/HEAD and .git/config directly,
+# including `.git` files (`gitdir: ...`) used by worktrees and submodules
+# and the `commondir` indirection of linked worktrees. No process is
+# spawned for ordinary layouts.
+#
+# Layouts this does not model (GIT_DIR/GIT_WORK_TREE in the environment,
+# config includes, per-worktree config, reftable refs) fall back to the
+# git binary.
+
+import os
+import re
+import subprocess
+
+
+class Unsupported(Exception):
+    """The repository layout needs the git binary to be interpreted correctly."""
+
+
+class RepoInfo:
+    def __init__(self, git_dir, common_dir, worktree, branch, head, remotes, via_git=False):
+        self.git_dir = git_dir          # per-worktree git dir (holds HEAD)
+        self.common_dir = common_dir    # shared git dir (holds config, refs)
+        self.worktree = worktree
+        self.branch = branch            # short branch name, None when detached
+        self.head = head                # commit sha if known, else None
+        self.remotes = remotes          # {name: url}
+        self.via_git = via_git          # True when the git binary was needed
+
+    def __repr__(self):
+        return 'RepoInfo(%r, branch=%r, remotes=%r)' % (self.worktree, self.branch, sorted(self.remotes))
+
+
+def _read(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def find_git_dir(start):
+    """(git_dir, worktree) for the repository containing `start`, or None."""
+    path = os.path.abspath(start)
+    while True:
+        dotgit = os.path.join(path, '.git')
+        if os.path.isdir(dotgit):
+            return dotgit, path
+        if os.path.isfile(dotgit):
+            text = _read(dotgit).strip()
+            if not text.startswith('gitdir:'):
+                raise Unsupported('unrecognized .git file in %s' % path)
+            target = text[len('gitdir:'):].strip()
+            if not os.path.isabs(target):
+                target = os.path.normpath(os.path.join(path, target))
+            if not os.path.isdir(target):
+                raise Unsupported('.git file points to missing %s' % target)
+            return target, path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+_SECTION = re.compile(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]\s*(.*)$')
+_KEY = re.compile(r'^([A-Za-z][A-Za-z0-9-]*)\s*(?:=\s*(.*))?$')
+
+
+def _value(raw):
+    """Unquote and unescape a config value, dropping trailing comments."""
+    out, quoted, i = [], False, 0
+    while i < len(raw):
+        c = raw[i]
+        if c == '"':
+            quoted = not quoted
+        elif c == '\\' and i + 1 < len(raw):
+            i += 1
+            out.append({'n': '\n', 't': '\t', 'b': '\b'}.get(raw[i], raw[i]))
+        elif c in '#;' and not quoted:
+            break
+        else:
+            out.append(c)
+        i += 1
+    return ''.join(out).strip()
+
+
+def parse_config(text):
+    """{(section, subsection): {key: [values]}} from git config syntax.
+
+    Section and key names are lower-cased; subsections keep their case.
+    """
+    config = {}
+    current = None
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        i += 1
+        # continuation lines
+        while line.endswith('\\') and not line.endswith('\\\\') and i < len(lines):
+            line = line[:-1] + lines[i].strip()
+            i += 1
+        if not line or line[0] in '#;':
+            continue
+        if line.startswith('['):
+            match = _SECTION.match(line)
+            if not match:
+                raise Unsupported('cannot parse config section %r' % line)
+            name, sub, rest = match.groups()
+            if sub is None and '.' in name:
+                # legacy [section.subsection] form
+                name, _, sub = name.partition('.')
+            current = (name.lower(), sub.replace('\\"', '"').replace('\\\\', '\\') if sub else sub)
+            config.setdefault(current, {})
+            line = rest.strip()
+            if not line or line[0] in '#;':
+                continue
+        if current is None:
+            raise Unsupported('config entry outside a section')
+        match = _KEY.match(line)
+        if not match:
+            raise Unsupported('cannot parse config line %r' % line)
+        key, raw = match.groups()
+        config[current].setdefault(key.lower(), []).append('true' if raw is None else _value(raw))
+    return config
+
+
+def _head(git_dir, common_dir):
+    """(branch, sha) from HEAD; branch is None when detached."""
+    text = _read(os.path.join(git_dir, 'HEAD')).strip()
+    if not text.startswith('ref:'):
+        return None, text or None
+    ref = text[4:].strip()
+    branch = ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else None
+    sha = None
+    for base in (git_dir, common_dir):
+        try:
+            sha = _read(os.path.join(base, ref)).strip() or None
+            break
+        except OSError:
+            continue
+    if sha is None:
+        try:
+            for line in _read(os.path.join(common_dir, 'packed-refs')).splitlines():
+                if line.endswith(' ' + ref):
+                    sha = line.split()[0]
+                    break
+        except OSError:
+            pass
+    return branch, sha
+
+
+def inspect_files(start):
+    """RepoInfo read straight from the repository files, or None outside a repo.
+
+    Raises Unsupported for layouts that need the git binary.
+    """
+    if os.environ.get('GIT_DIR') or os.environ.get('GIT_WORK_TREE'):
+        raise Unsupported('GIT_DIR/GIT_WORK_TREE set')
+    found = find_git_dir(start)
+    if found is None:
+        return None
+    git_dir, worktree = found
+    common_dir = git_dir
+    commondir_file = os.path.join(git_dir, 'commondir')
+    if os.path.isfile(commondir_file):
+        common_dir = os.path.normpath(os.path.join(git_dir, _read(commondir_file).strip()))
+
+    try:
+        config = parse_config(_read(os.path.join(common_dir, 'config')))
+    except OSError:
+        raise Unsupported('no readable config in %s' % common_dir)
+    if any(section in ('include', 'includeif') for section, _ in config):
+        raise Unsupported('config includes')
+    extensions = config.get(('extensions', None), {})
+    if 'worktreeconfig' in extensions or extensions.get('refstorage', ['files'])[-1] != 'files':
+        raise Unsupported('repository extensions')
+    core = config.get(('core', None), {})
+    if 'worktree' in core:
+        raise Unsupported('core.worktree')
+
+    branch, head = _head(git_dir, common_dir)
+    remotes = {}
+    for (section, sub), values in config.items():
+        if section == 'remote' and sub:
+            urls = values.get('url')
+            remotes[sub] = urls[-1] if urls else ''
+    return RepoInfo(git_dir, common_dir, worktree, branch, head, remotes)
+
+
+def _git(start, *args):
+    try:
+        proc = subprocess.run(
+            ('git',) + args, cwd=start,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+    except OSError:
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def inspect_git(start):
+    """RepoInfo obtained from the git binary (fallback), or None outside a repo."""
+    out = _git(start, 'rev-parse', '--absolute-git-dir', '--git-common-dir', '--show-toplevel')
+    if out is None:
+        return None
+    parts = out.splitlines() + ['', '', '']
+    git_dir, common_dir, worktree = parts[0], parts[1], parts[2] or None
+    if common_dir and not os.path.isabs(common_dir):
+        common_dir = os.path.abspath(os.path.join(start, common_dir))
+    branch = (_git(start, 'symbolic-ref', '-q', '--short', 'HEAD') or '').strip() or None
+    head = (_git(start, 'rev-parse', '-q', '--verify', 'HEAD') or '').strip() or None
+    remotes = {}
+    for line in (_git(start, 'config', '--get-regexp', r'^remote\..*\.url$') or '').splitlines():
+        key, _, url = line.partition(' ')
+        remotes[key[len('remote.'):-len('.url')]] = url
+    for name in (_git(start, 'remote') or '').split():
+        remotes.setdefault(name, '')
+    return RepoInfo(git_dir, common_dir or git_dir, worktree, branch, head, remotes, via_git=True)
+
+
+def inspect(start='.'):
+    """RepoInfo for the repository containing `start`, or None outside a repo."""
+    try:
+        return inspect_files(start)
+    except (Unsupported, OSError):
+        return inspect_git(start)
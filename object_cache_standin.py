@@ -0,0 +1,820 @@
+#!/usr/bin/env python3
+# Local stand-in for WordPress with and without the Key Value object cache
+#
+# Plays both ends of render.yaml's object cache wiring on 127.0.0.1:
+#
+#   Key Value   a Redis-compatible server (RESP: GET, MGET, SET [EX], what
+#               the drop-in's page views send) with maxmemory and its
+#               eviction policies
+#   WordPress   the database lookups of a page view and the object cache in
+#               front of them, as WP_Object_Cache and the Redis Object Cache
+#               drop-in make them: autoloaded options, single options and
+#               transients, the main and sidebar queries (cached by
+#               last_changed since WordPress 6.1), and post, meta, term,
+#               user and comment caches primed in batches
+#
+# MySQL is an in-memory SQLite database holding a sample site, and every
+# query counts, like $wpdb->num_queries. The key prefix, TTL cap, timeouts
+# and eviction policy are read from the rendered render.yaml and its
+# WORDPRESS_CONFIG_EXTRA; host and port are the stand-in's own, as
+# fromService would set them. One sequence of page views (home page,
+# category archives, single posts, newest most popular) runs
+#
+#   without a persistent object cache (WordPress's per-request cache only)
+#   with the Key Value service, cold (empty) and then warm
+#   with maxmemory at a third of the warm working set, under the configured
+#   policy and under the other of allkeys-lru/noeviction
+#
+# and after each a post is published, to check the home page lists it.
+# Fails unless warm pages run fewer queries than uncached ones, and the
+# configured policy keeps the site cached and fresh under memory pressure.
+# Eviction is exact LRU; Redis samples keys, which evicts nearly the same.
+#
+# Usage:
+#   python3 object_cache_standin.py [--render-yaml render.yaml] [--views N]
+
+import argparse
+import collections
+import datetime
+import hashlib
+import itertools
+import json
+import random
+import re
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+
+import generate
+
+RENDER_TEMPLATE = 'files/render.yaml'
+DEFINE = re.compile(r"define\(\s*'(WP_REDIS_\w+)'\s*,\s*(.+?)\s*\);")
+GETENV = re.compile(r"^(?:\(int\)\s*)?getenv\('\w+'\)$")
+POLICY_LINE = re.compile(r'^\s*maxmemoryPolicy:\s*(\S+)\s*$', re.M)
+
+MAXMEMORY_MB = 25       # Render's free Key Value instance
+ENTRY_OVERHEAD = 64     # bytes Redis spends per key beyond the key and value
+PRESSURE = 3            # pressure runs get 1/PRESSURE of the warm working set
+VIEWS = 300
+POPULARITY = 0.6        # Pareto shape of single-post popularity, newest first
+
+POSTS = 400
+PER_PAGE = 10
+META_PER_POST = 8
+AUTHORS = 6
+COMMENTS = 1500
+CATEGORIES = ('news', 'guides', 'releases', 'events', 'community', 'security', 'hosting', 'themes')
+NEW_TITLE = 'Freshly published'
+WORDS = ('render', 'docker', 'wordpress', 'mysql', 'disk', 'cache', 'deploy', 'plugin', 'theme', 'apache',
+         'region', 'service', 'image', 'build', 'query', 'option', 'page', 'post', 'blueprint', 'volume')
+
+MISS = object()
+
+
+class ConfigError(Exception):
+    pass
+
+
+class CacheError(Exception):
+    pass
+
+
+# --- Key Value -------------------------------------------------------------
+
+def _bulk(value):
+    if value is None:
+        return b'$-1\r\n'
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+def _read_command(rfile):
+    """[arg, ...] of the next RESP command (or inline command); None at EOF."""
+    line = rfile.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int(rfile.readline()[1:])
+        args.append(rfile.read(size + 2)[:-2])
+    return args
+
+
+class KeyValue(socketserver.ThreadingTCPServer):
+    """Enough of Redis for the object cache: one keyspace, TTLs, maxmemory."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, maxmemory=MAXMEMORY_MB << 20, policy='allkeys-lru'):
+        super().__init__(('127.0.0.1', 0), RespHandler)
+        self.maxmemory = maxmemory
+        self.policy = policy
+        self.data = collections.OrderedDict()   # key -> (value, expires at), least recently used first
+        self.used = 0
+        self.evicted = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def _drop(self, key):
+        value, _ = self.data.pop(key)
+        self.used -= len(key) + len(value) + ENTRY_OVERHEAD
+
+    def _get(self, key, now):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] and entry[1] <= now:
+            self._drop(key)
+            return None
+        self.data.move_to_end(key)
+        return entry[0]
+
+    def _evict(self):
+        """Free memory down to maxmemory, as Redis does before a write; False if the policy cannot."""
+        volatile = self.policy.startswith('volatile-')
+        while self.maxmemory and self.used > self.maxmemory:
+            if self.policy == 'noeviction':
+                return False
+            victim = next((k for k, (_, expires) in self.data.items() if expires or not volatile), None)
+            if victim is None:
+                return False
+            self._drop(victim)
+            self.evicted += 1
+        return True
+
+    def _set(self, args, now):
+        key, value = args[0], args[1]
+        expires = now + int(args[3]) if len(args) >= 4 and args[2].upper() == b'EX' else 0
+        if not self._evict():
+            self.rejected += 1
+            return b"-OOM command not allowed when used memory > 'maxmemory'.\r\n"
+        if key in self.data:
+            self._drop(key)
+        self.data[key] = (value, expires)
+        self.used += len(key) + len(value) + ENTRY_OVERHEAD
+        return b'+OK\r\n'
+
+    def command(self, args):
+        """RESP reply to one command."""
+        name = args[0].upper() if args else b''
+        now = time.time()
+        with self.lock:
+            if name == b'GET' and len(args) == 2:
+                return _bulk(self._get(args[1], now))
+            if name == b'MGET' and len(args) > 1:
+                return b'*%d\r\n' % (len(args) - 1) + b''.join(_bulk(self._get(k, now)) for k in args[1:])
+            if name == b'SET' and len(args) >= 3:
+                return self._set(args[1:], now)
+        return b"-ERR unknown command or wrong number of arguments for '%s'\r\n" % name.lower()
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        while True:
+            try:
+                args = _read_command(self.rfile)
+            except (ValueError, OSError):
+                return
+            if args is None:
+                return
+            self.wfile.write(self.server.command(args))
+
+
+# --- WordPress -------------------------------------------------------------
+
+def _encode(args):
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        arg = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+        parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(parts)
+
+
+def _read_reply(reader):
+    """One reply; an error reply comes back as a CacheError instance."""
+    line = reader.readline()
+    if not line:
+        raise OSError('connection closed')
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest.decode('utf-8')
+    if kind == b'-':
+        return CacheError(rest.decode('utf-8'))
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        size = int(rest)
+        return None if size < 0 else reader.read(size + 2)[:-2]
+    if kind == b'*':
+        return [_read_reply(reader) for _ in range(int(rest))]
+    raise OSError('bad reply %r' % line)
+
+
+class Redis:
+    """RESP client with the drop-in's connect and read timeouts."""
+
+    def __init__(self, host, port, timeout=1.0, read_timeout=1.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(read_timeout)
+        self.reader = self.sock.makefile('rb')
+        self.calls = 0      # round trips
+
+    def call(self, *args):
+        self.calls += 1
+        self.sock.sendall(_encode(args))
+        reply = _read_reply(self.reader)
+        if isinstance(reply, CacheError):
+            raise reply
+        return reply
+
+    def pipeline(self, commands):
+        """Send all commands, then read all replies: one round trip."""
+        self.calls += 1
+        self.sock.sendall(b''.join(_encode(c) for c in commands))
+        return [_read_reply(self.reader) for _ in commands]
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class ObjectCache:
+    """wp_cache_*: a per-request array in front of an optional Key Value connection.
+
+    `connect` opens the connection; like PHP, each page view opens its own.
+    Errors from the server (e.g. OOM) are counted and the lookup treated as
+    a miss, as the drop-in does.
+    """
+
+    def __init__(self, connect=None, prefix='', maxttl=0):
+        self.connect = connect
+        self.prefix = prefix
+        self.maxttl = maxttl
+        self.redis = None
+        self.local = {}
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def persistent(self):
+        return self.connect is not None
+
+    def begin(self):
+        self.local = {}
+        if self.connect:
+            try:
+                self.redis = self.connect()
+            except OSError:
+                self.errors += 1
+
+    def end(self):
+        if self.redis is not None:
+            self.calls += self.redis.calls
+            self.redis.close()
+            self.redis = None
+
+    def _key(self, group, key):
+        return '%s%s:%s' % (self.prefix, group, key)
+
+    def _ttl(self, ttl):
+        return min(ttl or self.maxttl, self.maxttl) if self.maxttl else ttl
+
+    def _remote(self, *args):
+        if self.redis is None:
+            return None
+        try:
+            return self.redis.call(*args)
+        except CacheError:
+            self.errors += 1
+        except OSError:
+            self.errors += 1
+            self.end()
+        return None
+
+    def get(self, group, key):
+        k = self._key(group, key)
+        if k in self.local:
+            return self.local[k]
+        raw = self._remote('GET', k)
+        if raw is None:
+            return MISS
+        value = self.local[k] = json.loads(raw)
+        return value
+
+    def get_multiple(self, group, keys):
+        """{key: value} of the keys found, with one MGET for those not cached in this request."""
+        found, wanted = {}, []
+        for key in keys:
+            k = self._key(group, key)
+            if k in self.local:
+                found[key] = self.local[k]
+            else:
+                wanted.append(key)
+        if wanted:
+            raws = self._remote('MGET', *[self._key(group, key) for key in wanted]) or ()
+            for key, raw in zip(wanted, raws):
+                if raw is not None:
+                    found[key] = self.local[self._key(group, key)] = json.loads(raw)
+        return found
+
+    def set(self, group, key, value, ttl=0):
+        self.set_multiple(group, {key: value}, ttl)
+
+    def set_multiple(self, group, items, ttl=0):
+        ttl = self._ttl(ttl)
+        commands = []
+        for key, value in items.items():
+            k = self._key(group, key)
+            self.local[k] = value
+            commands.append(('SET', k, json.dumps(value, separators=(',', ':')))
+                            + (('EX', ttl) if ttl else ()))
+        if self.redis is None or not commands:
+            return
+        try:
+            replies = self.redis.pipeline(commands)
+        except OSError:
+            self.errors += 1
+            self.end()
+            return
+        self.errors += sum(isinstance(r, CacheError) for r in replies)
+
+
+def _ids(rows):
+    return [row[0] for row in rows]
+
+
+def _in(values):
+    return ','.join('?' * len(values))
+
+
+class WordPress:
+    """The lookups of a page view, each through the object cache first."""
+
+    def __init__(self, db, cache):
+        self.db = db
+        self.cache = cache
+        self.queries = 0
+        self.ticks = itertools.count(1)
+
+    def query(self, sql, params=()):
+        self.queries += 1
+        return self.db.execute(sql, params).fetchall()
+
+    def alloptions(self):
+        options = self.cache.get('options', 'alloptions')
+        if options is MISS:
+            options = dict(self.query("SELECT option_name, option_value FROM wp_options WHERE autoload = 'yes'"))
+            self.cache.set('options', 'alloptions', options)
+        return options
+
+    def option(self, name):
+        options = self.alloptions()
+        if name in options:
+            return options[name]
+        notoptions = self.cache.get('options', 'notoptions')
+        notoptions = {} if notoptions is MISS else notoptions
+        if name in notoptions:
+            return None
+        value = self.cache.get('options', name)
+        if value is MISS:
+            rows = self.query('SELECT option_value FROM wp_options WHERE option_name = ? LIMIT 1', (name,))
+            if not rows:
+                notoptions[name] = True
+                self.cache.set('options', 'notoptions', notoptions)
+                return None
+            value = rows[0][0]
+            self.cache.set('options', name, value)
+        return value
+
+    def transient(self, name, build, ttl):
+        """get_transient() or build and set_transient(): the object cache when persistent, else wp_options."""
+        if self.cache.persistent:
+            value = self.cache.get('transient', name)
+            if value is MISS:
+                value = build()
+                self.cache.set('transient', name, value, ttl)
+            return value
+        timeout = self.option('_transient_timeout_' + name)
+        value = self.option('_transient_' + name) if timeout is not None else None
+        if value is not None and float(timeout) > time.time():
+            return json.loads(value)
+        value = build()
+        for option, stored in (('_transient_timeout_' + name, str(time.time() + ttl)),
+                               ('_transient_' + name, json.dumps(value))):
+            self.query("INSERT OR REPLACE INTO wp_options VALUES (?, ?, 'no')", (option, stored))
+            self.cache.set('options', option, stored)
+        return value
+
+    def last_changed(self, group):
+        value = self.cache.get(group, 'last_changed')
+        if value is MISS:
+            value = self.touch(group)
+        return value
+
+    def touch(self, group):
+        """wp_cache_set_last_changed(): every query cached for the group goes stale."""
+        value = '%d' % next(self.ticks)
+        self.cache.set(group, 'last_changed', value)
+        return value
+
+    def _query_key(self, kind, args, group):
+        digest = hashlib.md5(json.dumps(args, sort_keys=True).encode('utf-8')).hexdigest()
+        return '%s:%s:%s' % (kind, digest, self.last_changed(group))
+
+    def posts_query(self, args, sql, params, count_sql=None):
+        """WP_Query: post IDs through the post-queries cache, then the posts primed."""
+        key = self._query_key('wp_query', args, 'posts')
+        ids = self.cache.get('post-queries', key)
+        if ids is MISS:
+            ids = _ids(self.query(sql, params))
+            if count_sql:
+                self.query(count_sql, params)   # SELECT FOUND_ROWS()
+            self.cache.set('post-queries', key, ids)
+        return self.prime_posts(ids)
+
+    def prime_posts(self, ids):
+        """_prime_post_caches(): posts, their meta and their terms, missing ones in one query each."""
+        posts = self.cache.get_multiple('posts', ids)
+        missing = [i for i in ids if i not in posts]
+        if missing:
+            rows = self.query('SELECT ID, post_author, post_date, post_title, post_content FROM wp_posts '
+                              'WHERE ID IN (%s)' % _in(missing), missing)
+            fetched = {row[0]: {'id': row[0], 'author': row[1], 'date': row[2], 'title': row[3],
+                                'content': row[4]} for row in rows}
+            self.cache.set_multiple('posts', fetched)
+            posts.update(fetched)
+
+        missing = [i for i in ids if i not in self.cache.get_multiple('post_meta', ids)]
+        if missing:
+            meta = {i: {} for i in missing}
+            for post_id, key, value in self.query('SELECT post_id, meta_key, meta_value FROM wp_postmeta '
+                                                  'WHERE post_id IN (%s)' % _in(missing), missing):
+                meta[post_id][key] = value
+            self.cache.set_multiple('post_meta', meta)
+
+        relationships = self.cache.get_multiple('category_relationships', ids)
+        missing = [i for i in ids if i not in relationships]
+        if missing:
+            fetched = {i: [] for i in missing}
+            for object_id, term_id in self.query('SELECT object_id, term_id FROM wp_term_relationships '
+                                                 'WHERE object_id IN (%s)' % _in(missing), missing):
+                fetched[object_id].append(term_id)
+            self.cache.set_multiple('category_relationships', fetched)
+            relationships.update(fetched)
+        self.terms(sorted({t for i in ids for t in relationships.get(i, ())}))
+        return [posts[i] for i in ids if i in posts]
+
+    def terms(self, ids):
+        found = self.cache.get_multiple('terms', ids)
+        missing = [i for i in ids if i not in found]
+        if missing:
+            fetched = {row[0]: {'id': row[0], 'name': row[1], 'slug': row[2]} for row in
+                       self.query('SELECT term_id, name, slug FROM wp_terms WHERE term_id IN (%s)' % _in(missing),
+                                  missing)}
+            self.cache.set_multiple('terms', fetched)
+            found.update(fetched)
+        return [found[i] for i in ids if i in found]
+
+    def users(self, ids):
+        """cache_users(): users and their meta, missing ones in one query each."""
+        found = self.cache.get_multiple('users', ids)
+        missing = [i for i in ids if i not in found]
+        if missing:
+            fetched = {row[0]: {'id': row[0], 'login': row[1], 'name': row[2]} for row in
+                       self.query('SELECT ID, user_login, display_name FROM wp_users WHERE ID IN (%s)'
+                                  % _in(missing), missing)}
+            meta = {i: {} for i in missing}
+            for user_id, key, value in self.query('SELECT user_id, meta_key, meta_value FROM wp_usermeta '
+                                                  'WHERE user_id IN (%s)' % _in(missing), missing):
+                meta[user_id][key] = value
+            self.cache.set_multiple('users', fetched)
+            self.cache.set_multiple('user_meta', meta)
+            found.update(fetched)
+        return [found[i] for i in ids if i in found]
+
+    def comments(self, args, sql, params):
+        """WP_Comment_Query: IDs cached by last_changed, then the comments primed."""
+        key = self._query_key('get_comments', args, 'comment')
+        ids = self.cache.get('comment-queries', key)
+        if ids is MISS:
+            ids = _ids(self.query(sql, params))
+            self.cache.set('comment-queries', key, ids)
+        found = self.cache.get_multiple('comment', ids)
+        missing = [i for i in ids if i not in found]
+        if missing:
+            fetched = {row[0]: {'id': row[0], 'post': row[1], 'author': row[2], 'content': row[3]} for row in
+                       self.query('SELECT comment_ID, comment_post_ID, comment_author, comment_content '
+                                  'FROM wp_comments WHERE comment_ID IN (%s)' % _in(missing), missing)}
+            self.cache.set_multiple('comment', fetched)
+            found.update(fetched)
+        return [found[i] for i in ids if i in found]
+
+    def _headlines(self):
+        return self.query("SELECT COUNT(*), MAX(post_date) FROM wp_posts WHERE post_status = 'publish'")[0]
+
+    def view(self, path):
+        """One page view; returns the titles in its main content."""
+        self.cache.begin()
+        try:
+            self.alloptions()
+            self.option('can_compress_scripts')             # not autoloaded
+            self.option('recovery_mode_email_last_sent')    # does not exist: notoptions
+            self.transient('feed_headlines', self._headlines, 12 * 3600)
+            if path.startswith('/category/'):
+                slug = path.rsplit('/', 1)[1]
+                posts = self.posts_query(
+                    {'category_name': slug, 'posts_per_page': PER_PAGE},
+                    'SELECT p.ID FROM wp_posts p JOIN wp_term_relationships r ON r.object_id = p.ID '
+                    'JOIN wp_terms t ON t.term_id = r.term_id WHERE t.slug = ? AND p.post_status = ? '
+                    'ORDER BY p.post_date DESC LIMIT %d' % PER_PAGE, (slug, 'publish'),
+                    'SELECT COUNT(*) FROM wp_posts p JOIN wp_term_relationships r ON r.object_id = p.ID '
+                    'JOIN wp_terms t ON t.term_id = r.term_id WHERE t.slug = ? AND p.post_status = ?')
+            elif path.startswith('/?p='):
+                post_id = int(path[4:])
+                posts = self.posts_query({'p': post_id}, 'SELECT ID FROM wp_posts WHERE ID = ? AND post_status = ?',
+                                         (post_id, 'publish'))
+                self.comments({'post_id': post_id}, 'SELECT comment_ID FROM wp_comments WHERE comment_post_ID = ? '
+                              'ORDER BY comment_date', (post_id,))
+            else:
+                posts = self.posts_query(
+                    {'paged': 1, 'posts_per_page': PER_PAGE},
+                    'SELECT ID FROM wp_posts WHERE post_status = ? ORDER BY post_date DESC LIMIT %d' % PER_PAGE,
+                    ('publish',), 'SELECT COUNT(*) FROM wp_posts WHERE post_status = ?')
+            self.users(sorted({p['author'] for p in posts}))
+
+            # sidebar widgets: recent posts, categories, recent comments
+            self.posts_query({'posts_per_page': 5, 'no_found_rows': True},
+                             'SELECT ID FROM wp_posts WHERE post_status = ? ORDER BY post_date DESC LIMIT 5',
+                             ('publish',))
+            key = self._query_key('get_terms', {'taxonomy': 'category'}, 'terms')
+            ids = self.cache.get('terms', key)
+            if ids is MISS:
+                ids = _ids(self.query('SELECT t.term_id FROM wp_terms t JOIN wp_term_relationships r '
+                                      'ON r.term_id = t.term_id GROUP BY t.term_id ORDER BY t.name'))
+                self.cache.set('terms', key, ids)
+            self.terms(ids)
+            self.comments({'number': 5}, 'SELECT comment_ID FROM wp_comments ORDER BY comment_date DESC LIMIT 5', ())
+            return [p['title'] for p in posts]
+        finally:
+            self.cache.end()
+
+    def publish(self, title):
+        """wp_insert_post() of a new newest post, and the cache invalidation it does."""
+        self.cache.begin()
+        try:
+            self.alloptions()
+            date = self.query('SELECT MAX(post_date) FROM wp_posts')[0][0]
+            date = (datetime.datetime.fromisoformat(date) + datetime.timedelta(hours=1)).isoformat(' ')
+            post_id = self.db.execute("INSERT INTO wp_posts (post_author, post_date, post_title, post_content, "
+                                      "post_status) VALUES (1, ?, ?, '', 'publish')", (date, title)).lastrowid
+            self.db.execute('INSERT INTO wp_term_relationships VALUES (?, 1)', (post_id,))
+            self.queries += 2
+            self.touch('posts')
+            self.touch('terms')
+            return post_id
+        finally:
+            self.cache.end()
+
+
+def make_db(seed=11):
+    """The sample site: options, authors, categories, posts with meta, comments."""
+    rng = random.Random(seed)
+
+    def text(words):
+        return ' '.join(rng.choices(WORDS, k=words))
+
+    db = sqlite3.connect(':memory:', check_same_thread=False)
+    db.executescript('''
+        CREATE TABLE wp_options (option_name TEXT PRIMARY KEY, option_value TEXT, autoload TEXT);
+        CREATE INDEX autoload ON wp_options (autoload);
+        CREATE TABLE wp_posts (ID INTEGER PRIMARY KEY, post_author INTEGER, post_date TEXT, post_title TEXT,
+                               post_content TEXT, post_status TEXT);
+        CREATE INDEX type_status_date ON wp_posts (post_status, post_date);
+        CREATE TABLE wp_postmeta (meta_id INTEGER PRIMARY KEY, post_id INTEGER, meta_key TEXT, meta_value TEXT);
+        CREATE INDEX post_id ON wp_postmeta (post_id);
+        CREATE TABLE wp_terms (term_id INTEGER PRIMARY KEY, name TEXT, slug TEXT);
+        CREATE TABLE wp_term_relationships (object_id INTEGER, term_id INTEGER, PRIMARY KEY (object_id, term_id));
+        CREATE TABLE wp_users (ID INTEGER PRIMARY KEY, user_login TEXT, display_name TEXT);
+        CREATE TABLE wp_usermeta (umeta_id INTEGER PRIMARY KEY, user_id INTEGER, meta_key TEXT, meta_value TEXT);
+        CREATE TABLE wp_comments (comment_ID INTEGER PRIMARY KEY, comment_post_ID INTEGER, comment_author TEXT,
+                                  comment_date TEXT, comment_content TEXT);
+        CREATE INDEX comment_post_ID ON wp_comments (comment_post_ID);
+    ''')
+    options = [('siteurl', 'https://wordpress-demo.onrender.com', 'yes'), ('can_compress_scripts', '1', 'no')]
+    options += [('option_%d' % i, text(30), 'yes') for i in range(80)]
+    options += [('plugin_data_%d' % i, text(60), 'no') for i in range(40)]
+    db.executemany('INSERT INTO wp_options VALUES (?, ?, ?)', options)
+    db.executemany('INSERT INTO wp_users VALUES (?, ?, ?)',
+                   [(i, 'author%d' % i, 'Author %d' % i) for i in range(1, AUTHORS + 1)])
+    db.executemany('INSERT INTO wp_usermeta (user_id, meta_key, meta_value) VALUES (?, ?, ?)',
+                   [(i, key, text(5)) for i in range(1, AUTHORS + 1)
+                    for key in ('nickname', 'description', 'wp_capabilities', 'wp_user_level', 'locale')])
+    db.executemany('INSERT INTO wp_terms VALUES (?, ?, ?)',
+                   [(i, slug.capitalize(), slug) for i, slug in enumerate(CATEGORIES, 1)])
+    start = datetime.datetime(2025, 1, 1)
+    for post_id in range(1, POSTS + 1):
+        date = (start + datetime.timedelta(hours=18 * post_id)).isoformat(' ')
+        db.execute("INSERT INTO wp_posts VALUES (?, ?, ?, ?, ?, 'publish')",
+                   (post_id, rng.randint(1, AUTHORS), date, 'Post %d: %s' % (post_id, text(4)), text(300)))
+        db.executemany('INSERT INTO wp_postmeta (post_id, meta_key, meta_value) VALUES (?, ?, ?)',
+                       [(post_id, '_meta_%d' % k, text(6)) for k in range(META_PER_POST)])
+        db.executemany('INSERT INTO wp_term_relationships VALUES (?, ?)',
+                       [(post_id, t) for t in rng.sample(range(1, len(CATEGORIES) + 1), 2)])
+    db.executemany('INSERT INTO wp_comments (comment_post_ID, comment_author, comment_date, comment_content) '
+                   'VALUES (?, ?, ?, ?)',
+                   [(rng.randint(1, POSTS), text(2), (start + datetime.timedelta(minutes=500 * i)).isoformat(' '),
+                     text(40)) for i in range(COMMENTS)])
+    db.commit()
+    return db
+
+
+def clone(db):
+    """A private copy of the sample site, for a scenario that publishes into it."""
+    copy = sqlite3.connect(':memory:', check_same_thread=False)
+    db.backup(copy)
+    return copy
+
+
+def page_views(count, seed=7):
+    """Paths of `count` page views: a fifth home page, a tenth archives, the rest single posts."""
+    rng = random.Random(seed)
+    views = []
+    for _ in range(count):
+        r = rng.random()
+        if r < 0.2:
+            views.append('/')
+        elif r < 0.3:
+            views.append('/category/%s' % rng.choice(CATEGORIES))
+        else:
+            rank = POSTS + 1
+            while rank > POSTS:
+                rank = int(rng.paretovariate(POPULARITY))
+            views.append('/?p=%d' % (POSTS + 1 - rank))
+    return views
+
+
+# --- scenarios -------------------------------------------------------------
+
+def _php_value(expr):
+    expr = expr.strip()
+    if expr[:1] in ('"', "'"):
+        return expr[1:-1]
+    if GETENV.match(expr):
+        return None     # from the environment fromService sets: the stand-in's own address
+    try:
+        return float(expr) if '.' in expr else int(expr)
+    except ValueError:
+        return expr
+
+
+def cache_config(render_text):
+    """Object cache settings from render.yaml text: the WP_REDIS_* defines and the Key Value policy."""
+    defines = {name: _php_value(expr) for name, expr in DEFINE.findall(render_text)}
+    if 'WP_REDIS_HOST' not in defines:
+        raise ConfigError('render.yaml does not configure an object cache (scaffold.py --object-cache)')
+    policy = POLICY_LINE.search(render_text)
+    return {
+        'prefix': defines.get('WP_REDIS_PREFIX') or '',
+        'maxttl': int(defines.get('WP_REDIS_MAXTTL') or 0),
+        'timeout': float(defines.get('WP_REDIS_TIMEOUT') or 1),
+        'read_timeout': float(defines.get('WP_REDIS_READ_TIMEOUT') or 1),
+        # Render's default when a Blueprint sets none
+        'policy': policy.group(1) if policy else 'allkeys-lru',
+    }
+
+
+class Outcome:
+    __slots__ = ('label', 'cold', 'warm', 'fresh', 'evicted', 'rejected', 'used', 'errors')
+
+    def __init__(self, label):
+        self.label = label
+        self.cold = self.warm = None    # (queries, cache round trips) per page
+        self.fresh = False
+        self.evicted = self.rejected = self.used = self.errors = 0
+
+
+def _connector(server, config):
+    """Opens a connection to `server` with the configured timeouts, as the drop-in does per request."""
+    return lambda: Redis('127.0.0.1', server.port, config['timeout'], config['read_timeout'])
+
+
+def run_scenario(label, db, config, views, policy=None, maxmemory=MAXMEMORY_MB << 20):
+    """Outcome of the page views cold, warm and after publishing; no Key Value when `policy` is None."""
+    outcome = Outcome(label)
+    server = KeyValue(maxmemory, policy).start() if policy else None
+    connect = _connector(server, config) if server else None
+    site = WordPress(clone(db), ObjectCache(connect, config['prefix'], config['maxttl']))
+    try:
+        for name in ('cold', 'warm'):
+            queries, calls = site.queries, site.cache.calls
+            for path in views:
+                site.view(path)
+            setattr(outcome, name, ((site.queries - queries) / float(len(views)),
+                                    (site.cache.calls - calls) / float(len(views))))
+        if server:
+            outcome.used, outcome.evicted, outcome.rejected = server.used, server.evicted, server.rejected
+        site.publish(NEW_TITLE)
+        outcome.fresh = NEW_TITLE in site.view('/')
+        outcome.errors = site.cache.errors
+    finally:
+        if server:
+            server.stop()
+    return outcome
+
+
+def format_outcomes(outcomes):
+    lines = ['%-28s %-5s %12s %11s %8s %8s' % ('setup', 'pass', 'queries/page', 'cache trips', 'evicted',
+                                              'refused')]
+    for o in outcomes:
+        for name in ('cold', 'warm'):
+            queries, calls = getattr(o, name)
+            extra = ('%8d %8d' % (o.evicted, o.rejected)) if name == 'warm' and o.used else ''
+            lines.append('%-28s %-5s %12.1f %11.1f %s' % (o.label if name == 'cold' else '', name, queries, calls,
+                                                          extra))
+    return '\n'.join(lines)
+
+
+def run_checks(config, views):
+    policy = config['policy']
+    other = 'allkeys-lru' if policy == 'noeviction' else 'noeviction'
+    db = make_db()
+    none = run_scenario('no object cache', db, config, views)
+    ample = run_scenario('keyvalue %s' % policy, db, config, views, policy)
+    limit = max(1, ample.used // PRESSURE)
+    tight = run_scenario('keyvalue %s, %d KB' % (policy, limit >> 10), db, config, views, policy, limit)
+    compare = run_scenario('keyvalue %s, %d KB' % (other, limit >> 10), db, config, views, other, limit)
+    print(format_outcomes([none, ample, tight, compare]))
+    print('(warm working set: %d KB in the Key Value service)' % (ample.used >> 10))
+    print()
+
+    checks = []
+    before, after = none.warm[0], ample.warm[0]
+    checks.append((after < before, 'warm pages: %.1f -> %.1f queries per page (%+.0f%%)'
+                   % (before, after, (after / before - 1) * 100)))
+    checks.append((ample.warm[0] < ample.cold[0], 'cold cache: %.1f queries per page while it fills'
+                   % ample.cold[0]))
+    checks.append((ample.fresh, 'home page lists a post published while cached (last_changed invalidation)'))
+    checks.append((tight.warm[0] < before and tight.fresh,
+                   '%s at a third of the working set: %.1f queries per page, %s after publishing'
+                   % (policy, tight.warm[0], 'fresh' if tight.fresh else 'STALE')))
+    checks.append((not ample.errors, 'no Key Value errors with ample memory (%d)' % ample.errors))
+    notes = ['%s at a third of the working set: %.1f queries per page, %d writes refused, %s after publishing'
+             % (other, compare.warm[0], compare.rejected, 'fresh' if compare.fresh else 'stale')]
+    return checks, notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the Key Value object cache on a sample WordPress site.')
+    parser.add_argument('--render-yaml', help='render.yaml to read the cache settings from '
+                                              '(default: the template rendered with --object-cache)')
+    parser.add_argument('--views', type=int, default=VIEWS, help='page views per pass (default: %d)' % VIEWS)
+    args = parser.parse_args(argv)
+
+    if args.render_yaml:
+        with open(args.render_yaml, encoding='utf-8') as f:
+            render_text = f.read()
+    else:
+        render_text = generate.Templates().render(RENDER_TEMPLATE, None, generate.OBJECT_CACHES['keyvalue'])
+    try:
+        config = cache_config(render_text)
+    except ConfigError as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 1
+    print('prefix %r, TTL cap %ds, timeouts %g/%gs, maxmemoryPolicy %s' % (
+        config['prefix'], config['maxttl'], config['timeout'], config['read_timeout'], config['policy']))
+
+    start = time.perf_counter()
+    checks, notes = run_checks(config, page_views(args.views))
+    failed = 0
+    for passed, message in checks:
+        failed += not passed
+        print('%s %s' % ('✅' if passed else '❌', message))
+    for note in notes:
+        print('·  %s' % note)
+    print('%s in %.2fs' % ('✅ object cache checks passed' if not failed else '❌ %d check(s) failed' % failed,
+                           time.perf_counter() - start))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# PHP and Apache tuning sized from the Render plan's memory
+#
+# The wordpress:6.3-apache image ships Apache's stock mpm_prefork settings
+# (up to 150 workers) and a generic OPcache config, sized for a whole
+# server. On a 512 MB Render instance 150 PHP workers are several times
+# what fits, so a traffic spike ends in the OOM killer instead of a queue.
+# This module turns a plan into:
+#
+#   php-tuning.ini     OPcache memory, interned strings, file count, JIT,
+#                      realpath cache and memory_limit
+#   mpm_prefork.conf   worker counts: what is left of 90% of the plan's
+#                      memory after the base system, OPcache and the JIT
+#                      buffer, divided by a typical WordPress worker's
+#                      resident size
+#
+# generate.py renders both from templates/files/ with these values, and the
+# optimized Dockerfile profile copies them into the image. validate_setup.py
+# reads them back and checks they fit the plan in render.yaml.
+#
+# OPcache keeps checking timestamps: the persistent disk is mounted over
+# /var/www/html, so plugin and core updates from wp-admin change PHP files
+# while the container runs.
+#
+# Usage:
+#   python3 php_tuning.py [--plan PLAN]
+
+import argparse
+import re
+import sys
+
+# Render instance memory per plan, MB
+PLAN_MEMORY_MB = {
+    'free': 512,
+    'starter': 512,
+    'standard': 2048,
+    'pro': 4096,
+    'pro plus': 8192,
+    'pro max': 16384,
+    'pro ultra': 32768,
+}
+
+BASE_MB = 64        # kernel share, Apache parent, MySQL client libraries
+WORKER_MB = 48      # resident size of a prefork worker serving WordPress
+HEADROOM = 0.9      # share of the plan's memory budgeted; the rest absorbs spikes
+MIN_WORKERS = 2
+MAX_WORKERS = 256   # Apache's default ServerLimit; MySQL connections run out first
+STOCK_WORKERS = 150  # MaxRequestWorkers of the image's mpm_prefork.conf
+
+# the image reads every *.ini there; zz- sorts after its opcache-recommended.ini
+PHP_INI = 'config/php-tuning.ini'
+PHP_INI_TARGET = '/usr/local/etc/php/conf.d/zz-render-tuning.ini'
+MPM_CONF = 'config/mpm_prefork.conf'
+MPM_CONF_TARGET = '/etc/apache2/mods-available/mpm_prefork.conf'
+
+INI_LINE = re.compile(r'^\s*([\w.]+)\s*=\s*"?([^";]*?)"?\s*(?:;.*)?$')
+APACHE_LINE = re.compile(r'^\s*(\w+)\s+(\d+)\s*$')
+SIZE = re.compile(r'^(\d+)\s*([KMG]?)$', re.I)
+
+
+class TuningError(Exception):
+    pass
+
+
+class Tuning:
+    """PHP and Apache settings for one plan."""
+
+    __slots__ = ('plan', 'memory_mb', 'opcache_mb', 'interned_mb', 'max_files', 'jit_mb',
+                 'memory_limit_mb', 'realpath_kb', 'workers')
+
+    def __init__(self, plan):
+        if plan not in PLAN_MEMORY_MB:
+            raise TuningError('unknown plan %r (one of %s)' % (plan, ', '.join(PLAN_MEMORY_MB)))
+        memory = PLAN_MEMORY_MB[plan]
+        self.plan = plan
+        self.memory_mb = memory
+        small = memory <= 512
+        self.opcache_mb = 64 if small else min(256, memory // 16)
+        self.interned_mb = 8 if small else 16
+        self.max_files = 10000 if small else 20000
+        # the JIT buffer is shared memory every worker maps; below 2 GB it
+        # costs workers, and WordPress is I/O bound, so it stays off there
+        self.jit_mb = 0 if memory < 2048 else min(128, memory // 64)
+        self.memory_limit_mb = 128 if small else 256
+        self.realpath_kb = 4096
+        budget = int(memory * HEADROOM) - BASE_MB - self.opcache_mb - self.jit_mb
+        self.workers = min(MAX_WORKERS, max(MIN_WORKERS, budget // WORKER_MB))
+
+    @property
+    def start_servers(self):
+        return max(MIN_WORKERS, self.workers // 4)
+
+    @property
+    def min_spare(self):
+        return max(1, self.workers // 8)
+
+    @property
+    def max_spare(self):
+        return max(self.min_spare + 1, self.workers // 4)
+
+    def variables(self):
+        """Template variables for php-tuning.ini and mpm_prefork.conf."""
+        return {
+            'opcache_memory': str(self.opcache_mb),
+            'opcache_strings': str(self.interned_mb),
+            'opcache_files': str(self.max_files),
+            'opcache_jit': 'tracing' if self.jit_mb else 'disable',
+            'opcache_jit_buffer': '%dM' % self.jit_mb,
+            'php_memory_limit': '%dM' % self.memory_limit_mb,
+            'realpath_cache': '%dK' % self.realpath_kb,
+            'max_workers': str(self.workers),
+            'start_servers': str(self.start_servers),
+            'min_spare': str(self.min_spare),
+            'max_spare': str(self.max_spare),
+        }
+
+
+def variables(plan):
+    return Tuning(plan).variables()
+
+
+def megabytes(value, unit='B'):
+    """php.ini size ('64M', '4096K', '1G') in MB; None if it is not a size.
+    A bare number is in `unit` (opcache.memory_consumption is in MB)."""
+    match = SIZE.match(str(value).strip())
+    if not match:
+        return None
+    number, unit = int(match.group(1)), (match.group(2) or unit).upper()
+    if unit == 'G':
+        return number * 1024
+    if unit == 'M':
+        return number
+    if unit == 'K':
+        return number / 1024.0
+    return number / (1024.0 * 1024)
+
+
+def parse_ini(text):
+    """{directive: value} from php.ini text; sections and comments ignored."""
+    settings = {}
+    for line in (text or '').splitlines():
+        match = INI_LINE.match(line)
+        if match:
+            settings[match.group(1)] = match.group(2).strip()
+    return settings
+
+
+def parse_mpm(text):
+    """{directive: number} from an Apache MPM config."""
+    settings = {}
+    for line in (text or '').splitlines():
+        match = APACHE_LINE.match(line)
+        if match:
+            settings[match.group(1)] = int(match.group(2))
+    return settings
+
+
+def footprint(ini, mpm):
+    """(MB at full load, workers) for parsed php-tuning.ini and mpm_prefork.conf.
+
+    Missing settings count at the image's defaults: 128 MB of OPcache, no
+    JIT buffer, Apache's MaxRequestWorkers.
+    """
+    opcache = megabytes(ini.get('opcache.memory_consumption', '128'), 'M')
+    opcache = 128 if opcache is None else opcache
+    jit = 0
+    if ini.get('opcache.jit', 'disable').lower() not in ('disable', 'off', '0'):
+        jit = megabytes(ini.get('opcache.jit_buffer_size', '0')) or 0
+    workers = mpm.get('MaxRequestWorkers', STOCK_WORKERS)
+    return BASE_MB + opcache + jit + workers * WORKER_MB, workers
+
+
+def format_table(plans):
+    lines = ['%-10s %7s %8s %6s %8s %8s' % ('plan', 'memory', 'opcache', 'jit', 'workers', 'at load')]
+    for plan in plans:
+        t = Tuning(plan)
+        used = BASE_MB + t.opcache_mb + t.jit_mb + t.workers * WORKER_MB
+        lines.append('%-10s %5d MB %5d MB %3d MB %8d %5d MB' % (
+            plan, t.memory_mb, t.opcache_mb, t.jit_mb, t.workers, used))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Show PHP/Apache tuning sized per Render plan.')
+    parser.add_argument('--plan', choices=list(PLAN_MEMORY_MB), help='show one plan (default: all)')
+    args = parser.parse_args(argv)
+    print(format_table([args.plan] if args.plan else list(PLAN_MEMORY_MB)))
+    print('(at load: base %d MB + OPcache + JIT + workers × %d MB)' % (BASE_MB, WORKER_MB))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
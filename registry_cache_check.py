@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# Local stand-in for the prebuilt-image workflow's layer cache
+#
+# Replays what .github/workflows/deploy.yml does in --deploy prebuilt mode,
+# against a throwaway registry:2 container on localhost instead of GHCR and
+# the GitHub Actions cache:
+#
+#   1. build the scaffolded project on a fresh BuildKit builder, push it
+#      tagged by a commit id, and export the layer cache to the registry
+#   2. throw the builder away (a new CI runner has no local cache), edit a
+#      theme file, build again with the cache imported from the registry
+#
+# The second build must report every step before the first COPY of
+# wp-content as CACHED, i.e. the dependency layers are reused and only the
+# content layers are rebuilt. Exit code 0 when they are, 1 when not, 2 when
+# Docker with buildx is not available.
+#
+# Usage:
+#   python3 registry_cache_check.py [--dockerfile optimized|boilerplate] [--keep]
+
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import bench_dockerfile
+import dockerfile_analyzer
+import generate
+
+REGISTRY_IMAGE = 'registry:2'
+STEP = re.compile(r'^#(\d+) \[(?:[\w-]+ )?[\d/ ]*\] (.*)$')
+CACHED = re.compile(r'^#(\d+) CACHED$')
+
+
+class CheckError(Exception):
+    pass
+
+
+def _run(*cmd):
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    out = proc.stdout.decode(errors='replace')
+    if proc.returncode != 0:
+        raise CheckError('%s failed:\n%s' % (' '.join(cmd[:3]), '\n'.join(out.strip().splitlines()[-8:])))
+    return out
+
+
+def expected_cached(dockerfile):
+    """(keyword, args) of the instructions a wp-content edit must not
+    rebuild: every layer before the first COPY/ADD of volatile content."""
+    keep = []
+    for ins in dockerfile_analyzer.parse(dockerfile):
+        if ins.keyword in ('COPY', 'ADD') and 'from' not in ins.flags and any(
+                dockerfile_analyzer.VOLATILE_SOURCES.match(w) for w in ins.words()[:-1]):
+            break
+        if ins.keyword in dockerfile_analyzer.LAYER_INSTRUCTIONS:
+            keep.append((ins.keyword, ins.args))
+    return keep
+
+
+def build_steps(output):
+    """{step text: cached} from `docker buildx build --progress=plain` output."""
+    names, cached = {}, set()
+    for line in output.splitlines():
+        match = STEP.match(line)
+        if match:
+            names[match.group(1)] = match.group(2).strip()
+        match = CACHED.match(line)
+        if match:
+            cached.add(match.group(1))
+    return {name: step in cached for step, name in names.items()}
+
+
+def _normalize(text):
+    return ' '.join(text.replace('\\', ' ').split())
+
+
+class Registry:
+    """A registry:2 container on a random localhost port, and a BuildKit builder that can reach it."""
+
+    def __init__(self, workdir):
+        self.workdir = workdir
+        self.name = 'grw-registry-%d' % os.getpid()
+        self.builder = None
+        self.port = None
+
+    def start(self):
+        _run('docker', 'run', '-d', '--rm', '--name', self.name, '-p', '127.0.0.1::5000', REGISTRY_IMAGE)
+        self.port = _run('docker', 'port', self.name, '5000').strip().splitlines()[0].rsplit(':', 1)[1]
+        for _ in range(50):
+            if subprocess.run(['docker', 'exec', self.name, 'wget', '-q', '-O', '-', 'http://localhost:5000/v2/'],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0:
+                break
+            time.sleep(0.1)
+        return self
+
+    @property
+    def host(self):
+        return 'localhost:%s' % self.port
+
+    def new_builder(self):
+        """A fresh builder with an empty local cache (a new CI runner)."""
+        self.drop_builder()
+        config = os.path.join(self.workdir, 'buildkitd.toml')
+        with open(config, 'w', encoding='utf-8') as f:
+            f.write('[registry."%s"]\n  http = true\n' % self.host)
+        self.builder = 'grw-cache-%d-%d' % (os.getpid(), int(time.time() * 1000) % 100000)
+        _run('docker', 'buildx', 'create', '--name', self.builder, '--driver', 'docker-container',
+             '--driver-opt', 'network=host', '--config', config, '--bootstrap')
+
+    def drop_builder(self):
+        if self.builder:
+            subprocess.run(['docker', 'buildx', 'rm', '--force', self.builder],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.builder = None
+
+    def build(self, context, tag):
+        """(seconds, {step: cached}) for one build that pushes `tag` and round-trips the cache."""
+        cache = 'type=registry,ref=%s/site:buildcache' % self.host
+        start = time.perf_counter()
+        out = _run('docker', 'buildx', 'build', '--builder', self.builder, '--progress=plain', '--push',
+                   '-t', '%s/site:%s' % (self.host, tag),
+                   '--cache-from', cache, '--cache-to', cache + ',mode=max', context)
+        return time.perf_counter() - start, build_steps(out)
+
+    def stop(self):
+        self.drop_builder()
+        subprocess.run(['docker', 'rm', '--force', self.name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run_check(root, dockerfile, log=print):
+    expected = expected_cached(dockerfile)
+    log('Steps a theme edit must not rebuild:')
+    for keyword, args in expected:
+        log('   %s %s' % (keyword, _normalize(args)[:80]))
+    registry = Registry(os.path.dirname(root)).start()
+    try:
+        registry.new_builder()
+        cold, _ = registry.build(root, 'c0ffee1')
+        log('✅ cold build pushed %s/site:c0ffee1 in %.1f s' % (registry.host, cold))
+
+        registry.new_builder()
+        bench_dockerfile.touch_theme(root, 1)
+        warm, steps = registry.build(root, 'c0ffee2')
+        log('✅ warm build on a fresh builder pushed %s/site:c0ffee2 in %.1f s' % (registry.host, warm))
+    finally:
+        registry.stop()
+
+    missed = []
+    for keyword, args in expected:
+        # BuildKit prints the instruction with its flags; match on the arguments
+        want = _normalize(args)
+        hits = [cached for name, cached in steps.items() if _normalize(name).endswith(want)]
+        if not hits or not all(hits):
+            missed.append('%s %s' % (keyword, want))
+    rebuilt = [name for name, cached in steps.items() if not cached]
+    for name in rebuilt:
+        log('·  rebuilt: %s' % _normalize(name)[:90])
+    return cold, warm, missed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that warm CI builds reuse layers cached in a registry.')
+    parser.add_argument('--dockerfile', choices=sorted(generate.DOCKERFILE_PROFILES), default='optimized',
+                        help='Dockerfile profile to build (default: optimized)')
+    parser.add_argument('--files', type=int, default=50, help='synthetic theme/plugin files (default: 50)')
+    parser.add_argument('--keep', action='store_true', help='keep the scaffolded project and print its path')
+    args = parser.parse_args(argv)
+
+    if not shutil.which('docker') or subprocess.run(['docker', 'buildx', 'version'], stdout=subprocess.DEVNULL,
+                                                    stderr=subprocess.DEVNULL).returncode != 0:
+        print('❌ needs a local Docker daemon with buildx', file=sys.stderr)
+        return 2
+
+    tmp = tempfile.mkdtemp(prefix='grw-registry-')
+    root = os.path.join(tmp, 'site')
+    try:
+        dockerfile, notes = bench_dockerfile.make_project(root, args.dockerfile, args.files)
+        for note in notes:
+            print('⚠️ %s: %s' % (args.dockerfile, note))
+        cold, warm, missed = run_check(root, dockerfile)
+    except CheckError as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 1
+    finally:
+        if args.keep:
+            print('project kept in %s' % root)
+        else:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    if missed:
+        for step in missed:
+            print('❌ not reused from the registry cache: %s' % step)
+        return 1
+    print('✅ dependency layers reused from the registry cache (warm %.1f s vs cold %.1f s)' % (warm, cold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
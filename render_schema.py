@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# Structural validator for render.yaml
+#
+# The schema below describes the Blueprint shape used by this boilerplate
+# (see wordpress-demo-files.md). It is compiled once, at import time, into a
+# tree of closures; validating a document is then a single walk over it that
+# reports every problem with its exact path (e.g. `services[1].plan`).
+#
+# While walking, service names, regions, ipWhitelist and fromService
+# references are collected so that cross-references and topology (web
+# service and database in different regions) are checked without a second
+# pass.
+#
+# Services accept every field of Render's Blueprint spec; a field the
+# schema does not know is a warning rather than an error, since Render adds
+# fields faster than this list is updated. Run on its own, the module
+# checks sample Blueprints (the boilerplate's services plus build and
+# start commands, pre-deploy, domains, build filters, scaling, headers,
+# routes, cron schedules) and any render.yaml files given.
+#
+# Usage:
+#   python3 render_schema.py [render.yaml ...]
+
+import re
+import sys
+
+SERVICE_TYPES = ('web', 'pserv', 'worker', 'cron', 'keyvalue', 'redis')
+REGIONS = ('oregon', 'ohio', 'virginia', 'frankfurt', 'singapore')
+PLANS = ('free', 'starter', 'standard', 'pro', 'pro plus', 'pro max', 'pro ultra')
+RUNTIMES = ('docker', 'image', 'node', 'python', 'ruby', 'go', 'rust', 'elixir',
+            'static', 'mysql')
+AUTO_DEPLOY_TRIGGERS = ('commit', 'checksPass', 'off')
+ROUTE_TYPES = ('redirect', 'rewrite')
+ENV_SOURCES = ('value', 'sync', 'generateValue', 'fromDatabase', 'fromService', 'fromGroup')
+MAXMEMORY_POLICIES = ('allkeys-lru', 'allkeys-lfu', 'allkeys-random', 'volatile-lru', 'volatile-lfu',
+                      'volatile-random', 'volatile-ttl', 'noeviction')
+
+ERROR = 'error'
+WARNING = 'warning'
+
+_NAME = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+_ENV_KEY = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+class Problem:
+    __slots__ = ('level', 'path', 'message')
+
+    def __init__(self, level, path, message):
+        self.level = level
+        self.path = path
+        self.message = message
+
+    def __str__(self):
+        return '%s: %s' % (self.path or '<root>', self.message)
+
+    def __repr__(self):
+        return 'Problem(%r, %r, %r)' % (self.level, self.path, self.message)
+
+
+class _Walk:
+    """State shared by one walk: problems plus facts gathered for cross-checks."""
+
+    def __init__(self):
+        self.problems = []
+        self.services = []   # (path, service dict)
+        self.refs = []       # (path, referenced service name)
+
+    def error(self, path, message):
+        self.problems.append(Problem(ERROR, path, message))
+
+    def warning(self, path, message):
+        self.problems.append(Problem(WARNING, path, message))
+
+
+def _join(path, key):
+    return '%s.%s' % (path, key) if path else key
+
+
+def _type_name(value):
+    return {dict: 'mapping', list: 'list', str: 'string', bool: 'boolean',
+            int: 'integer', float: 'number', type(None): 'null'}.get(type(value), type(value).__name__)
+
+
+# Schema nodes. Each compile() returns validate(value, path, walk).
+
+class Str:
+    def __init__(self, pattern=None, choices=None, hint=None):
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.choices = choices
+        self.hint = hint
+
+    def compile(self):
+        pattern, choices, hint = self.pattern, self.choices, self.hint
+
+        def validate(value, path, walk):
+            if not isinstance(value, str):
+                walk.error(path, 'expected a string, got %s%s' % (
+                    _type_name(value), ' (%s)' % hint if hint else ''))
+            elif choices is not None and value not in choices:
+                walk.error(path, '%r is not one of: %s' % (value, ', '.join(choices)))
+            elif pattern is not None and not pattern.match(value):
+                walk.error(path, '%r does not match %s' % (value, pattern.pattern))
+        return validate
+
+
+class Int:
+    def __init__(self, minimum=None, maximum=None):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def compile(self):
+        minimum, maximum = self.minimum, self.maximum
+
+        def validate(value, path, walk):
+            if isinstance(value, bool) or not isinstance(value, int):
+                walk.error(path, 'expected an integer, got %s' % _type_name(value))
+            elif minimum is not None and value < minimum:
+                walk.error(path, 'must be at least %d' % minimum)
+            elif maximum is not None and value > maximum:
+                walk.error(path, 'must be at most %d' % maximum)
+        return validate
+
+
+class Bool:
+    def compile(self):
+        def validate(value, path, walk):
+            if not isinstance(value, bool):
+                walk.error(path, 'expected true or false, got %s' % _type_name(value))
+        return validate
+
+
+class List:
+    def __init__(self, item, min_items=0):
+        self.item = item
+        self.min_items = min_items
+
+    def compile(self):
+        item, min_items = self.item.compile(), self.min_items
+
+        def validate(value, path, walk):
+            if not isinstance(value, list):
+                walk.error(path, 'expected a list, got %s' % _type_name(value))
+                return
+            if len(value) < min_items:
+                walk.error(path, 'needs at least %d item%s' % (min_items, '' if min_items == 1 else 's'))
+            for i, v in enumerate(value):
+                item(v, '%s[%d]' % (path, i), walk)
+        return validate
+
+
+class Map:
+    """A mapping with known fields. `check(value, path, walk)` runs after the fields."""
+
+    def __init__(self, fields, required=(), exactly_one=(), check=None, extra=False):
+        # extra: True accepts unknown keys, WARNING reports them as warnings
+        self.fields = fields
+        self.required = tuple(required)
+        self.exactly_one = tuple(exactly_one)
+        self.check = check
+        self.extra = extra
+
+    def compile(self):
+        fields = {k: node.compile() for k, node in self.fields.items()}
+        required, exactly_one, check, extra = self.required, self.exactly_one, self.check, self.extra
+
+        def validate(value, path, walk):
+            if not isinstance(value, dict):
+                walk.error(path, 'expected a mapping, got %s' % _type_name(value))
+                return
+            for key in required:
+                if key not in value:
+                    walk.error(_join(path, key), 'is required')
+            if exactly_one:
+                present = [k for k in exactly_one if k in value]
+                if len(present) != 1:
+                    walk.error(path, 'needs exactly one of: %s (found %s)' % (
+                        ', '.join(exactly_one), ', '.join(present) or 'none'))
+            for key, v in value.items():
+                sub = fields.get(key)
+                if sub is not None:
+                    sub(v, _join(path, str(key)), walk)
+                elif extra == WARNING:
+                    walk.warning(_join(path, str(key)), 'unknown field (not in the Blueprint spec)')
+                elif not extra:
+                    walk.error(_join(path, str(key)), 'unknown field')
+            if check is not None:
+                check(value, path, walk)
+        return validate
+
+
+def _unique(field):
+    """check= hook: items of a list field must have distinct `field` values."""
+    def check(items, path, walk):
+        seen = {}
+        for i, item in enumerate(items if isinstance(items, list) else ()):
+            if isinstance(item, dict) and isinstance(item.get(field), str):
+                name = item[field]
+                if name in seen:
+                    walk.error('%s[%d].%s' % (path, i, field),
+                               'duplicate %r (first at %s[%d])' % (name, path, seen[name]))
+                else:
+                    seen.setdefault(name, i)
+    return check
+
+
+class _UniqueList(List):
+    def __init__(self, item, field, min_items=0):
+        List.__init__(self, item, min_items)
+        self.field = field
+
+    def compile(self):
+        base, check = List.compile(self), _unique(self.field)
+
+        def validate(value, path, walk):
+            base(value, path, walk)
+            check(value, path, walk)
+        return validate
+
+
+def _collect_service(service, path, walk):
+    walk.services.append((path, service))
+    if service.get('type') == 'web' and service.get('runtime') == 'docker' \
+            and 'dockerfilePath' not in service:
+        walk.warning(_join(path, 'dockerfilePath'), 'not set; Render defaults to ./Dockerfile')
+    if service.get('runtime') == 'image':
+        if 'image' not in service:
+            walk.error(_join(path, 'image'), 'required for runtime image (the image URL to deploy)')
+        if 'dockerfilePath' in service:
+            walk.warning(_join(path, 'dockerfilePath'), 'ignored for runtime image; Render deploys image.url')
+    if service.get('type') in ('keyvalue', 'redis') and 'ipAllowList' not in service:
+        walk.error(_join(path, 'ipAllowList'), 'required for Key Value ([] allows internal connections only)')
+    if service.get('type') == 'pserv' and 'disk' not in service:
+        walk.warning(_join(path, 'disk'), 'private service without a disk loses its data on every deploy')
+
+
+def _collect_ref(entry, path, walk):
+    if isinstance(entry.get('service'), str):
+        walk.refs.append((_join(path, 'service'), entry['service']))
+
+
+def _collect_from_service(entry, path, walk):
+    if isinstance(entry.get('name'), str):
+        walk.refs.append((_join(path, 'name'), entry['name']))
+
+
+ENV_VAR = Map(
+    {
+        'key': Str(_ENV_KEY),
+        'value': Str(hint='quote booleans and numbers, e.g. "false"'),
+        'sync': Bool(),
+        'generateValue': Bool(),
+        'fromDatabase': Map({'name': Str(), 'property': Str()}, required=('name', 'property')),
+        'fromService': Map({'name': Str(), 'type': Str(choices=SERVICE_TYPES),
+                            'property': Str(), 'envVarKey': Str()},
+                           required=('name', 'type'), check=_collect_from_service),
+        'fromGroup': Str(),
+    },
+    required=('key',),
+    exactly_one=ENV_SOURCES,
+)
+
+DISK = Map(
+    {
+        'name': Str(_NAME),
+        'mountPath': Str(r'^/'),
+        'sizeGB': Int(minimum=1),
+    },
+    required=('name', 'mountPath'),
+)
+
+REGISTRY_CREDS = Map({'fromRegistryCreds': Map({'name': Str()}, required=('name',))})
+
+SCALING = Map(
+    {
+        'minInstances': Int(minimum=1),
+        'maxInstances': Int(minimum=1),
+        'targetMemoryPercent': Int(minimum=1, maximum=90),
+        'targetCPUPercent': Int(minimum=1, maximum=90),
+    },
+    required=('minInstances', 'maxInstances'),
+)
+
+SERVICE = Map(
+    {
+        'type': Str(choices=SERVICE_TYPES),
+        'name': Str(_NAME),
+        'runtime': Str(choices=RUNTIMES),
+        'env': Str(choices=RUNTIMES),
+        'region': Str(choices=REGIONS),
+        'plan': Str(choices=PLANS),
+        'buildCommand': Str(),
+        'startCommand': Str(),
+        'preDeployCommand': Str(),
+        'dockerCommand': Str(),
+        'dockerfilePath': Str(),
+        'dockerContext': Str(),
+        'registryCredential': REGISTRY_CREDS,
+        'rootDir': Str(),
+        'repo': Str(),
+        'branch': Str(),
+        'image': Map({'url': Str(), 'creds': REGISTRY_CREDS}, required=('url',)),
+        'autoDeploy': Bool(),
+        'autoDeployTrigger': Str(choices=AUTO_DEPLOY_TRIGGERS),
+        'buildFilter': Map({'paths': List(Str()), 'ignoredPaths': List(Str())}),
+        'domains': List(Str()),
+        'healthCheckPath': Str(r'^/'),
+        'numInstances': Int(minimum=1),
+        'scaling': SCALING,
+        'maxShutdownDelaySeconds': Int(minimum=1, maximum=300),
+        'schedule': Str(),
+        'staticPublishPath': Str(),
+        'headers': List(Map({'path': Str(), 'name': Str(), 'value': Str()},
+                            required=('path', 'name', 'value'))),
+        'routes': List(Map({'type': Str(choices=ROUTE_TYPES), 'source': Str(), 'destination': Str()},
+                           required=('type', 'source', 'destination'))),
+        'pullRequestPreviewsEnabled': Bool(),
+        'previews': Map({'generation': Str(choices=('off', 'manual', 'automatic')), 'plan': Str(choices=PLANS)}),
+        'initialDeployHook': Str(),
+        'envVars': _UniqueList(ENV_VAR, 'key'),
+        'disk': DISK,
+        'ipWhitelist': List(Map({'service': Str(), 'source': Str(), 'description': Str()},
+                                exactly_one=('service', 'source'), check=_collect_ref)),
+        'ipAllowList': List(Map({'source': Str(), 'description': Str()}, required=('source',))),
+        'maxmemoryPolicy': Str(choices=MAXMEMORY_POLICIES),
+    },
+    required=('type', 'name'),
+    check=_collect_service,
+    extra=WARNING,
+)
+
+BLUEPRINT = Map(
+    {
+        'services': _UniqueList(SERVICE, 'name', min_items=1),
+        'databases': List(Map({}, extra=True)),
+        'envVarGroups': List(Map({}, extra=True)),
+        'previewsEnabled': Bool(),
+    },
+    required=('services',),
+)
+
+# Compiled once; validate() only walks.
+_VALIDATE = BLUEPRINT.compile()
+
+
+def validate(doc):
+    """All Problems in a parsed render.yaml document, errors before warnings."""
+    walk = _Walk()
+    _VALIDATE(doc, '', walk)
+
+    names = {s.get('name'): (path, s) for path, s in walk.services if isinstance(s.get('name'), str)}
+    for path, name in walk.refs:
+        if name not in names:
+            walk.error(path, 'references unknown service %r' % name)
+
+    # Topology: every hop between a web service and a database it talks to
+    # crosses regions if they are not co-located.
+    webs = [(p, s) for p, s in walk.services if s.get('type') == 'web']
+    for db_path, db in walk.services:
+        if db.get('type') != 'pserv':
+            continue
+        allowed = {s.get('service') for s in db.get('ipWhitelist') or () if isinstance(s, dict)}
+        for web_path, web in webs:
+            if allowed and web.get('name') not in allowed:
+                continue
+            if web.get('region') and db.get('region') and web['region'] != db['region']:
+                walk.warning(_join(db_path, 'region'), (
+                    '%r is in %s but web service %r is in %s; every DB query crosses regions'
+                    % (db.get('name'), db['region'], web.get('name'), web['region'])))
+        if not allowed and webs:
+            walk.warning(_join(db_path, 'ipWhitelist'), 'not set; the database accepts connections from anywhere')
+
+    walk.problems.sort(key=lambda p: p.level != ERROR)
+    return walk.problems
+
+
+# Sample Blueprints: (label, document, errors expected, warnings expected)
+_WEB = {'type': 'web', 'name': 'wordpress-demo', 'runtime': 'docker', 'region': 'singapore', 'plan': 'free',
+        'dockerfilePath': './Dockerfile', 'branch': 'main', 'autoDeploy': False,
+        'envVars': [{'key': 'WORDPRESS_DB_HOST', 'fromService': {'name': 'wordpress-db-demo', 'type': 'pserv',
+                                                                 'property': 'host'}}]}
+_DB = {'type': 'pserv', 'name': 'wordpress-db-demo', 'runtime': 'docker', 'region': 'singapore',
+       'plan': 'free', 'disk': {'name': 'mysql', 'mountPath': '/var/lib/mysql', 'sizeGB': 10},
+       'ipWhitelist': [{'service': 'wordpress-demo'}]}
+SAMPLES = (
+    ('boilerplate', {'services': [_WEB, _DB]}, 0, 0),
+    ('documented service fields', {'services': [dict(
+        _WEB,
+        preDeployCommand='wp core update-db',
+        dockerCommand='apache2-foreground',
+        domains=['blog.example.com', 'www.blog.example.com'],
+        buildFilter={'paths': ['Dockerfile', 'wp-content/**'], 'ignoredPaths': ['**/*.md']},
+        scaling={'minInstances': 1, 'maxInstances': 3, 'targetCPUPercent': 60},
+        healthCheckPath='/wp-login.php',
+        maxShutdownDelaySeconds=30,
+        headers=[{'path': '/wp-content/*', 'name': 'X-Content-Type-Options', 'value': 'nosniff'}],
+        routes=[{'type': 'redirect', 'source': '/old', 'destination': '/new'}],
+    ), _DB, {
+        'type': 'cron', 'name': 'wp-cron', 'runtime': 'python', 'region': 'singapore', 'plan': 'starter',
+        'schedule': '*/15 * * * *', 'buildCommand': 'pip install -r requirements.txt',
+        'startCommand': 'python3 wp_cron.py', 'autoDeployTrigger': 'commit',
+    }]}, 0, 0),
+    ('unknown field', {'services': [dict(_WEB, autoDeploys=True), _DB]}, 0, 1),
+    ('misspelt region', {'services': [dict(_WEB, region='singapur'), _DB]}, 1, 1),
+)
+
+
+def _load(path):
+    import yaml   # only for files given on the command line
+    with open(path, encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def main(argv=None):
+    paths = sys.argv[1:] if argv is None else argv
+    failed = 0
+    for label, doc, errors, warnings in SAMPLES:
+        problems = validate(doc)
+        found = (sum(p.level == ERROR for p in problems), sum(p.level == WARNING for p in problems))
+        passed = found == (errors, warnings)
+        failed += not passed
+        print('%s %s: %d error(s), %d warning(s)' % (('✅' if passed else '❌', label) + found))
+        if not passed:
+            for problem in problems:
+                print('   %s %s' % (problem.level, problem))
+    for path in paths:
+        problems = validate(_load(path))
+        failed += any(p.level == ERROR for p in problems)
+        print('%s %s' % ('❌' if any(p.level == ERROR for p in problems) else '✅', path))
+        for problem in problems:
+            print('   %s %s' % ('❌' if problem.level == ERROR else '⚠️', problem))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# Local stand-in for the Render deploy hook and deploys API
+#
+# Serves, on 127.0.0.1, the endpoints deploy_client.py talks to:
+#
+#   POST /deploy/<service>?key=...                   deploy hook
+#   GET  /v1/services/<service>/deploys?limit=N      newest first
+#   GET  /v1/services/<service>/deploys/<id>         one deploy
+#   POST /v1/services/<service>/deploys/<id>/cancel
+#
+# Each scenario scripts the server: hook responses to fail with before it
+# succeeds, and the statuses a new deploy walks through, one step per
+# status poll. The scenarios run the real client over HTTP against it and
+# check the outcome: retries, cancelling superseded deploys, polling to
+# live or failed, and the timing record appended to the store.
+#
+# Usage:
+#   python3 render_standin.py [--scenarios live,retry,...]     run the checks
+#   python3 render_standin.py --serve [--port 8080]            just serve
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import deploy_timings
+import generate
+
+# the client exactly as scaffold.py copies it to .github/scripts/
+CLIENT = os.path.join(generate.TEMPLATE_DIR, 'files', 'deploy_client.py')
+
+
+def _load_client():
+    spec = importlib.util.spec_from_file_location('deploy_client', CLIENT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+deploy_client = _load_client()
+SERVICE = 'srv-standin'
+HOOK_KEY = 'standin-key'
+API_KEY = 'rnd_standin'
+
+LIVE_PATH = ('created', 'build_in_progress', 'build_in_progress', 'build_in_progress',
+             'update_in_progress', 'update_in_progress', 'live')
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, progression=LIVE_PATH, hook_failures=(), existing=()):
+        super().__init__(('127.0.0.1', port), Handler)
+        self.lock = threading.Lock()
+        self.progression = tuple(progression)
+        self.hook_failures = list(hook_failures)   # [(http status, Retry-After or None)]
+        self.deploys = []                           # newest last
+        self.steps = {}                             # deploy id -> index into progression
+        self.requests = []                          # (method, path)
+        for status in existing:
+            self._create(status=status)
+
+    @property
+    def base(self):
+        return 'http://127.0.0.1:%d' % self.server_address[1]
+
+    @property
+    def hook_url(self):
+        return '%s/deploy/%s?key=%s' % (self.base, SERVICE, HOOK_KEY)
+
+    def _create(self, status=None, image=None):
+        deploy = {'id': 'dep-%04d' % (len(self.deploys) + 1), 'status': status or self.progression[0],
+                  'createdAt': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+        if image:
+            deploy['image'] = {'ref': image}
+        self.deploys.append(deploy)
+        self.steps[deploy['id']] = 0 if status is None else None
+        return deploy
+
+    def find(self, deploy_id):
+        return next((d for d in self.deploys if d['id'] == deploy_id), None)
+
+    def calls(self, method, prefix):
+        return sum(1 for m, p in self.requests if m == method and p.startswith(prefix))
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=()):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _route(self, method):
+        server = self.server
+        url = urllib.parse.urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        with server.lock:
+            server.requests.append((method, url.path))
+            if parts[:1] == ['deploy'] and method == 'POST':
+                return self._hook(parts, urllib.parse.parse_qs(url.query))
+            if parts[:2] != ['v1', 'services'] or len(parts) < 4 or parts[3] != 'deploys':
+                return self._send(404, {'message': 'not found'})
+            if self.headers.get('Authorization') != 'Bearer %s' % API_KEY:
+                return self._send(401, {'message': 'unauthorized'})
+            if parts[2] != SERVICE:
+                return self._send(404, {'message': 'service not found'})
+            if len(parts) == 4 and method == 'GET':
+                limit = int(urllib.parse.parse_qs(url.query).get('limit', ['20'])[0])
+                return self._send(200, [{'deploy': d, 'cursor': d['id']}
+                                        for d in reversed(server.deploys)][:limit])
+            deploy = server.find(parts[4]) if len(parts) >= 5 else None
+            if deploy is None:
+                return self._send(404, {'message': 'deploy not found'})
+            if len(parts) == 5 and method == 'GET':
+                step = server.steps.get(deploy['id'])
+                if step is not None and deploy['status'] != 'canceled':
+                    deploy['status'] = server.progression[min(step, len(server.progression) - 1)]
+                    server.steps[deploy['id']] = step + 1
+                return self._send(200, deploy)
+            if len(parts) == 6 and parts[5] == 'cancel' and method == 'POST':
+                deploy['status'] = 'canceled'
+                return self._send(200, deploy)
+            return self._send(405, {'message': 'method not allowed'})
+
+    def _hook(self, parts, query):
+        server = self.server
+        if len(parts) != 2 or parts[1] != SERVICE or query.get('key') != [HOOK_KEY]:
+            return self._send(404, {'message': 'unknown deploy hook'})
+        if server.hook_failures:
+            status, retry_after = server.hook_failures.pop(0)
+            return self._send(status, {'message': 'stand-in failure'},
+                              [('Retry-After', str(retry_after))] if retry_after is not None else ())
+        deploy = server._create(image=(query.get('imgURL') or [None])[0])
+        return self._send(200, {'deploy': {'id': deploy['id']}})
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+
+def _client(server, api_key=API_KEY, retries=3):
+    # real HTTP, fast backoff, quiet log
+    return deploy_client.Client(server.hook_url, api_key, server.base + '/v1', retries=retries,
+                                backoff_base=0.01, backoff_cap=0.05, log=lambda line: None)
+
+
+def _run(client, store=None, image=None, timeout=5.0):
+    return deploy_client.run(client, image=image, settle=0, interval=0.001, timeout=timeout,
+                             store=store, site='standin')
+
+
+def scenario_live(tmp):
+    server = StandIn().start()
+    store = os.path.join(tmp, 'live.jsonl')
+    status, deploy_id, phases = _run(_client(server), store, image='ghcr.io/acme/site:abc123')
+    records = list(deploy_timings.iter_records(store))
+    names = [p[0] for p in records[0]['phases']] if records else []
+    checks = [
+        (status == 'live', 'deploy went live (%s)' % status),
+        (names == ['webhook', 'queued', 'build', 'restart'], 'phases recorded as %s' % names),
+        (server.find(deploy_id).get('image') == {'ref': 'ghcr.io/acme/site:abc123'}, 'imgURL passed to the hook'),
+    ]
+    server.shutdown()
+    return checks
+
+
+def scenario_retry(tmp):
+    server = StandIn(hook_failures=[(503, None), (429, 0), (502, None)]).start()
+    client = _client(server)
+    status, _, _ = _run(client)
+    checks = [
+        (status == 'live', 'deploy went live after transient failures (%s)' % status),
+        (server.calls('POST', '/deploy/') == 4, 'hook called %d times (3 failures + 1)'
+         % server.calls('POST', '/deploy/')),
+    ]
+    server.shutdown()
+    return checks
+
+
+def scenario_exhausted(tmp):
+    server = StandIn(hook_failures=[(500, None)] * 10).start()
+    try:
+        _run(_client(server, retries=2))
+        outcome = None
+    except deploy_client.DeployError as e:
+        outcome = str(e)
+    calls = server.calls('POST', '/deploy/')
+    server.shutdown()
+    return [(outcome is not None and calls == 3, 'gave up after %d attempts: %s' % (calls, outcome))]
+
+
+def scenario_client_error(tmp):
+    server = StandIn(hook_failures=[(404, None)]).start()
+    try:
+        _run(_client(server))
+        outcome = None
+    except deploy_client.DeployError as e:
+        outcome = str(e)
+    calls = server.calls('POST', '/deploy/')
+    server.shutdown()
+    return [(outcome is not None and calls == 1, '4xx is not retried (%d call)' % calls),
+            (outcome is not None and HOOK_KEY not in outcome, 'hook key kept out of the error message')]
+
+
+def scenario_supersede(tmp):
+    server = StandIn(existing=('build_in_progress', 'created', 'live')).start()
+    status, deploy_id, _ = _run(_client(server))
+    states = [d['status'] for d in server.deploys]
+    checks = [
+        (states[:3] == ['canceled', 'canceled', 'live'], 'older in-progress deploys canceled: %s' % states[:3]),
+        (status == 'live' and deploy_id == 'dep-0004', 'latest push deployed (%s %s)' % (deploy_id, status)),
+    ]
+    server.shutdown()
+    return checks
+
+
+def scenario_failed(tmp):
+    server = StandIn(progression=('created', 'build_in_progress', 'build_failed')).start()
+    store = os.path.join(tmp, 'failed.jsonl')
+    status, _, _ = _run(_client(server), store)
+    records = list(deploy_timings.iter_records(store))
+    server.shutdown()
+    return [(status == 'build_failed', 'build failure reported (%s)' % status),
+            (records and records[0].get('status') == 'build_failed', 'failed deploy recorded too')]
+
+
+def scenario_timeout(tmp):
+    server = StandIn(progression=('created', 'build_in_progress')).start()
+    status, _, phases = _run(_client(server), timeout=0.05)
+    server.shutdown()
+    return [(status == 'timeout' and phases[-1][0] == 'build', 'stuck build times out (%s)' % status)]
+
+
+def scenario_trigger_only(tmp):
+    server = StandIn().start()
+    status, _, _ = _run(_client(server, api_key=None))
+    api_calls = server.calls('GET', '/v1/') + server.calls('POST', '/v1/')
+    server.shutdown()
+    return [(status == 'triggered' and api_calls == 0, 'no API key: hook only, %d API calls' % api_calls)]
+
+
+def scenario_cli(tmp):
+    server = StandIn().start()
+    store = os.path.join(tmp, 'cli.jsonl')
+    env = dict(os.environ, RENDER_DEPLOY_HOOK_URL=server.hook_url, RENDER_API_KEY=API_KEY,
+               RENDER_API_URL=server.base + '/v1')
+    proc = subprocess.run([sys.executable, CLIENT, '--settle', '0',
+                           '--poll', '0.001', '--store', store], env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    out = proc.stdout.decode(errors='replace')
+    server.shutdown()
+    return [(proc.returncode == 0 and 'is live' in out, 'CLI exits 0 once live'),
+            (os.path.exists(store), 'CLI appended to %s' % os.path.basename(store))]
+
+
+SCENARIOS = {
+    'live': scenario_live,
+    'retry': scenario_retry,
+    'exhausted': scenario_exhausted,
+    'client-error': scenario_client_error,
+    'supersede': scenario_supersede,
+    'failed': scenario_failed,
+    'timeout': scenario_timeout,
+    'trigger-only': scenario_trigger_only,
+    'cli': scenario_cli,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run deploy_client.py against a local Render API stand-in.')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help='comma-separated subset of: %s' % ', '.join(SCENARIOS))
+    parser.add_argument('--serve', action='store_true', help='only serve the stand-in until interrupted')
+    parser.add_argument('--port', type=int, default=8080, help='port for --serve (default: 8080)')
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = StandIn(args.port)
+        print('RENDER_DEPLOY_HOOK_URL=%s' % server.hook_url)
+        print('RENDER_API_URL=%s/v1' % server.base)
+        print('RENDER_API_KEY=%s' % API_KEY)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    names = [s.strip() for s in args.scenarios.split(',') if s.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error('unknown scenario(s): %s' % ', '.join(sorted(unknown)))
+    failed = 0
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='grw-standin-') as tmp:
+        for name in names:
+            for passed, message in SCENARIOS[name](tmp):
+                failed += not passed
+                print('%s %s: %s' % ('✅' if passed else '❌', name, message))
+    print('%s %d scenario(s) in %.2fs' % ('✅' if not failed else '❌ %d check(s) failed,' % failed,
+                                          len(names), time.perf_counter() - start))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
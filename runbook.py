@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# Per-site runbooks: STEP_BY_STEP_GUIDE.txt with a real site's values
+#
+# Renders templates/STEP_BY_STEP_GUIDE.txt for one site, or for every site
+# in a CSV (same columns as scaffold.py), with its service names, repo,
+# region, plan, URL and disk size filled in.
+#
+# Output is streamed: the template is rendered line by line, grouped into
+# sections (one per heading) and each section is written as soon as it is
+# complete, so no runbook is ever held in memory whole. In CSV mode the
+# rows are read lazily and handed to a process pool with a bounded number
+# of sites in flight, so memory stays flat however many sites there are.
+#
+# Usage:
+#   python3 runbook.py --site NAME [--region R] [--plan P] [--disk-gb N] [-o FILE]
+#   python3 runbook.py --csv sites.csv --out-dir runbooks/ [--jobs N]
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import generate
+import scaffold
+
+GUIDE = 'STEP_BY_STEP_GUIDE.txt'
+# sites submitted to the pool but not yet finished, per worker
+IN_FLIGHT_PER_WORKER = 4
+
+_templates = None
+
+
+def _shared_templates():
+    """One Templates per process, so each worker reads the template files once."""
+    global _templates
+    if _templates is None:
+        _templates = generate.Templates()
+    return _templates
+
+
+def sections(lines):
+    """Group a stream of lines into sections, each starting at a heading line."""
+    section = []
+    for line in lines:
+        if line.startswith('#') and section:
+            yield ''.join(section)
+            section = []
+        section.append(line)
+    if section:
+        yield ''.join(section)
+
+
+def stream_runbook(variables, out, templates=None):
+    """Write one site's runbook to the text stream `out`; returns characters written."""
+    templates = templates or _shared_templates()
+    written = 0
+    for section in sections(templates.iter_render(GUIDE, variables)):
+        out.write(section)
+        written += len(section)
+    return written
+
+
+def write_runbook(path, variables, templates=None):
+    """Stream one runbook to `path` through a temp file, replaced atomically."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = '%s.tmp%d' % (path, os.getpid())
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            size = stream_runbook(variables, f, templates)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+def _write_one(job):
+    path, variables = job
+    try:
+        return path, write_runbook(path, variables), None
+    except (OSError, generate.TemplateError) as e:
+        return path, None, str(e)
+
+
+def write_runbooks(jobs_iter, jobs=None):
+    """Write (path, variables) jobs over a process pool; yields (path, size, error) as they finish.
+
+    At most IN_FLIGHT_PER_WORKER sites per worker are pending at a time,
+    so `jobs_iter` is consumed lazily.
+    """
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1:
+        for job in jobs_iter:
+            yield _write_one(job)
+        return
+    limit = workers * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for job in jobs_iter:
+            pending.add(pool.submit(_write_one, job))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in wait(pending).done:
+            yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the step-by-step guide for real sites.')
+    parser.add_argument('--site', help='web service name, e.g. my-blog')
+    parser.add_argument('--database', help='MySQL service name (default: SITE-db)')
+    parser.add_argument('--region')
+    parser.add_argument('--plan')
+    parser.add_argument('--disk-gb')
+    parser.add_argument('--branch')
+    parser.add_argument('--repo', help='GitHub repository name (default: SITE)')
+    parser.add_argument('--github-owner', help='GitHub user or organization')
+    parser.add_argument('--site-url', help='public URL (default: https://SITE.onrender.com)')
+    parser.add_argument('-o', '--output', metavar='FILE', help='write here instead of stdout')
+    parser.add_argument('--csv', metavar='FILE', help='one runbook per site listed in FILE')
+    parser.add_argument('--out-dir', default='runbooks', help='where --csv runbooks go (default: runbooks)')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes for --csv (default: CPU count)')
+    args = parser.parse_args(argv)
+    if bool(args.csv) == bool(args.site):
+        parser.error('give either --site NAME or --csv FILE')
+
+    if args.site:
+        try:
+            variables = scaffold.site_variables(
+                args.site, args.region, args.plan, args.disk_gb, args.database, args.branch,
+                args.repo, args.github_owner, args.site_url)
+            if args.output:
+                write_runbook(args.output, variables)
+            else:
+                stream_runbook(variables, sys.stdout)
+        except (scaffold.ScaffoldError, generate.TemplateError, OSError) as e:
+            print('❌ %s' % e, file=sys.stderr)
+            return 2
+        return 0
+
+    start = time.perf_counter()
+    count, failed, total = 0, 0, 0
+    jobs_iter = ((target + '.txt', variables)
+                 for target, variables in scaffold.iter_sites(args.csv, args.out_dir))
+    try:
+        for path, size, error in write_runbooks(jobs_iter, args.jobs):
+            count += 1
+            if error:
+                failed += 1
+                print('❌ %s: %s' % (path, error), file=sys.stderr)
+            else:
+                total += size
+    except (scaffold.ScaffoldError, OSError) as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 2
+    print('%s %d/%d runbooks written to %s (%.1f MB) in %.2fs' % (
+        '✅' if not failed else '❌', count - failed, count, args.out_dir,
+        total / 1e6, time.perf_counter() - start,
+    ), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# Project scaffolder: Phase 1 of STEP_BY_STEP_GUIDE.txt in one command
+#
+# Creates the directory structure and writes Dockerfile, render.yaml,
+# .github/workflows/deploy.yml, .gitignore and README.md from the same
+# templates the guide embeds (templates/files/), filled in with the site's
+# name, region, plan and disk size. The validator then runs in-process on
+# the new project. --dockerfile optimized writes the build-cache-optimized
+# Dockerfile (multi-stage, BuildKit cache mounts, COPY --chown) instead of
+# the one the guide walks through, plus config/ with PHP (OPcache, JIT,
+# realpath cache) and Apache worker settings sized for the plan by
+# php_tuning.py. --deploy prebuilt has the workflow build
+# and push the image to GHCR and render.yaml deploy that image, so Render
+# no longer builds the Dockerfile on every push. --object-cache adds a Key
+# Value service and points WordPress's object cache at it.
+#
+# Bulk mode reads a CSV with a header row; `site` is required, every other
+# column (region, plan, disk_gb, database, branch, dir, repo, github_owner,
+# site_url) is optional:
+#
+#   site,region,plan,disk_gb
+#   blog-eu,frankfurt,starter,20
+#   shop-us,oregon,standard,50
+#
+# Usage:
+#   python3 scaffold.py DIR --site NAME [--region R] [--plan P] [--disk-gb N] [--dockerfile optimized]
+#                      [--deploy prebuilt] [--github-owner OWNER] [--object-cache [PLAN]]
+#   python3 scaffold.py DEST --csv sites.csv [--jobs N] [--dockerfile optimized] [--deploy prebuilt]
+#   python3 scaffold.py --self-check    # every profile/deploy/cache combination must validate
+
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import generate
+import php_tuning
+import render_schema
+import validate_setup
+
+SITE_NAME = re.compile(r'^[a-z0-9][a-z0-9-]*$')
+
+DIRECTORIES = ('.github/workflows', 'wp-content/themes', 'wp-content/plugins')
+# git does not track empty directories, and the Dockerfile COPYs wp-content
+KEEP_FILES = ('wp-content/themes/.gitkeep', 'wp-content/plugins/.gitkeep')
+
+CSV_FIELDS = ('site', 'region', 'plan', 'disk_gb', 'database', 'branch', 'dir',
+              'repo', 'github_owner', 'site_url')
+
+
+class ScaffoldError(Exception):
+    pass
+
+
+def site_variables(site, region=None, plan=None, disk_gb=None, database=None, branch=None,
+                   repo=None, github_owner=None, site_url=None, cache=None, cache_plan=None):
+    """Template variables for one site; raises ScaffoldError on invalid values."""
+    defaults = generate.DEFAULTS
+    variables = {
+        'site': site,
+        'database': database or '%s-db' % site,
+        'region': region or defaults['region'],
+        'plan': plan or defaults['plan'],
+        'disk_gb': str(disk_gb or defaults['disk_gb']),
+        'branch': branch or defaults['branch'],
+        'repo': repo or site,
+        'github_owner': github_owner or defaults['github_owner'],
+        'site_url': site_url or 'https://%s.onrender.com' % site,
+        'cache': cache or '%s-cache' % site,
+        'cache_plan': cache_plan or defaults['cache_plan'],
+        'cache_policy': defaults['cache_policy'],
+    }
+    # registry references must be lowercase
+    variables['image'] = 'ghcr.io/%s/%s' % (variables['github_owner'].lower(), variables['repo'].lower())
+    for key in ('site', 'database', 'cache'):
+        if not SITE_NAME.match(variables[key] or ''):
+            raise ScaffoldError('invalid %s name %r (lowercase letters, digits and dashes)'
+                                % (key, variables[key]))
+    if variables['region'] not in render_schema.REGIONS:
+        raise ScaffoldError('unknown region %r (one of %s)'
+                            % (variables['region'], ', '.join(render_schema.REGIONS)))
+    if variables['plan'] not in render_schema.PLANS:
+        raise ScaffoldError('unknown plan %r (one of %s)'
+                            % (variables['plan'], ', '.join(render_schema.PLANS)))
+    if variables['cache_plan'] not in render_schema.PLANS:
+        raise ScaffoldError('unknown Key Value plan %r (one of %s)'
+                            % (variables['cache_plan'], ', '.join(render_schema.PLANS)))
+    if not variables['disk_gb'].isdigit() or int(variables['disk_gb']) < 1:
+        raise ScaffoldError('disk size must be a positive number of GB, got %r' % variables['disk_gb'])
+    if not variables['branch'].strip() or any(c.isspace() for c in variables['branch']):
+        raise ScaffoldError('invalid branch name %r' % variables['branch'])
+    variables.update(php_tuning.variables(variables['plan']))
+    return variables
+
+
+def render_files(variables, templates=None, profile=generate.DEFAULT_PROFILE,
+                 deploy=generate.DEFAULT_DEPLOY, cache=generate.DEFAULT_OBJECT_CACHE):
+    """{project path: bytes} for one site, with the Dockerfile of `profile`,
+    the render.yaml/workflow of `deploy` mode and the object `cache` wiring."""
+    if cache not in generate.OBJECT_CACHES:
+        raise generate.TemplateError('unknown object cache %r (one of %s)'
+                                     % (cache, ', '.join(generate.OBJECT_CACHES)))
+    templates = templates or generate.Templates()
+    overrides = generate.OBJECT_CACHES[cache]
+    files = {rel: templates.render(name, variables, overrides).encode('utf-8')
+             for rel, name in generate.project_files(profile, deploy).items()}
+    for rel in KEEP_FILES:
+        files[rel] = b''
+    return files
+
+
+def scaffold(target, variables, force=False, validate=True, templates=None,
+             profile=generate.DEFAULT_PROFILE, deploy=generate.DEFAULT_DEPLOY,
+             cache=generate.DEFAULT_OBJECT_CACHE):
+    """Materialize one project under `target`.
+
+    Returns (written, report): the project paths actually written (files
+    already holding the same content are left alone) and the validation
+    Report, or None with validate=False. Refuses, before writing anything,
+    to overwrite a file with different content unless `force` is set.
+    """
+    files = render_files(variables, templates, profile, deploy, cache)
+    if not force:
+        clashes = []
+        for rel, data in files.items():
+            path = os.path.join(target, rel)
+            if os.path.exists(path) and generate._file_hash(path) != generate.sha256(data):
+                clashes.append(rel)
+        if clashes:
+            raise ScaffoldError('%s: would overwrite %s (use --force)' % (target, ', '.join(clashes)))
+
+    for rel in DIRECTORIES:
+        os.makedirs(os.path.join(target, rel), exist_ok=True)
+    written = [rel for rel, data in files.items()
+               if generate.write_if_changed(os.path.join(target, rel), data)]
+
+    report = None
+    if validate:
+        # one site is too small to be worth a thread pool
+        report = validate_setup.validate(target, jobs=1)
+    return written, report
+
+
+def iter_sites(path, dest, cache_plan=None):
+    """(target, variables) for each row of a CSV file, read lazily; every
+    site gets the Key Value `cache_plan`.
+
+    Raises ScaffoldError on the first bad row.
+    """
+    seen = set()
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or 'site' not in reader.fieldnames:
+            raise ScaffoldError('%s: the header row must have a "site" column' % path)
+        unknown = set(reader.fieldnames) - set(CSV_FIELDS)
+        if unknown:
+            raise ScaffoldError('%s: unknown column(s) %s' % (path, ', '.join(sorted(unknown))))
+        for lineno, row in enumerate(reader, 2):
+            row = {k: (v or '').strip() for k, v in row.items() if k}
+            try:
+                variables = site_variables(row['site'], cache_plan=cache_plan,
+                                           **{k: row.get(k) for k in CSV_FIELDS if k not in ('site', 'dir')})
+            except ScaffoldError as e:
+                raise ScaffoldError('%s:%d: %s' % (path, lineno, e))
+            target = os.path.join(dest, row.get('dir') or variables['site'])
+            if target in seen:
+                raise ScaffoldError('%s:%d: %s listed twice' % (path, lineno, target))
+            seen.add(target)
+            yield target, variables
+
+
+def read_sites(path, dest, cache_plan=None):
+    """[(target, variables)] from a CSV file; raises ScaffoldError on bad rows."""
+    return list(iter_sites(path, dest, cache_plan))
+
+
+def _scaffold_one(job):
+    target, variables, force, validate, profile, deploy, cache = job
+    try:
+        written, report = scaffold(target, variables, force, validate, profile=profile, deploy=deploy,
+                                   cache=cache)
+    except (ScaffoldError, OSError, generate.TemplateError) as e:
+        return target, None, None, str(e)
+    errors = None if report is None else report.errors
+    return target, len(written), errors, None
+
+
+def scaffold_many(sites, force=False, validate=True, jobs=None, profile=generate.DEFAULT_PROFILE,
+                  deploy=generate.DEFAULT_DEPLOY, cache=generate.DEFAULT_OBJECT_CACHE):
+    """Scaffold (target, variables) pairs over a process pool; yields results in order.
+
+    Each result is (target, files_written, validation_errors, error).
+    """
+    jobs_list = [(target, variables, force, validate, profile, deploy, cache) for target, variables in sites]
+    if jobs == 1 or len(jobs_list) < 2:
+        for job in jobs_list:
+            yield _scaffold_one(job)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for result in pool.map(_scaffold_one, jobs_list, chunksize=max(1, len(jobs_list) // 64)):
+            yield result
+
+
+def combinations():
+    """(profile, deploy, cache) for every project shape, the default first."""
+    default = (generate.DEFAULT_PROFILE, generate.DEFAULT_DEPLOY, generate.DEFAULT_OBJECT_CACHE)
+    shapes = [(profile, deploy, cache) for profile in sorted(generate.DOCKERFILE_PROFILES)
+              for deploy in sorted(generate.DEPLOY_MODES) for cache in sorted(generate.OBJECT_CACHES)]
+    return [default] + [shape for shape in shapes if shape != default]
+
+
+def self_check(site=generate.DEFAULTS['site']):
+    """Scaffold `site` in every shape into a temporary directory and validate it.
+
+    Yields (profile, deploy, cache, report) in combinations() order.
+    """
+    templates = generate.Templates()
+    with tempfile.TemporaryDirectory(prefix='scaffold-check-') as root:
+        for profile, deploy, cache in combinations():
+            variables = site_variables(site)
+            target = os.path.join(root, '%s-%s-%s' % (profile, deploy, cache))
+            _, report = scaffold(target, variables, templates=templates,
+                                 profile=profile, deploy=deploy, cache=cache)
+            yield profile, deploy, cache, report
+
+
+def run_self_check():
+    failed = 0
+    default = combinations()[0]
+    for profile, deploy, cache, report in self_check():
+        label = '%s Dockerfile, %s deploy, object cache %s%s' % (
+            profile, deploy, cache, ' (default)' if (profile, deploy, cache) == default else '')
+        if report.errors:
+            failed += 1
+            print('❌ %s: %d validation issue(s)' % (label, report.errors))
+            print(validate_setup.format_report(report, color=False))
+        else:
+            print('✅ %s' % label)
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Create a WordPress-on-Render project from the boilerplate.')
+    parser.add_argument('target', metavar='DIR', nargs='?',
+                        help='project directory (with --csv: the directory sites are created in)')
+    parser.add_argument('--site', help='web service name, e.g. my-blog')
+    parser.add_argument('--database', help='MySQL service name (default: SITE-db)')
+    parser.add_argument('--region', help='Render region (default: %s)' % generate.DEFAULTS['region'])
+    parser.add_argument('--plan', help='Render plan (default: %s)' % generate.DEFAULTS['plan'])
+    parser.add_argument('--disk-gb', help='persistent disk size (default: %s)' % generate.DEFAULTS['disk_gb'])
+    parser.add_argument('--branch', help='branch Render deploys from (default: main)')
+    parser.add_argument('--dockerfile', choices=sorted(generate.DOCKERFILE_PROFILES),
+                        default=generate.DEFAULT_PROFILE,
+                        help='Dockerfile profile (default: %s)' % generate.DEFAULT_PROFILE)
+    parser.add_argument('--deploy', choices=sorted(generate.DEPLOY_MODES), default=generate.DEFAULT_DEPLOY,
+                        help='hook: Render builds the Dockerfile; prebuilt: CI builds and pushes the image '
+                             '(default: %s)' % generate.DEFAULT_DEPLOY)
+    parser.add_argument('--github-owner', help='GitHub user or organization (names the GHCR image)')
+    parser.add_argument('--object-cache', nargs='?', const=generate.DEFAULTS['cache_plan'], metavar='PLAN',
+                        help='add a Render Key Value service as WordPress\'s persistent object cache '
+                             '(plan, default: %s)' % generate.DEFAULTS['cache_plan'])
+    parser.add_argument('--csv', metavar='FILE', help='scaffold every site listed in FILE')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes for --csv (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='overwrite files that differ')
+    parser.add_argument('--no-validate', dest='validate', action='store_false',
+                        help='skip running the validator on the result')
+    parser.add_argument('--self-check', action='store_true',
+                        help='scaffold the default site in every profile, deploy mode and object cache '
+                             'combination into a temporary directory; fail unless all validate')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.self_check:
+        return run_self_check()
+    if not args.target:
+        parser.error('DIR is required')
+    if bool(args.csv) == bool(args.site):
+        parser.error('give either --site NAME or --csv FILE')
+    start = time.perf_counter()
+    cache = 'keyvalue' if args.object_cache else generate.DEFAULT_OBJECT_CACHE
+
+    if args.site:
+        try:
+            variables = site_variables(args.site, args.region, args.plan, args.disk_gb,
+                                       args.database, args.branch, github_owner=args.github_owner,
+                                       cache_plan=args.object_cache)
+            written, report = scaffold(args.target, variables, args.force, args.validate,
+                                       profile=args.dockerfile, deploy=args.deploy, cache=cache)
+        except (ScaffoldError, generate.TemplateError) as e:
+            print('❌ %s' % e, file=sys.stderr)
+            return 2
+        for rel in written:
+            print('✅ wrote %s' % os.path.join(args.target, rel))
+        if report is not None:
+            print()
+            print(validate_setup.format_report(report, color=sys.stdout.isatty()))
+        print('\nScaffolded %s in %.0f ms' % (args.target, (time.perf_counter() - start) * 1000))
+        return 0 if report is None else report.exit_code
+
+    try:
+        sites = read_sites(args.csv, args.target, args.object_cache)
+    except (ScaffoldError, OSError) as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 2
+    failed = 0
+    results = scaffold_many(sites, args.force, args.validate, args.jobs, args.dockerfile, args.deploy, cache)
+    for target, written, errors, error in results:
+        if error:
+            failed += 1
+            print('❌ %s' % error)
+        elif errors:
+            failed += 1
+            print('❌ %s: %d file(s) written, %d validation issue(s)' % (target, written, errors))
+        else:
+            print('✅ %s: %d file(s) written' % (target, written))
+    print('%s %d/%d sites scaffolded in %.2fs' % (
+        '✅' if not failed else '❌', len(sites) - failed, len(sites), time.perf_counter() - start,
+    ), file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# Classify a push's changed paths by the Render service they affect
+#
+# Every changed path falls in one category:
+#   web image        Dockerfile, .dockerignore, or a path the Dockerfile
+#                    COPYs/ADDs into the image (e.g. wp-content/), minus
+#                    what .dockerignore excludes
+#   web config       render.yaml, where the web service's entry changed
+#   database config  render.yaml, where only the database's entry changed
+#   ci               .github/ (workflows and their scripts)
+#   docs/other       everything else: guides, QUICK_REFERENCE.md, charts,
+#                    architecture.png, ... nothing Render runs
+#
+# A web image change needs the image rebuilt and the deploy hook called. So
+# does a change to the web service's render.yaml entry: render.yaml sets
+# autoDeploy: false, so nothing else deploys the service, and a Blueprint
+# sync (when enabled at all) only updates its settings. A change limited to
+# the database's entry does not touch the web service, and ci and docs
+# changes do not reach Render at all. The decision and a summary of why
+# go to stdout, $GITHUB_OUTPUT (deploy=true|false, categories=...) and
+# $GITHUB_STEP_SUMMARY. When the diff cannot be computed (first push of a
+# branch, history rewritten) it decides to deploy, to be safe.
+#
+# Standard library only; PyYAML, if installed, narrows render.yaml changes
+# to the services whose entries changed (otherwise both are assumed).
+#
+# Usage:
+#   python3 classify_changes.py --base BEFORE_SHA [--head HEAD]
+#   python3 classify_changes.py --paths Dockerfile README.md ...
+
+import argparse
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+WEB = 'web image'
+WEB_CONFIG = 'web config'
+DB_CONFIG = 'database config'
+CI = 'ci'
+DOCS = 'docs/other'
+CATEGORIES = (WEB, WEB_CONFIG, DB_CONFIG, CI, DOCS)
+
+DOCKERFILE = 'Dockerfile'
+DOCKERIGNORE = '.dockerignore'
+RENDER_YAML = 'render.yaml'
+NULL_SHA = re.compile(r'^0*$')
+SHOWN = 5     # paths listed per category in the summary
+
+
+class DiffError(Exception):
+    pass
+
+
+def _git(*args, check=True):
+    proc = subprocess.run(('git',) + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if check and proc.returncode != 0:
+        raise DiffError('git %s: %s' % (args[0], proc.stderr.decode(errors='replace').strip()))
+    return proc.stdout.decode('utf-8', errors='replace') if proc.returncode == 0 else None
+
+
+def changed_paths(base, head='HEAD'):
+    """Paths changed between two commits; fetches `base` if a shallow clone lacks it."""
+    if not base or NULL_SHA.match(base):
+        raise DiffError('no base commit (first push of the branch)')
+    if _git('cat-file', '-e', base + '^{commit}', check=False) is None:
+        _git('fetch', '--no-tags', '--depth=1', 'origin', base, check=False)
+    out = _git('diff', '--name-only', '--no-renames', '-z', base, head)
+    return [p for p in out.split('\0') if p]
+
+
+def show(rev, path):
+    """Contents of `path` at `rev`, or None if it did not exist there."""
+    return _git('show', '%s:%s' % (rev, path), check=False)
+
+
+def _instructions(text):
+    """(keyword, [words]) per Dockerfile instruction, continuation lines joined."""
+    buf = []
+    for raw in (text or '').splitlines():
+        line = raw.strip()
+        if not buf and (not line or line.startswith('#')):
+            continue
+        if buf and line.startswith('#'):
+            continue
+        if line.endswith('\\'):
+            buf.append(line[:-1])
+            continue
+        buf.append(line)
+        logical = ' '.join(buf)
+        buf = []
+        keyword, _, args = logical.partition(' ')
+        args = args.strip()
+        if args.startswith('['):
+            try:
+                words = [str(w) for w in json.loads(args)]
+            except ValueError:
+                words = args.split()
+        else:
+            try:
+                words = shlex.split(args)
+            except ValueError:
+                words = args.split()
+        yield keyword.upper(), words
+
+
+def image_sources(dockerfile):
+    """Build-context paths the Dockerfile copies into the image (COPY/ADD without --from)."""
+    sources = []
+    for keyword, words in _instructions(dockerfile):
+        if keyword not in ('COPY', 'ADD'):
+            continue
+        if any(w.startswith('--from') for w in words):
+            continue
+        args = [w for w in words if not w.startswith('--')]
+        for src in args[:-1]:
+            if '://' in src:
+                continue  # ADD of a URL
+            src = os.path.normpath(src.lstrip('/')).replace(os.sep, '/')
+            sources.append('' if src == '.' else src)
+    return sources
+
+
+def _ignore_patterns(dockerignore):
+    patterns = []
+    for line in (dockerignore or '').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        pattern = os.path.normpath(line.lstrip('!').strip('/')).replace(os.sep, '/')
+        patterns.append((negate, _glob_regex(pattern)))
+    return patterns
+
+
+def _glob_regex(pattern):
+    """`*` and `?` stay within one path segment, `**` spans any number."""
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            out.append('[^/]')
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile(''.join(out) + r'\Z')
+
+
+def _ignored(path, patterns):
+    """.dockerignore semantics: the last matching pattern wins; a match on a directory covers its contents."""
+    parts = path.split('/')
+    prefixes = ['/'.join(parts[:i]) for i in range(1, len(parts) + 1)]
+    ignored = False
+    for negate, regex in patterns:
+        if any(regex.match(p) for p in prefixes):
+            ignored = not negate
+    return ignored
+
+
+def in_image(path, sources, ignore_patterns=()):
+    if path in (DOCKERFILE, DOCKERIGNORE):
+        return True
+    if _ignored(path, ignore_patterns):
+        return False
+    for src in sources:
+        if src == '' or path == src or path.startswith(src + '/') or _glob_regex(src).match(path):
+            return True
+    return False
+
+
+def _services(text):
+    """{name: (type, entry)} from render.yaml text; None if it cannot be parsed."""
+    if text is None:
+        return {}
+    if yaml is None:
+        return None
+    try:
+        doc = yaml.safe_load(text)
+    except yaml.YAMLError:
+        return None
+    services = doc.get('services') if isinstance(doc, dict) else None
+    return {s.get('name'): (s.get('type'), s) for s in services or () if isinstance(s, dict)}
+
+
+def render_categories(old, new):
+    """Categories a render.yaml change falls in, from its old and new text."""
+    before, after = _services(old), _services(new)
+    if before is None or after is None:
+        return [WEB_CONFIG, DB_CONFIG]
+    found = []
+    for name in list(before) + [n for n in after if n not in before]:
+        if before.get(name) != after.get(name):
+            kind = (after.get(name) or before.get(name))[0]
+            category = WEB_CONFIG if kind == 'web' else DB_CONFIG
+            if category not in found:
+                found.append(category)
+    return found or [WEB_CONFIG]
+
+
+def classify(paths, dockerfile, dockerignore=None, render_old=None, render_new=None):
+    """{category: [path, ...]} for the changed paths, in CATEGORIES order."""
+    sources = image_sources(dockerfile)
+    patterns = _ignore_patterns(dockerignore)
+    found = {}
+    for path in paths:
+        if path == RENDER_YAML:
+            categories = render_categories(render_old, render_new)
+        elif path.startswith('.github/'):
+            categories = [CI]
+        elif in_image(path, sources, patterns):
+            categories = [WEB]
+        else:
+            categories = [DOCS]
+        for category in categories:
+            found.setdefault(category, []).append(path)
+    return {c: found[c] for c in CATEGORIES if c in found}
+
+
+def decide(found):
+    """(deploy, reason)."""
+    if WEB in found:
+        paths = found[WEB]
+        more = ' and %d more' % (len(paths) - 1) if len(paths) > 1 else ''
+        return True, 'the web image changed (%s%s)' % (paths[0], more)
+    if WEB_CONFIG in found:
+        return True, "the web service's render.yaml entry changed"
+    if not found:
+        return False, 'nothing changed'
+    reasons = []
+    if DB_CONFIG in found:
+        reasons.append("render.yaml changed only the database, which the deploy hook does not redeploy")
+    rest = [c for c in (CI, DOCS) if c in found]
+    if rest:
+        reasons.append('%s changes do not reach Render' % ' and '.join(rest))
+    return False, '; '.join(reasons)
+
+
+def format_summary(found, deploy, reason, markdown=False):
+    lines = []
+    if markdown:
+        lines += ['### Deploy decision', '',
+                  '%s: %s' % ('**Deploying**' if deploy else '**Skipping the deploy**', reason), '']
+        if found:
+            lines += ['| Category | Paths |', '| --- | --- |']
+        for category, paths in found.items():
+            shown = ', '.join('`%s`' % p for p in paths[:SHOWN])
+            lines.append('| %s | %s%s |' % (category, shown, ' (+%d more)' % (len(paths) - SHOWN)
+                                            if len(paths) > SHOWN else ''))
+        return '\n'.join(lines) + '\n'
+    for category, paths in found.items():
+        for path in paths[:SHOWN]:
+            lines.append('   %-16s %s' % (category, path))
+        if len(paths) > SHOWN:
+            lines.append('   %-16s ... %d more' % (category, len(paths) - SHOWN))
+    lines.append('%s %s' % ('✅ deploying:' if deploy else '·  skipping the deploy:', reason))
+    return '\n'.join(lines)
+
+
+def _append(env_name, text):
+    path = os.environ.get(env_name)
+    if path:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decide whether a push needs a Render deploy from the paths it changed.")
+    parser.add_argument('--base', help='commit before the push (github.event.before)')
+    parser.add_argument('--head', default='HEAD', help='commit pushed (default: HEAD)')
+    parser.add_argument('--paths', nargs='+', metavar='PATH', help='classify these paths instead of a git diff')
+    args = parser.parse_args(argv)
+
+    def read(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    if args.paths:
+        paths = args.paths
+        dockerfile, dockerignore = read(DOCKERFILE), read(DOCKERIGNORE)
+        render_old, render_new = None, read(RENDER_YAML)
+    else:
+        try:
+            paths = changed_paths(args.base, args.head)
+        except DiffError as e:
+            print('⚠️ cannot diff the push (%s); deploying to be safe' % e)
+            _append('GITHUB_OUTPUT', 'deploy=true\ncategories=unknown\n')
+            return 0
+        dockerfile, dockerignore = show(args.head, DOCKERFILE), show(args.head, DOCKERIGNORE)
+        render_old, render_new = show(args.base, RENDER_YAML), show(args.head, RENDER_YAML)
+
+    found = classify(paths, dockerfile, dockerignore, render_old, render_new)
+    deploy, reason = decide(found)
+    print('%d changed path%s' % (len(paths), '' if len(paths) == 1 else 's'))
+    print(format_summary(found, deploy, reason))
+    _append('GITHUB_OUTPUT', 'deploy=%s\ncategories=%s\n' % ('true' if deploy else 'false', ','.join(found)))
+    _append('GITHUB_STEP_SUMMARY', format_summary(found, deploy, reason, markdown=True))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# Render deploy client: trigger, coalesce, retry, poll, record
+#
+# Replaces the bare `curl --request POST $RENDER_DEPLOY_HOOK_URL` step:
+#   - coalesces bursts of pushes, latest wins: it waits --settle seconds
+#     first (a newer push that also deploys cancels this job meanwhile,
+#     through the deploy job's concurrency group), then cancels Render
+#     deploys still in progress for older pushes before triggering its own
+#   - retries the hook and every API call on connection errors, 429 and 5xx
+#     with exponential backoff and full jitter, honoring Retry-After
+#   - polls the deploy until it is live or has failed
+#   - appends how long each phase took (webhook, queued, build, pre-deploy,
+#     restart) to a deploy_timings.py store, one JSON line per deploy
+#
+# Cancelling and polling use the Render API and need RENDER_API_KEY;
+# without it the client only triggers the hook (with retries), as the curl
+# did. Standard library only, so the workflow can run it without installs.
+#
+# Usage:
+#   RENDER_DEPLOY_HOOK_URL=... RENDER_API_KEY=... python3 deploy_client.py
+#       [--image REF] [--settle SECONDS] [--timeout SECONDS] [--store FILE]
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+API_URL = 'https://api.render.com/v1'
+DEFAULT_STORE = 'deploy-timings.jsonl'
+
+RETRIES = 5
+BACKOFF_BASE = 1.0     # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_CAP = 30.0
+POLL_INTERVAL = 5.0
+TIMEOUT = 1200.0
+SETTLE = 10.0
+
+# Render deploy status -> phase it belongs to
+PHASES = {
+    'created': 'queued',
+    'queued': 'queued',
+    'build_in_progress': 'build',
+    'pre_deploy_in_progress': 'pre-deploy',
+    'update_in_progress': 'restart',
+}
+LIVE = 'live'
+FAILED = frozenset(('build_failed', 'update_failed', 'pre_deploy_failed', 'deactivated'))
+CANCELED = 'canceled'
+
+SERVICE_ID = re.compile(r'/deploy/(srv-[A-Za-z0-9]+)')
+
+
+class DeployError(Exception):
+    pass
+
+
+class Client:
+    """HTTP calls to the deploy hook and the Render API, with retries."""
+
+    def __init__(self, hook_url, api_key=None, api_url=API_URL, retries=RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_cap=BACKOFF_CAP, sleep=time.sleep, log=print):
+        self.hook_url = hook_url
+        self.api_key = api_key
+        self.api_url = api_url.rstrip('/')
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.sleep = sleep
+        self.log = log
+        self.attempts = 0              # HTTP requests sent, retries included
+        match = SERVICE_ID.search(urllib.parse.urlparse(hook_url).path)
+        self.service = match.group(1) if match else None
+
+    def backoff(self, attempt, retry_after=None):
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)], at least Retry-After."""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+    def request(self, method, url, body=None, auth=False):
+        """(status, parsed JSON or None); raises DeployError once retries are exhausted."""
+        headers = {'Accept': 'application/json'}
+        if auth:
+            headers['Authorization'] = 'Bearer %s' % self.api_key
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(self.retries + 1):
+            self.attempts += 1
+            retry_after, problem = None, None
+            try:
+                req = urllib.request.Request(url, data=data, headers=headers, method=method)
+                with urllib.request.urlopen(req, timeout=30) as resp:
+                    raw = resp.read()
+                    return resp.status, json.loads(raw) if raw.strip() else None
+            except urllib.error.HTTPError as e:
+                if e.code not in (408, 429) and e.code < 500:
+                    raise DeployError('%s %s: HTTP %d %s' % (method, _redact(url), e.code, e.reason))
+                problem = 'HTTP %d' % e.code
+                try:
+                    retry_after = float(e.headers.get('Retry-After') or 0)
+                except ValueError:
+                    retry_after = None
+            except (urllib.error.URLError, OSError) as e:
+                problem = str(getattr(e, 'reason', e))
+            except ValueError:
+                raise DeployError('%s %s: response is not JSON' % (method, _redact(url)))
+            if attempt == self.retries:
+                raise DeployError('%s %s: %s after %d attempts' % (method, _redact(url), problem, attempt + 1))
+            delay = self.backoff(attempt, retry_after)
+            self.log('⚠️ %s %s: %s, retrying in %.1fs' % (method, _redact(url), problem, delay))
+            self.sleep(delay)
+
+    def trigger(self, image=None):
+        """Call the deploy hook; returns the new deploy's id, or None if Render did not say."""
+        url = self.hook_url
+        if image:
+            sep = '&' if urllib.parse.urlparse(url).query else '?'
+            url += sep + urllib.parse.urlencode({'imgURL': image})
+        _, body = self.request('POST', url)
+        deploy = (body or {}).get('deploy', body) if isinstance(body, dict) else None
+        return deploy.get('id') if isinstance(deploy, dict) else None
+
+    def deploys(self, limit=20):
+        _, body = self.request('GET', '%s/services/%s/deploys?limit=%d' % (self.api_url, self.service, limit),
+                               auth=True)
+        return [item.get('deploy', item) for item in body or () if isinstance(item, dict)]
+
+    def deploy(self, deploy_id):
+        _, body = self.request('GET', '%s/services/%s/deploys/%s' % (self.api_url, self.service, deploy_id),
+                               auth=True)
+        return body or {}
+
+    def cancel(self, deploy_id):
+        self.request('POST', '%s/services/%s/deploys/%s/cancel' % (self.api_url, self.service, deploy_id),
+                     auth=True)
+
+
+def _redact(url):
+    """`url` without its query string (the deploy hook key is a secret)."""
+    parts = urllib.parse.urlparse(url)
+    return urllib.parse.urlunparse(parts._replace(query='key=***' if parts.query else ''))
+
+
+def supersede(client):
+    """Cancel deploys of older pushes that are still in progress; returns their ids."""
+    canceled = []
+    for deploy in client.deploys():
+        if deploy.get('status') in PHASES and deploy.get('id'):
+            client.cancel(deploy['id'])
+            canceled.append(deploy['id'])
+    return canceled
+
+
+def poll(client, deploy_id, interval=POLL_INTERVAL, timeout=TIMEOUT, clock=time.monotonic):
+    """Follow a deploy to its end; returns (final status, [(phase, seconds), ...])."""
+    start = clock()
+    phases = []
+    current, since = None, start
+    while True:
+        status = client.deploy(deploy_id).get('status')
+        now = clock()
+        phase = PHASES.get(status)
+        if phase != current:
+            if current is not None:
+                phases.append((current, now - since))
+            if phase is not None:
+                client.log('·  %s: %s' % (deploy_id, status))
+            current, since = phase, now
+        if status == LIVE or status in FAILED or status == CANCELED:
+            return status, phases
+        if now - start > timeout:
+            if current is not None:
+                phases.append((current, now - since))
+            return 'timeout', phases
+        client.sleep(interval)
+
+
+# timing_record() and append_record() must stay identical to
+# deploy_timings.make_record() and deploy_timings.append() in what they
+# write: this script is copied into projects on its own and cannot import
+# deploy_timings.py, which reads the store back.
+def timing_record(site, deploy_id, at, phases, status, image=None):
+    """One deploy_timings.py store line: phases as [name, start, end] from the deploy's start."""
+    spans, clock = [], 0.0
+    for name, seconds in phases:
+        spans.append([name, round(clock, 3), round(clock + seconds, 3)])
+        clock += seconds
+    record = {'deploy': deploy_id, 'site': site, 'at': round(at, 3), 'phases': spans, 'status': status}
+    if image:
+        record['image'] = image
+    return record
+
+
+def append_record(path, record):
+    """Append as a single O_APPEND write, like deploy_timings.append."""
+    line = (json.dumps(record, separators=(',', ':'), ensure_ascii=False) + '\n').encode('utf-8')
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def run(client, image=None, settle=SETTLE, interval=POLL_INTERVAL, timeout=TIMEOUT,
+        store=None, site=None, clock=time.monotonic):
+    """Deploy once; returns (status, deploy id, phases). status is 'triggered'
+    when there is no API key to follow the deploy with."""
+    if settle > 0:
+        client.log('·  waiting %.0fs for newer pushes' % settle)
+        client.sleep(settle)
+    polling = bool(client.api_key and client.service)
+    if polling:
+        for deploy_id in supersede(client):
+            client.log('·  canceled superseded deploy %s' % deploy_id)
+
+    at = time.time()
+    start = clock()
+    deploy_id = client.trigger(image)
+    phases = [('webhook', clock() - start)]
+    client.log('✅ deploy hook called%s' % (' (%s)' % deploy_id if deploy_id else ''))
+    if not polling:
+        status = 'triggered'
+    else:
+        if deploy_id is None:
+            recent = client.deploys(limit=1)
+            deploy_id = recent[0].get('id') if recent else None
+        if deploy_id is None:
+            raise DeployError('Render did not report the new deploy')
+        status, more = poll(client, deploy_id, interval, timeout, clock)
+        phases += more
+    if store:
+        append_record(store, timing_record(site or client.service or 'render', deploy_id or 'unknown',
+                                           at, phases, status, image))
+    return status, deploy_id, phases
+
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Trigger a Render deploy and follow it until it is live.')
+    parser.add_argument('--hook-url', default=os.environ.get('RENDER_DEPLOY_HOOK_URL'),
+                        help='deploy hook URL (default: $RENDER_DEPLOY_HOOK_URL)')
+    parser.add_argument('--api-url', default=os.environ.get('RENDER_API_URL', API_URL),
+                        help='Render API base URL (default: %s)' % API_URL)
+    parser.add_argument('--image', help='image to deploy (imgURL), for image-backed services')
+    parser.add_argument('--settle', type=float, default=_env_float('DEPLOY_SETTLE', SETTLE),
+                        help='seconds to wait for newer pushes first (default: %.0f)' % SETTLE)
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL,
+                        help='seconds between status checks (default: %.0f)' % POLL_INTERVAL)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help='give up following the deploy after this many seconds (default: %.0f)' % TIMEOUT)
+    parser.add_argument('--retries', type=int, default=RETRIES,
+                        help='retries per HTTP call (default: %d)' % RETRIES)
+    parser.add_argument('--store', default=DEFAULT_STORE,
+                        help='deploy timing store to append to (default: %s)' % DEFAULT_STORE)
+    parser.add_argument('--no-record', dest='store', action='store_const', const=None,
+                        help='do not record phase timings')
+    parser.add_argument('--site', help='site name in the timing record (default: the service id)')
+    args = parser.parse_args(argv)
+
+    if not args.hook_url:
+        print('⚠️ RENDER_DEPLOY_HOOK_URL secret not set. Manual deploy required on first deployment.')
+        return 0
+    client = Client(args.hook_url, os.environ.get('RENDER_API_KEY'), args.api_url, args.retries)
+    if not client.api_key:
+        print('⚠️ RENDER_API_KEY not set: triggering only (no cancelling of older deploys, no status)')
+    try:
+        status, deploy_id, phases = run(client, args.image, args.settle, args.poll, args.timeout,
+                                        args.store, args.site)
+    except DeployError as e:
+        print('❌ %s' % e, file=sys.stderr)
+        return 1
+
+    timings = ', '.join('%s %.1fs' % phase for phase in phases)
+    if status == LIVE:
+        print('✅ %s is live (%s)' % (deploy_id, timings))
+        return 0
+    if status == 'triggered':
+        return 0
+    if status == CANCELED:
+        print('⚠️ %s was canceled, most likely superseded by a newer push' % deploy_id)
+        return 0
+    print('❌ %s ended %s (%s)' % (deploy_id, status, timings), file=sys.stderr)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
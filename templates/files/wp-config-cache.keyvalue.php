@@ -0,0 +1,7 @@
+// Persistent object cache (Redis Object Cache plugin) on the Key Value service
+define('WP_REDIS_HOST', getenv('WP_REDIS_HOST'));
+define('WP_REDIS_PORT', (int) getenv('WP_REDIS_PORT'));
+define('WP_REDIS_PREFIX', '%%site%%:');
+define('WP_REDIS_MAXTTL', 86400);
+define('WP_REDIS_TIMEOUT', 1);
+define('WP_REDIS_READ_TIMEOUT', 1);
@@ -0,0 +1,223 @@
+# Architecture diagrams derived from a project's render.yaml and workflow
+#
+# Instead of hardcoded positions, the diagram model is read from the
+# project: every render.yaml service becomes a node (web services,
+# pserv/MySQL databases, key-value stores, workers), each `disk:` a disk
+# node, each `ipWhitelist` entry a link from the client service to the
+# database, each `fromService` reference to a key-value store a link from
+# the service reading it, and the deploy workflow's push trigger decides
+# whether GitHub Actions sits between the repository and Render. Services
+# deployed from a prebuilt image (runtime: image) pull it from a container
+# registry node the workflow pushes to. Nodes are then placed by a layered
+# layout (longest path from the developer, ordered within a layer by their
+# predecessors' positions).
+#
+# Node ids and labels are generic (the web service is "Render Web
+# WordPress", not its service name) unless a project has several services
+# of one kind, so that the model describes the topology rather than the
+# site. Rendered SVGs are cached under the hash of that model, so projects
+# that share a topology (most of a fleet) are rendered once.
+
+import hashlib
+import json
+import os
+
+import diagram_svg
+import validate_setup
+from validate_cache import write_atomic
+
+RENDERER_VERSION = 1
+
+# node kind -> colour, following chart_script.py's palette
+COLORS = {
+    'dev': '#1FB8CD',
+    'repo': '#DB4545',
+    'actions': '#2E8B57',
+    'web': '#5D878F',
+    'database': '#D2BA4C',
+    'disk': '#B4413C',
+    'users': '#964325',
+    'keyvalue': '#944454',
+    'worker': '#13343B',
+    'registry': '#1FB8CD',
+}
+
+LAYER_GAP = 1.5     # data units between layers
+ROW_GAP = 1.5       # data units between nodes of one layer
+
+
+def _service_kind(service):
+    stype = service.get('type')
+    if stype in ('keyvalue', 'redis'):
+        return 'keyvalue'
+    if stype == 'pserv' or service.get('runtime') == 'mysql':
+        return 'database'
+    if stype == 'web':
+        return 'web'
+    return 'worker'
+
+
+def _service_label(service, kind, named):
+    """Node label; `named` adds the service name, to tell apart services of one kind."""
+    docker = service.get('runtime') == 'docker' or service.get('env') == 'docker'
+    first, second = {
+        'web': ('Render Web', 'WordPress' if docker else 'Service'),
+        'database': ('MySQL' if service.get('runtime') in ('mysql', None) else str(service['runtime']),
+                     'Database'),
+        'keyvalue': ('Key Value', 'Cache'),
+    }.get(kind, (str(service.get('type') or 'service').capitalize(), 'Service'))
+    return '%s<br>%s' % (first, service.get('name') if named else second)
+
+
+def build_topology(root='.', project=None):
+    """(nodes, edges) for a project.
+
+    nodes: {id: {'label': ..., 'kind': ...}} in insertion order;
+    edges: [(from_id, to_id, label)].
+    """
+    project = project or validate_setup.Project(root)
+    services = validate_setup.render_services(project)
+    nodes = {
+        'dev': {'label': 'Local Dev<br>Machine', 'kind': 'dev'},
+        'github': {'label': 'GitHub<br>Repository', 'kind': 'repo'},
+    }
+    edges = [('dev', 'github', 'git push')]
+
+    branches = None
+    if project.exists(validate_setup.WORKFLOW):
+        doc, error = project.yaml(validate_setup.WORKFLOW)
+        if error is None:
+            branches = validate_setup.workflow_push_branches(doc)
+    if branches is not None:
+        nodes['actions'] = {'label': 'GitHub<br>Actions', 'kind': 'actions'}
+        edges.append(('github', 'actions', 'push to %s' % ', '.join(branches) if branches else 'push'))
+
+    kinds = [_service_kind(service) for service in services]
+    names, seen = {}, {}
+    for service, kind in zip(services, kinds):
+        seen[kind] = seen.get(kind, 0) + 1
+        node = kind if seen[kind] == 1 else '%s-%d' % (kind, seen[kind])
+        names[service.get('name')] = node
+        nodes[node] = {'label': _service_label(service, kind, kinds.count(kind) > 1), 'kind': kind}
+
+    for service in services:
+        node = names[service.get('name')]
+        kind = nodes[node]['kind']
+        if kind in ('web', 'worker'):
+            docker = service.get('runtime') == 'docker' or service.get('env') == 'docker'
+            if service.get('runtime') == 'image':
+                # prebuilt: CI pushes the image, Render pulls it
+                if 'registry' not in nodes:
+                    nodes['registry'] = {'label': 'Container<br>Registry', 'kind': 'registry'}
+                    if branches is not None:
+                        edges.append(('actions', 'registry', 'docker push'))
+                # the workflow's deploy hook names the tag to pull
+                edges.append(('registry', node, 'deploy hook<br>pull image' if branches is not None
+                              else 'pull image'))
+            elif branches is not None:
+                edges.append(('actions', node, 'webhook<br>Docker build' if docker else 'deploy hook'))
+            elif service.get('autoDeploy', True) is not False:
+                edges.append(('github', node, 'auto-deploy'))
+        disk = service.get('disk')
+        if isinstance(disk, dict):
+            disk_node = 'disk' if 'disk' not in nodes else 'disk-%s' % node
+            size = disk.get('sizeGB')
+            nodes[disk_node] = {'label': 'Persistent<br>Disk%s' % (' %sGB' % size if size else ''),
+                                'kind': 'disk'}
+            edges.append((node, disk_node, 'mount<br>storage'))
+        for entry in service.get('ipWhitelist') or ():
+            client = names.get(entry.get('service')) if isinstance(entry, dict) else None
+            if client:
+                edges.append((client, node, 'DB queries' if kind == 'database' else 'cache'))
+        # envVars fromService: e.g. WordPress reading the Key Value host/port
+        linked = set()
+        for entry in service.get('envVars') or ():
+            source = entry.get('fromService') if isinstance(entry, dict) else None
+            target = names.get(source.get('name')) if isinstance(source, dict) else None
+            if target and target not in linked and nodes[target]['kind'] == 'keyvalue':
+                linked.add(target)
+                edges.append((node, target, 'object cache'))
+
+    web = [n for n, d in nodes.items() if d['kind'] == 'web']
+    if web:
+        nodes['users'] = {'label': 'Internet<br>Users', 'kind': 'users'}
+        edges.extend((n, 'users', 'HTTP/HTTPS') for n in web)
+    return nodes, edges
+
+
+def layered_layout(nodes, edges):
+    """{id: (x, y)}: layer = longest path from a source, rows ordered by barycenter."""
+    preds = {n: [] for n in nodes}
+    for a, b, _ in edges:
+        if a in nodes and b in nodes and a != b:
+            preds[b].append(a)
+
+    layer = {}
+
+    def depth(n, stack=()):
+        if n not in layer:
+            if n in stack:          # a cycle; break it here
+                return 0
+            layer[n] = 1 + max((depth(p, stack + (n,)) for p in preds[n]), default=-1)
+        return layer[n]
+
+    for n in nodes:
+        depth(n)
+
+    columns = {}
+    for n in nodes:  # insertion order keeps the layout stable
+        columns.setdefault(layer[n], []).append(n)
+    tallest = max(len(c) for c in columns.values())
+    positions, rank = {}, {}
+    for col in sorted(columns):
+        members = columns[col]
+        if col:
+            def barycenter(n):
+                placed = [rank[p] for p in preds[n] if p in rank]
+                return sum(placed) / len(placed) if placed else 0
+            members.sort(key=barycenter)
+        offset = (tallest - len(members)) / 2.0
+        for i, n in enumerate(members):
+            rank[n] = offset + i
+            positions[n] = (col * LAYER_GAP, (tallest - 1 - rank[n]) * ROW_GAP)
+    return positions
+
+
+def topology_hash(nodes, edges, title=''):
+    data = {'version': RENDERER_VERSION, 'nodes': nodes, 'edges': edges, 'title': title}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'grw-diagrams')
+
+
+def render_topology(nodes, edges, title=''):
+    positions = layered_layout(nodes, edges)
+    components = {n: {'label': d['label'], 'color': COLORS[d['kind']]} for n, d in nodes.items()}
+    layers = len({x for x, _ in positions.values()})
+    rows = len({y for _, y in positions.values()})
+    width = max(diagram_svg.WIDTH, 180 * layers + 160)
+    height = max(diagram_svg.HEIGHT, 150 * rows + 180)
+    return diagram_svg.render_svg(positions, edges, components, title, width=width, height=height)
+
+
+def project_diagram(root='.', cache_dir=None, title=''):
+    """(svg, topology hash, cached) for a project, reusing an SVG rendered for the same topology."""
+    nodes, edges = build_topology(root)
+    digest = topology_hash(nodes, edges, title)
+    cache_dir = cache_dir or default_cache_dir()
+    path = os.path.join(cache_dir, digest + '.svg')
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read(), digest, True
+    except OSError:
+        pass
+    svg = render_topology(nodes, edges, title)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_atomic(path, svg.encode('utf-8'))
+    except OSError:
+        pass  # an unwritable cache only costs a re-render
+    return svg, digest, False
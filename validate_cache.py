@@ -0,0 +1,168 @@
+# On-disk cache of validator check results
+#
+# Results are keyed on the validator version, the check name and the sha256
+# of every file the check reads, so an edit to any input (or a validator
+# upgrade) misses the cache. File hashes are themselves indexed by
+# (mtime, size): an untouched file is not even opened on the next run.
+#
+# The cache lives in .validate-cache/ inside the project. The directory
+# carries its own `.gitignore` (like .pytest_cache) so it never gets
+# committed, whatever the project's .gitignore says.
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIR = '.validate-cache'
+CACHE_FILE = 'results.json'
+
+# Entries not used for MAX_AGE seconds are dropped; beyond MAX_ENTRIES the
+# least recently used go first.
+MAX_ENTRIES = 512
+MAX_AGE = 30 * 24 * 3600
+
+# A hit only refreshes an entry's last-used time once it is this old, so a
+# fully warm run leaves results.json untouched; eviction works in days and
+# hundreds of entries, so the hour of slack does not change what it drops.
+TOUCH_INTERVAL = 3600
+
+# A file modified this recently may be modified again within the same mtime
+# tick, so its (mtime, size) is not trusted and it is re-hashed.
+RACY_WINDOW = 2.0
+
+MISSING = '-'
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def write_atomic(path, data):
+    """Write bytes to `path` via a temp file in the same directory plus rename."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ResultCache:
+    def __init__(self, root, version, directory=None, max_entries=MAX_ENTRIES, max_age=MAX_AGE):
+        self.root = root
+        self.version = version
+        self.dir = directory or os.path.join(root, CACHE_DIR)
+        self.path = os.path.join(self.dir, CACHE_FILE)
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._stats = {}
+        self._entries = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Anything written by another validator version is stale as a whole
+        if not isinstance(data, dict) or data.get('version') != self.version:
+            self._dirty = True
+            return
+        self._stats = data.get('stats') or {}
+        self._entries = data.get('entries') or {}
+
+    def digest(self, rel):
+        """sha256 of a project file, or MISSING; reuses the hash if (mtime, size) match."""
+        path = os.path.join(self.root, rel)
+        try:
+            st = os.stat(path)
+        except OSError:
+            if self._stats.pop(rel, None) is not None:
+                self._dirty = True
+            return MISSING
+        if not os.path.isfile(path):
+            return MISSING
+
+        known = self._stats.get(rel)
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size:
+            return known[2]
+        try:
+            sha = _sha256(path)
+        except OSError:
+            return MISSING
+        if time.time() - st.st_mtime > RACY_WINDOW:
+            self._stats[rel] = [st.st_mtime_ns, st.st_size, sha]
+            self._dirty = True
+        return sha
+
+    def key(self, name, inputs):
+        h = hashlib.sha256()
+        h.update(('%s\0%s\0' % (self.version, name)).encode())
+        for rel in inputs:
+            h.update(('%s\0%s\0' % (rel, self.digest(rel))).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """Cached [[status, message], ...] for `key`, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - entry.get('used', 0) >= TOUCH_INTERVAL:
+            entry['used'] = now
+            self._dirty = True
+        return entry['results']
+
+    def put(self, key, results):
+        self._entries[key] = {'used': time.time(), 'results': results}
+        self._dirty = True
+
+    def evict(self):
+        """Drop entries unused for max_age, then the oldest beyond max_entries."""
+        cutoff = time.time() - self.max_age
+        entries = {k: e for k, e in self._entries.items() if e.get('used', 0) >= cutoff}
+        if len(entries) > self.max_entries:
+            keep = sorted(entries, key=lambda k: entries[k]['used'], reverse=True)
+            entries = {k: entries[k] for k in keep[:self.max_entries]}
+        if len(entries) != len(self._entries):
+            self._entries = entries
+            self._dirty = True
+
+    def save(self):
+        self.evict()
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            ignore = os.path.join(self.dir, '.gitignore')
+            if not os.path.exists(ignore):
+                with open(ignore, 'w') as f:
+                    f.write('# Created by validate_setup.py\n*\n')
+            data = {'version': self.version, 'stats': self._stats, 'entries': self._entries}
+            write_atomic(self.path, json.dumps(data, separators=(',', ':')).encode())
+        except OSError:
+            return  # a read-only checkout just runs uncached
+        self._dirty = False
+
+    def clear(self):
+        self._stats = {}
+        self._entries = {}
+        self._dirty = True
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# Fleet mode for validate_setup.py
+#
+# Validates many WordPress-on-Render project directories in one invocation.
+# Projects are spread over a process pool (one interpreter per worker, not
+# per project) and each result is written as a JSON line the moment that
+# project finishes. A JUnit XML summary can be written at the end for CI.
+#
+# Usage:
+#   python3 validate_fleet.py 'sites/*' other-site [--from-file roots.txt]
+#                             [--jobs N] [--jsonl out.jsonl] [--junit junit.xml]
+#
+# Exit code: 0 when every project passes, 1 when any project has issues,
+# 2 when no project directory matched.
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import validate_setup
+
+
+def expand_roots(patterns, from_file=None):
+    """Project directories matching `patterns` (globs or plain paths), deduplicated, in order."""
+    patterns = list(patterns)
+    if from_file:
+        f = sys.stdin if from_file == '-' else open(from_file, encoding='utf-8')
+        with f:
+            patterns += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    roots, seen = [], set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            key = os.path.realpath(path)
+            if os.path.isdir(path) and key not in seen:
+                seen.add(key)
+                roots.append(path)
+    return roots
+
+
+def validate_one(root, cache=True):
+    """Worker entry point: validate one project and return its report as a dict."""
+    try:
+        # Projects already run in parallel across processes; one thread each
+        # avoids oversubscribing the machine.
+        report = validate_setup.validate(root, jobs=1, cache=cache)
+        return validate_setup.report_to_dict(report)
+    except Exception as e:
+        return {
+            'project': root, 'ok': False, 'errors': 1, 'exit_code': 1,
+            'duration_ms': 0.0, 'checks': [],
+            'crash': '%s: %s' % (type(e).__name__, e),
+        }
+
+
+def run_fleet(roots, jobs=None, cache=True):
+    """Yield one report dict per project, in completion order."""
+    if jobs == 1 or len(roots) <= 1:
+        for root in roots:
+            yield validate_one(root, cache)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(validate_one, root, cache) for root in roots]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def junit_xml(reports, wall):
+    """JUnit XML document: one <testsuite> per project, one <testcase> per check."""
+    suites = ET.Element('testsuites', name='validate-setup')
+    total_tests = total_failures = total_errors = 0
+    for report in sorted(reports, key=lambda r: r['project']):
+        suite = ET.SubElement(suites, 'testsuite', name=report['project'])
+        tests = failures = errors = 0
+        if 'crash' in report:
+            case = ET.SubElement(suite, 'testcase', classname=report['project'], name='validator')
+            ET.SubElement(case, 'error', message=report['crash'])
+            tests, errors = 1, 1
+        for check in report['checks']:
+            tests += 1
+            case = ET.SubElement(
+                suite, 'testcase', classname=report['project'], name=check['name'],
+                time='%.6f' % ((check['duration_ms'] or 0.0) / 1000),
+            )
+            failed = [r['message'] for r in check['results'] if r['status'] == validate_setup.FAIL]
+            warned = [r['message'] for r in check['results'] if r['status'] == validate_setup.WARN]
+            if failed:
+                failures += 1
+                ET.SubElement(case, 'failure', message=failed[0]).text = '\n'.join(failed)
+            if warned:
+                ET.SubElement(case, 'system-out').text = '\n'.join(warned)
+        suite.set('tests', str(tests))
+        suite.set('failures', str(failures))
+        suite.set('errors', str(errors))
+        suite.set('time', '%.6f' % (report['duration_ms'] / 1000))
+        total_tests += tests
+        total_failures += failures
+        total_errors += errors
+    suites.set('tests', str(total_tests))
+    suites.set('failures', str(total_failures))
+    suites.set('errors', str(total_errors))
+    suites.set('time', '%.6f' % wall)
+    ET.indent(suites)
+    return ET.tostring(suites, encoding='unicode', xml_declaration=True)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Validate many WordPress-on-Render projects.')
+    parser.add_argument('roots', nargs='*', help='project directories or glob patterns')
+    parser.add_argument('--from-file', metavar='FILE',
+                        help="read more roots/globs from FILE, one per line ('-' for stdin)")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--jsonl', metavar='FILE', default='-',
+                        help="write JSON Lines results here (default: '-' for stdout)")
+    parser.add_argument('--junit', metavar='FILE', help='also write a JUnit XML summary')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='ignore and do not update each project\'s result cache')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    roots = expand_roots(args.roots, args.from_file)
+    if not roots:
+        print('❌ No project directories matched', file=sys.stderr)
+        return 2
+
+    out = sys.stdout if args.jsonl == '-' else open(args.jsonl, 'w', encoding='utf-8')
+    start = time.perf_counter()
+    reports = []
+    try:
+        for report in run_fleet(roots, args.jobs, args.cache):
+            reports.append(report)
+            out.write(json.dumps(report, ensure_ascii=False) + '\n')
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    wall = time.perf_counter() - start
+
+    if args.junit:
+        with open(args.junit, 'w', encoding='utf-8') as f:
+            f.write(junit_xml(reports, wall) + '\n')
+
+    failed = [r['project'] for r in reports if not r['ok']]
+    print('%s %d/%d projects passed in %.2fs' % (
+        '✅' if not failed else '❌', len(reports) - len(failed), len(reports), wall,
+    ), file=sys.stderr)
+    for project in sorted(failed):
+        print('❌ %s' % project, file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,895 @@
+#!/usr/bin/env python3
+# In-process version of validate-setup.sh
+#
+# Every project file is read (and YAML-parsed) at most once and the parsed
+# documents are shared by all checks, and git state is read from .git
+# directly (see git_inspect.py), so a run normally spawns no processes at
+# all. Output and exit codes match validate-setup.sh:
+# 0 when every check passes, 1 when at least one check fails.
+#
+# Independent checks run concurrently on a thread pool; a check only starts
+# once the checks it declares in `deps` have finished.
+#
+# Results of checks whose input files are unchanged since the last run are
+# served from .validate-cache/ (see validate_cache.py); --no-cache skips it.
+#
+# --watch keeps running and re-validates whenever a project file changes,
+# re-running only the checks that read that file (see validate_watch.py).
+#
+# Usage:
+#   python3 validate_setup.py [PROJECT_DIR] [--jobs N] [--timings] [--no-cache]
+#   python3 validate_setup.py [PROJECT_DIR] --watch [--poll]
+
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import build_context
+import dockerfile_analyzer
+import git_inspect
+import php_tuning
+import render_schema
+from validate_cache import ResultCache
+
+try:
+    import yaml
+except ImportError:  # reported as a syntax failure, like `python3 -c "import yaml"`
+    yaml = None
+
+# Part of every cache key: bump whenever a check's behavior changes
+VERSION = '1.10'
+
+REQUIRED_FILES = (
+    'Dockerfile',
+    'render.yaml',
+    '.github/workflows/deploy.yml',
+    '.gitignore',
+    'README.md',
+)
+
+DOCKERFILE = 'Dockerfile'
+RENDER_YAML = 'render.yaml'
+WORKFLOW = '.github/workflows/deploy.yml'
+
+PASS = 'pass'
+FAIL = 'fail'
+WARN = 'warn'
+
+# Color codes (only used when writing to a terminal)
+GREEN = '\033[0;32m'
+RED = '\033[0;31m'
+YELLOW = '\033[1;33m'
+NC = '\033[0m'
+
+ICONS = {PASS: '✅', FAIL: '❌', WARN: '⚠️'}
+COLORS = {PASS: GREEN, FAIL: RED, WARN: YELLOW}
+
+RULE = '=========================================='
+
+
+class Result:
+    __slots__ = ('status', 'message')
+
+    def __init__(self, status, message):
+        self.status = status
+        self.message = message
+
+    def __repr__(self):
+        return 'Result(%r, %r)' % (self.status, self.message)
+
+
+def ok(message):
+    return Result(PASS, message)
+
+
+def fail(message):
+    return Result(FAIL, message)
+
+
+def warn(message):
+    return Result(WARN, message)
+
+
+class Project:
+    """One project directory; file contents and parsed YAML are memoized.
+
+    Safe to share between the scheduler's worker threads: each file is still
+    read and parsed exactly once, concurrent callers wait for the first one.
+    """
+
+    def __init__(self, root='.', options=None):
+        self.root = root
+        # per-run settings for checks, e.g. {'context_budget': bytes}
+        self.options = dict(options or {})
+        self._memo = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _once(self, key, compute):
+        with self._guard:
+            if key in self._memo:
+                return self._memo[key]
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+        return self._memo[key]
+
+    def invalidate(self, rel):
+        """Forget everything memoized about `rel` (it changed on disk)."""
+        with self._guard:
+            for kind in ('exists', 'text', 'yaml'):
+                self._memo.pop((kind, rel), None)
+            # any file can be part of the build context
+            self._memo.pop(('context',), None)
+
+    def path(self, rel):
+        return os.path.join(self.root, rel)
+
+    def exists(self, rel):
+        return self._once(('exists', rel), lambda: os.path.isfile(self.path(rel)))
+
+    def text(self, rel):
+        """File contents, or None if the file cannot be read."""
+        def read():
+            try:
+                with open(self.path(rel), encoding='utf-8') as f:
+                    return f.read()
+            except (OSError, UnicodeDecodeError):
+                return None
+        return self._once(('text', rel), read)
+
+    def context(self):
+        """build_context scan of the project, shared by the checks that measure it."""
+        budget = self.options.get('context_budget', build_context.DEFAULT_BUDGET)
+        return self._once(('context',), lambda: build_context.scan(self.root, budget=budget, top=3))
+
+    def yaml(self, rel):
+        """(document, error) for a YAML file; error is None when it parsed."""
+        def parse():
+            text = self.text(rel)
+            if text is None:
+                return None, 'cannot read %s' % rel
+            if yaml is None:
+                return None, 'PyYAML is not installed'
+            try:
+                return yaml.safe_load(text), None
+            except yaml.YAMLError as e:
+                return None, str(e)
+        return self._once(('yaml', rel), parse)
+
+
+# Check 1: Required files exist
+def check_required_files(project):
+    results = []
+    for rel in REQUIRED_FILES:
+        if project.exists(rel):
+            results.append(ok('%s exists' % rel))
+        else:
+            results.append(fail('%s MISSING' % rel))
+    return results
+
+
+# Check 2: Validate Dockerfile
+def check_dockerfile(project):
+    text = project.text(DOCKERFILE) or ''
+    for line in text.splitlines():
+        words = line.split()
+        if len(words) >= 2 and words[0].upper() == 'FROM' and words[1].startswith('wordpress'):
+            return [ok('Dockerfile uses WordPress base image')]
+    return [fail('Dockerfile missing WordPress base image')]
+
+
+# Check 2b: Dockerfile build performance (layers, cache order, amplification)
+def check_dockerfile_build(project):
+    text = project.text(DOCKERFILE)
+    if text is None:
+        return [fail('Dockerfile build analysis skipped (file missing)')]
+    analysis = dockerfile_analyzer.analyze(text, source_size=project.context().size_of)
+    results = [
+        (fail if f.level == dockerfile_analyzer.ERROR else warn)(str(f))
+        for f in analysis.findings
+    ]
+    if analysis.passed:
+        results.insert(0, ok('Dockerfile build analysis passed (%d layers, %.1f× size amplification%s)'
+                             % (analysis.layers, analysis.amplification,
+                                '' if analysis.measured else ', estimated')))
+    return results
+
+
+# Check 2c: Docker build context size
+# What --watch re-measures the build context on: the ignore files, the
+# Dockerfile and the trees the Dockerfiles COPY (the size reported for the
+# rest of the project is refreshed by the next full run)
+BUILD_CONTEXT_WATCH = (DOCKERFILE, '.dockerignore', '.gitignore', 'wp-content/', 'config/')
+
+
+def check_build_context(project):
+    budget = project.options.get('context_budget', build_context.DEFAULT_BUDGET)
+    report = project.context()
+    summary = '%s in %d files' % (build_context.format_size(report.total), report.files)
+    if not report.over_budget:
+        return [ok('Build context is %s (budget %s)' % (summary, build_context.format_size(budget)))]
+    results = [fail('Build context is %s, over the %s budget' % (summary, build_context.format_size(budget)))]
+    for size, rel in report.top_dirs:
+        results.append(warn('%s/ adds %s (exclude it in .dockerignore?)' % (rel, build_context.format_size(size))))
+    return results
+
+
+def render_services(project):
+    """The `services` list from render.yaml, or [] if there is none."""
+    doc, error = project.yaml(RENDER_YAML)
+    if error is None and isinstance(doc, dict) and isinstance(doc.get('services'), list):
+        return [s for s in doc['services'] if isinstance(s, dict)]
+    return []
+
+
+# Check 3: Validate render.yaml
+def check_render_yaml(project):
+    results = []
+    doc, error = project.yaml(RENDER_YAML)
+    if error is None:
+        results.append(ok('render.yaml syntax is valid'))
+    else:
+        results.append(fail('render.yaml has syntax errors'))
+
+    services = render_services(project)
+    if any(s.get('type') == 'web' for s in services):
+        results.append(ok('render.yaml contains web service'))
+    else:
+        results.append(fail('render.yaml missing web service configuration'))
+
+    if any(s.get('type') == 'pserv' or s.get('runtime') == 'mysql' for s in services):
+        results.append(ok('render.yaml contains database service'))
+    else:
+        results.append(fail('render.yaml missing database service'))
+    return results
+
+
+# Check 3b: render.yaml structure, cross-references and topology
+def check_render_schema(project):
+    doc, error = project.yaml(RENDER_YAML)
+    if error is not None:
+        return [fail('render.yaml structure not checked (file missing or invalid YAML)')]
+    problems = render_schema.validate(doc)
+    results = [
+        (fail if p.level == render_schema.ERROR else warn)('render.yaml %s' % p)
+        for p in problems
+    ]
+    if not any(p.level == render_schema.ERROR for p in problems):
+        results.insert(0, ok('render.yaml matches the Blueprint schema'))
+    return results
+
+
+def workflow_push_branches(doc):
+    """Branches a workflow's push trigger is limited to.
+
+    None if there is no push trigger; [] if it fires for every branch.
+    """
+    if not isinstance(doc, dict):
+        return None
+    # YAML 1.1 reads a bare `on:` key as boolean True
+    on = doc.get('on', doc.get(True))
+    if isinstance(on, str):
+        on = [on]
+    if isinstance(on, list):
+        return [] if 'push' in on else None
+    if not isinstance(on, dict) or 'push' not in on:
+        return None
+    push = on['push'] or {}
+    branches = push.get('branches') if isinstance(push, dict) else None
+    if isinstance(branches, str):
+        branches = [branches]
+    return list(branches or [])
+
+
+# Check 4: Validate GitHub workflow
+def check_workflow(project):
+    if not project.exists(WORKFLOW):
+        return [fail('GitHub workflow file missing')]
+
+    results = []
+    doc, error = project.yaml(WORKFLOW)
+    if error is None:
+        results.append(ok('GitHub workflow syntax is valid'))
+    else:
+        results.append(fail('GitHub workflow has syntax errors'))
+
+    branches = workflow_push_branches(doc)
+    if branches is not None and (not branches or 'main' in branches):
+        results.append(ok('Workflow triggers on main branch push'))
+    else:
+        results.append(fail('Workflow trigger not configured correctly'))
+    return results
+
+
+def workflow_steps(doc):
+    """Every step of every job in a workflow, in order."""
+    jobs = doc.get('jobs') if isinstance(doc, dict) else None
+    for job in (jobs.values() if isinstance(jobs, dict) else ()):
+        for step in (job.get('steps') or () if isinstance(job, dict) else ()):
+            if isinstance(step, dict):
+                yield step
+
+
+def _expand_env(text, env):
+    return re.sub(r'\$\{\{\s*env\.(\w+)\s*\}\}', lambda m: str(env.get(m.group(1), m.group(0))), text)
+
+
+def workflow_images(doc):
+    """Image references a workflow pushes, with ${{ env.X }} expanded."""
+    env = dict(doc.get('env') or {}) if isinstance(doc, dict) else {}
+    pushed = []
+    for step in workflow_steps(doc):
+        env_here = dict(env, **(step.get('env') or {}))
+        args = step.get('with') if isinstance(step.get('with'), dict) else {}
+        if str(step.get('uses', '')).startswith('docker/build-push-action') and args.get('push') in (True, 'true'):
+            tags = re.split(r'[\n,]', _expand_env(str(args.get('tags') or ''), env_here))
+            pushed += [t.strip() for t in tags if t.strip()]
+        for match in re.finditer(r'\bdocker\s+push\s+(\S+)', str(step.get('run') or '')):
+            pushed.append(_expand_env(match.group(1), env_here))
+    return pushed
+
+
+def image_repository(ref):
+    """`ref` without its :tag or @digest."""
+    ref = ref.split('@', 1)[0]
+    head, _, tail = ref.rpartition('/')
+    return '%s/%s' % (head, tail.split(':', 1)[0]) if head else tail.split(':', 1)[0]
+
+
+def deploy_branches(project):
+    """Branches render.yaml services deploy from (`branch:`), in file order."""
+    branches = []
+    for service in render_services(project):
+        branch = service.get('branch')
+        if isinstance(branch, str) and branch not in branches:
+            branches.append(branch)
+    return branches
+
+
+# Check 4b: prebuilt image deploys (render.yaml runtime: image) match the workflow
+def check_prebuilt_image(project):
+    services = [s for s in render_services(project)
+                if s.get('type') == 'web' and s.get('runtime') == 'image']
+    doc, error = project.yaml(WORKFLOW)
+    doc = doc if error is None and isinstance(doc, dict) else {}
+    pushed = workflow_images(doc)
+    if not services:
+        if pushed:
+            return [warn('Workflow pushes %s but render.yaml builds from the Dockerfile; the image is unused'
+                         % image_repository(pushed[0]))]
+        return [ok('Render builds the image from the Dockerfile (no prebuilt image)')]
+
+    results = []
+    repos = {image_repository(ref) for ref in pushed}
+    steps = list(workflow_steps(doc))
+    for service in services:
+        url = str((service.get('image') or {}).get('url') or '')
+        repo = image_repository(url)
+        if not url:
+            continue  # reported by the render.yaml structure check
+        if repo != repo.lower():
+            results.append(fail('%s: image %s must be lowercase' % (service.get('name'), url)))
+        if repo in repos:
+            results.append(ok('Workflow builds and pushes %s, which %s deploys' % (repo, service.get('name'))))
+        else:
+            results.append(fail('%s deploys %s, but the workflow never pushes it' % (service.get('name'), repo)))
+    if pushed and not any('github.sha' in ref for ref in pushed):
+        results.append(warn('Pushed image is not tagged by commit (${{ github.sha }}); deploys cannot pin a build'))
+    # either curl with imgURL or deploy_client.py --image
+    if not any(re.search(r'imgURL|--image\b', str(step.get('run') or '')) for step in steps):
+        results.append(warn('Deploy hook call does not pass imgURL; Render redeploys the tag in render.yaml'))
+    if pushed and not any((step.get('with') or {}).get('cache-from') for step in steps
+                          if isinstance(step.get('with'), dict)):
+        results.append(warn('Image build has no cache-from; every CI build starts without cached layers'))
+    return results
+
+
+def _copied_sources(dockerfile):
+    """Build-context paths the Dockerfile COPYs, normalized (no leading ./)."""
+    sources = set()
+    for ins in dockerfile_analyzer.parse(dockerfile or ''):
+        if ins.keyword in ('COPY', 'ADD') and 'from' not in ins.flags:
+            sources.update(os.path.normpath(w) for w in ins.words()[:-1])
+    return sources
+
+
+# Check 4c: PHP/Apache tuning fits the render.yaml plan
+def check_php_tuning(project):
+    web = [s for s in render_services(project) if s.get('type') == 'web']
+    if not web:
+        return [warn('No web service in render.yaml; PHP tuning not checked')]
+    # Render's default instance type when a Blueprint sets none
+    plan = str(web[0].get('plan') or 'starter')
+    if plan not in php_tuning.PLAN_MEMORY_MB:
+        return []  # reported by the render.yaml structure check
+    memory = php_tuning.PLAN_MEMORY_MB[plan]
+    copied = _copied_sources(project.text(DOCKERFILE))
+
+    results = []
+    ini, mpm = {}, {}
+    for rel in (php_tuning.PHP_INI, php_tuning.MPM_CONF):
+        if rel not in copied:
+            continue
+        text = project.text(rel)
+        if text is None:
+            results.append(fail('Dockerfile copies %s, which is missing' % rel))
+        elif rel == php_tuning.PHP_INI:
+            ini = php_tuning.parse_ini(text)
+        else:
+            mpm = php_tuning.parse_mpm(text)
+
+    used, workers = php_tuning.footprint(ini, mpm)
+    if not mpm:
+        results.append(warn('Apache runs its stock prefork settings (%d PHP workers, ~%d MB at full load) on '
+                            'the %s plan\'s %d MB; scaffold.py --dockerfile optimized sizes them to the plan'
+                            % (workers, used, plan, memory)))
+    elif used > memory:
+        results.append(fail('%s: %d workers and OPcache need ~%d MB at full load, the %s plan has %d MB'
+                            % (php_tuning.MPM_CONF, workers, used, plan, memory)))
+    else:
+        results.append(ok('%d Apache workers and OPcache fit the %s plan (~%d of %d MB at full load)'
+                          % (workers, plan, used, memory)))
+        sized = php_tuning.Tuning(plan).workers
+        if workers < sized // 2:
+            results.append(warn('%s allows %d workers where the %s plan fits %d; regenerate it for this plan'
+                                % (php_tuning.MPM_CONF, workers, plan, sized)))
+    if mpm.get('ServerLimit', php_tuning.MAX_WORKERS) < workers:
+        results.append(fail('%s: ServerLimit %d caps MaxRequestWorkers %d'
+                            % (php_tuning.MPM_CONF, mpm['ServerLimit'], workers)))
+
+    if ini:
+        jit = ini.get('opcache.jit', 'disable').lower() not in ('disable', 'off', '0')
+        if jit and memory < 2048:
+            results.append(warn('%s turns the JIT on; on the %s plan its buffer takes memory from PHP workers'
+                                % (php_tuning.PHP_INI, plan)))
+        if ini.get('opcache.validate_timestamps', '1').lower() in ('0', 'off', 'false'):
+            results.append(warn('%s disables opcache.validate_timestamps; updates made from wp-admin on the '
+                                'persistent disk would not be picked up' % php_tuning.PHP_INI))
+    return results
+
+
+# Key Value eviction policies that refuse writes when full, or evict only keys with a TTL
+NO_EVICTION = 'noeviction'
+VOLATILE = 'volatile-'
+CACHE_ENV = ('WP_REDIS_HOST', 'WP_REDIS_PORT')
+CACHE_PROPERTIES = {'WP_REDIS_HOST': 'host', 'WP_REDIS_PORT': 'port'}
+
+
+def _env_vars(service):
+    """{key: envVars entry} of a render.yaml service."""
+    return {str(e.get('key')): e for e in service.get('envVars') or () if isinstance(e, dict)}
+
+
+# Check 4d: the Key Value object cache and the WordPress config that uses it agree
+def check_object_cache(project):
+    services = render_services(project)
+    web = [s for s in services if s.get('type') == 'web']
+    caches = {s.get('name'): s for s in services if s.get('type') in ('keyvalue', 'redis')}
+    results = []
+    ttl_capped = False
+    for service in web:
+        start = len(results)
+        env = _env_vars(service)
+        extra = str((env.get('WORDPRESS_CONFIG_EXTRA') or {}).get('value') or '')
+        ttl_capped = ttl_capped or 'WP_REDIS_MAXTTL' in extra
+        configured = 'WP_REDIS_' in extra
+        refs = {}
+        for key in CACHE_ENV:
+            source = (env.get(key) or {}).get('fromService') or {}
+            if source.get('name') in caches:
+                refs[key] = source
+        if not caches:
+            if configured:
+                results.append(fail('%s: WORDPRESS_CONFIG_EXTRA sets WP_REDIS_* but render.yaml has no Key Value '
+                                    'service' % service.get('name')))
+            continue
+        if not refs and not configured:
+            results.append(warn('%s does not use the Key Value service; it runs without a persistent object cache'
+                                % service.get('name')))
+            continue
+        for key in CACHE_ENV:
+            source = refs.get(key)
+            if source is None:
+                results.append(fail('%s: %s does not come from the Key Value service (fromService)'
+                                    % (service.get('name'), key)))
+            elif source.get('property') != CACHE_PROPERTIES[key]:
+                results.append(fail('%s: %s reads the Key Value service\'s %r, expected %r'
+                                    % (service.get('name'), key, source.get('property'), CACHE_PROPERTIES[key])))
+        if "getenv('WP_REDIS_HOST')" not in extra:
+            results.append(fail("%s: WORDPRESS_CONFIG_EXTRA does not define WP_REDIS_HOST from "
+                                "getenv('WP_REDIS_HOST'); the object cache falls back to 127.0.0.1"
+                                % service.get('name')))
+        elif 'WP_REDIS_PREFIX' not in extra:
+            results.append(warn('%s: no WP_REDIS_PREFIX; sites sharing the Key Value service overwrite each '
+                                "other's keys" % service.get('name')))
+        for name in sorted({s.get('name') for s in refs.values()}):
+            cache = caches[name]
+            if cache.get('region') != service.get('region'):
+                results.append(warn('%s is in %s, %s in %s; every cache lookup crosses regions'
+                                    % (cache.get('name'), cache.get('region'), service.get('name'),
+                                       service.get('region'))))
+        if not any(r.status == FAIL for r in results[start:]):
+            names = sorted({s.get('name') for s in refs.values()})
+            results.append(ok('%s uses %s as its persistent object cache' % (service.get('name'), ', '.join(names))))
+
+    for cache in caches.values():
+        policy = str(cache.get('maxmemoryPolicy') or 'allkeys-lru')
+        if policy == NO_EVICTION:
+            results.append(warn('%s: maxmemoryPolicy noeviction; once full, cache writes fail instead of evicting, '
+                                'including the last_changed bumps that retire cached queries' % cache.get('name')))
+        elif policy.startswith(VOLATILE) and not ttl_capped:
+            results.append(warn('%s: maxmemoryPolicy %s only evicts keys with a TTL; without WP_REDIS_MAXTTL '
+                                'WordPress stores most without one' % (cache.get('name'), policy)))
+        if cache.get('ipAllowList'):
+            results.append(warn('%s accepts connections from outside Render (ipAllowList); WordPress only '
+                                'needs the internal address' % cache.get('name')))
+    if not caches and not results:
+        results.append(ok('No object cache configured (WordPress caches objects per request only)'))
+    return results
+
+
+# Check 5: Git setup
+# HEAD names the branch, config the remotes; render.yaml the deploy branch.
+# `.git` itself is watched for being created, or replaced by a worktree's file.
+GIT_WATCH = ('.git', '.git/HEAD', '.git/config', RENDER_YAML)
+
+
+def check_git(project):
+    repo = git_inspect.inspect(project.root)
+    if repo is None:
+        return [warn('Not in a Git repository (clone from GitHub first)')]
+
+    results = [ok('Git repository initialized')]
+    if 'origin' in repo.remotes:
+        results.append(ok("Git remote 'origin' configured"))
+    else:
+        results.append(warn("Git remote 'origin' not configured yet (you'll set this up next)"))
+
+    branches = deploy_branches(project)
+    if branches:
+        wanted = ' or '.join("'%s'" % b for b in branches)
+        if repo.branch is None:
+            results.append(warn('HEAD is detached; render.yaml deploys from %s' % wanted))
+        elif repo.branch in branches:
+            results.append(ok("Current branch '%s' is the branch render.yaml deploys from" % repo.branch))
+        else:
+            results.append(warn("Current branch '%s' is not %s, the branch render.yaml deploys from"
+                                % (repo.branch, wanted)))
+    return results
+
+
+class Check:
+    # `inputs` lists every file the check reads; None means the check depends
+    # on state outside those files (e.g. git) and is never cached. `watch`
+    # lists what --watch must watch for it when that differs from `inputs`;
+    # entries ending in '/' are whole directory trees ('./' the project). A
+    # check with neither re-runs on every change.
+    __slots__ = ('name', 'heading', 'func', 'deps', 'inputs', 'watch')
+
+    def __init__(self, name, heading, func, deps=(), inputs=None, watch=None):
+        self.name = name
+        self.heading = heading
+        self.func = func
+        self.deps = tuple(deps)
+        self.inputs = None if inputs is None else tuple(inputs)
+        self.watch = tuple(watch) if watch is not None else (self.inputs or ())
+
+
+# In the order validate-setup.sh prints them. `deps` only orders execution:
+# the workflow check looks at the file's existence, which the required-files
+# check has already established (and memoized) by the time it runs.
+CHECKS = [
+    Check('files', '📋 Checking required files...', check_required_files,
+          inputs=REQUIRED_FILES),
+    Check('dockerfile', '🐳 Validating Dockerfile...', check_dockerfile,
+          inputs=(DOCKERFILE,)),
+    # measures COPY sources in the build context, so it is not cached
+    Check('dockerfile-build', '🏗️  Analyzing Dockerfile build performance...', check_dockerfile_build,
+          watch=BUILD_CONTEXT_WATCH),
+    Check('build-context', '📦 Measuring Docker build context...', check_build_context,
+          watch=BUILD_CONTEXT_WATCH),
+    Check('render', '🎯 Validating render.yaml...', check_render_yaml,
+          inputs=(RENDER_YAML,)),
+    Check('render-schema', '🧩 Checking render.yaml structure...', check_render_schema,
+          inputs=(RENDER_YAML,)),
+    Check('workflow', '🔄 Validating GitHub workflow...', check_workflow,
+          deps=('files',), inputs=(WORKFLOW,)),
+    Check('prebuilt-image', '🚢 Checking prebuilt image deploy...', check_prebuilt_image,
+          deps=('files',), inputs=(RENDER_YAML, WORKFLOW)),
+    Check('php-tuning', '🐘 Checking PHP tuning for the Render plan...', check_php_tuning,
+          inputs=(RENDER_YAML, DOCKERFILE, php_tuning.PHP_INI, php_tuning.MPM_CONF)),
+    Check('object-cache', '🧠 Checking the object cache...', check_object_cache,
+          inputs=(RENDER_YAML,)),
+    Check('git', '📤 Checking Git configuration...', check_git, watch=GIT_WATCH),
+]
+
+
+def check_graph(checks):
+    """Raise ValueError unless `checks` forms a DAG with unique, known names."""
+    by_name = {}
+    for check in checks:
+        if check.name in by_name:
+            raise ValueError('duplicate check %r' % check.name)
+        by_name[check.name] = check
+    for check in checks:
+        for dep in check.deps:
+            if dep not in by_name:
+                raise ValueError('check %r depends on unknown check %r' % (check.name, dep))
+
+    state = {}
+
+    def visit(name, stack):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'active':
+            raise ValueError('dependency cycle: %s' % ' -> '.join(stack + [name]))
+        state[name] = 'active'
+        for dep in by_name[name].deps:
+            visit(dep, stack + [name])
+        state[name] = 'done'
+
+    for check in checks:
+        visit(check.name, [])
+    return by_name
+
+
+class Timing:
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    @property
+    def elapsed(self):
+        return self.end - self.start
+
+
+def _timed(check, project):
+    start = time.perf_counter()
+    try:
+        results = check.func(project)
+    except Exception as e:  # a crashing check is a failed check, not a crashed run
+        results = [fail('%s check crashed: %s' % (check.name, e))]
+    return results, Timing(start, time.perf_counter())
+
+
+def run_checks(project, checks=None, jobs=None, done=None, on_result=None):
+    """Run `checks` on a thread pool, respecting `deps`.
+
+    `done` maps check names to results obtained elsewhere (the cache); those
+    checks are not run and count as finished from the start. `on_result` is
+    called as on_result(name, results, timing) from the calling thread as
+    soon as each check that actually ran finishes.
+
+    Returns ({name: [Result, ...]}, {name: Timing}).
+    """
+    checks = CHECKS if checks is None else checks
+    by_name = check_graph(checks)
+    results, timings = {}, {}
+    now = time.perf_counter()
+    for name, cached in (done or {}).items():
+        results[name], timings[name] = cached, Timing(now, now)
+    waiting = {c.name: set(c.deps) - set(results) for c in checks if c.name not in results}
+    if not waiting:
+        return results, timings
+
+    with ThreadPoolExecutor(max_workers=jobs or min(len(checks), 8) or 1) as pool:
+        running = {}
+
+        def submit_ready():
+            for name in [n for n, deps in waiting.items() if not deps]:
+                del waiting[name]
+                running[pool.submit(_timed, by_name[name], project)] = name
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
+                if on_result is not None:
+                    on_result(name, results[name], timings[name])
+                for deps in waiting.values():
+                    deps.discard(name)
+            submit_ready()
+    return results, timings
+
+
+def critical_path(checks, timings):
+    """(names, seconds) of the dependency chain with the largest summed cost."""
+    by_name = {c.name: c for c in checks}
+    best = {}
+
+    def cost(name):
+        if name not in best:
+            chains = [cost(dep) for dep in by_name[name].deps]
+            path, total = max(chains, key=lambda c: c[1], default=([], 0.0))
+            best[name] = (path + [name], total + timings[name].elapsed)
+        return best[name]
+
+    return max((cost(c.name) for c in checks), key=lambda c: c[1], default=([], 0.0))
+
+
+class Report:
+    def __init__(self, root, groups, timings=None, wall=None, checks=None, cached=()):
+        self.root = root
+        # [(name, heading, [Result, ...]), ...] in CHECKS order
+        self.groups = groups
+        # {name: Timing}, plus total wall-clock seconds for the whole run
+        self.timings = timings or {}
+        self.wall = wall
+        self.checks = checks if checks is not None else CHECKS
+        # names of the checks served from the result cache
+        self.cached = frozenset(cached)
+
+    @property
+    def results(self):
+        return [r for _, _, results in self.groups for r in results]
+
+    @property
+    def errors(self):
+        return sum(1 for r in self.results if r.status == FAIL)
+
+    @property
+    def exit_code(self):
+        return 0 if self.errors == 0 else 1
+
+
+def validate(root='.', project=None, checks=None, jobs=None, cache=None, options=None):
+    """Run every check against `root` and return a Report.
+
+    Pass `cache=True` (or a ResultCache) to reuse results of checks whose
+    input files have not changed since they were last stored. `options` are
+    handed to the checks through Project.options.
+    """
+    project = project or Project(root, options)
+    checks = CHECKS if checks is None else checks
+    if cache is True:
+        cache = ResultCache(project.root, VERSION)
+    start = time.perf_counter()
+
+    keys, done = {}, {}
+    if cache:
+        for check in checks:
+            if check.inputs is None:
+                continue
+            keys[check.name] = key = cache.key(check.name, check.inputs)
+            hit = cache.get(key)
+            if hit is not None:
+                done[check.name] = [Result(status, message) for status, message in hit]
+
+    results, timings = run_checks(project, checks, jobs, done)
+    if cache:
+        for name, key in keys.items():
+            if name not in done:
+                cache.put(key, [[r.status, r.message] for r in results[name]])
+        cache.save()
+    wall = time.perf_counter() - start
+    groups = [(c.name, c.heading, results[c.name]) for c in checks]
+    return Report(project.root, groups, timings, wall, checks, cached=done)
+
+
+def report_to_dict(report):
+    """JSON-serializable form of a Report (used by the fleet and watch modes)."""
+    return {
+        'project': report.root,
+        'ok': report.errors == 0,
+        'errors': report.errors,
+        'exit_code': report.exit_code,
+        'duration_ms': round((report.wall or 0.0) * 1000, 3),
+        'checks': [
+            {
+                'name': name,
+                'cached': name in report.cached,
+                'duration_ms': round(report.timings[name].elapsed * 1000, 3)
+                if name in report.timings else None,
+                'results': [{'status': r.status, 'message': r.message} for r in results],
+            }
+            for name, _, results in report.groups
+        ],
+    }
+
+
+def format_timings(report):
+    """Per-check wall-clock cost and the critical path, slowest first."""
+    def ms(seconds):
+        return '%8.2f ms' % (seconds * 1000)
+
+    timings = report.timings
+    width = max([len(name) for name in timings] + [len('critical path')])
+    lines = ['⏱️  Check timings (wall clock)']
+    for name in sorted(timings, key=lambda n: timings[n].elapsed, reverse=True):
+        note = '  (cached)' if name in report.cached else ''
+        lines.append('  %-*s %s%s' % (width, name, ms(timings[name].elapsed), note))
+    path, cost = critical_path(report.checks, timings)
+    serial = sum(t.elapsed for t in timings.values())
+    lines += [
+        '  %-*s %s' % (width, 'sum of checks', ms(serial)),
+        '  %-*s %s' % (width, 'total', ms(report.wall or 0.0)),
+        '  %-*s %s  (%s)' % (width, 'critical path', ms(cost), ' → '.join(path)),
+    ]
+    return '\n'.join(lines)
+
+
+def paint(status, text, color=False):
+    return COLORS[status] + text + NC if color else text
+
+
+def format_group(heading, results, color=False):
+    """One check's heading and result lines, as validate-setup.sh prints them."""
+    lines = [heading]
+    for r in results:
+        lines.append('%s %s' % (paint(r.status, ICONS[r.status], color), r.message))
+    return '\n'.join(lines)
+
+
+def format_report(report, color=False):
+    lines = [RULE, 'WordPress-Render-GitHub Demo Validator', RULE, '']
+    for _, heading, results in report.groups:
+        lines += [format_group(heading, results, color), '']
+
+    lines.append(RULE)
+    if report.errors == 0:
+        lines += [
+            paint(PASS, '✅ ALL CHECKS PASSED!', color),
+            '',
+            'Next steps:',
+            '1. git add .',
+            "2. git commit -m 'Initial WordPress-Render demo setup'",
+            '3. git push origin main',
+            '4. Deploy to Render using Blueprint',
+        ]
+    else:
+        lines += [
+            paint(FAIL, '❌ %d ISSUES FOUND' % report.errors, color),
+            'Fix the errors above and run this script again',
+        ]
+    return '\n'.join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Validate a WordPress-on-Render project.')
+    parser.add_argument('root', nargs='?', default='.', help='project directory (default: .)')
+    parser.add_argument('--color', choices=('auto', 'always', 'never'), default='auto')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker threads for independent checks (default: one per check, max 8)')
+    parser.add_argument('--timings', action='store_true',
+                        help='print per-check wall-clock cost and the critical path')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='ignore and do not update the result cache in .validate-cache/')
+    parser.add_argument('--context-budget', type=build_context.parse_size, default=None,
+                        metavar='SIZE', help='fail when the Docker build context exceeds SIZE (default: 50MB)')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and re-validate whenever a project file changes')
+    parser.add_argument('--poll', action='store_true',
+                        help='with --watch, poll file stats instead of using inotify')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    color = args.color == 'always' or (args.color == 'auto' and sys.stdout.isatty())
+    options = {}
+    if args.context_budget is not None:
+        options['context_budget'] = args.context_budget
+    if args.watch:
+        import validate_watch
+        return validate_watch.watch(args.root, jobs=args.jobs, color=color, poll=args.poll,
+                                    options=options)
+    report = validate(args.root, jobs=args.jobs, cache=args.cache, options=options)
+    print(format_report(report, color=color))
+    if args.timings:
+        print()
+        print(format_timings(report))
+    return report.exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
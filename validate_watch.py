@@ -0,0 +1,302 @@
+# Watch mode for validate_setup.py (`validate_setup.py --watch`)
+#
+# Runs the validator once, then waits for project files to change and
+# re-runs only the checks that read the changed file (and the checks that
+# depend on those), in the same process and against the same memoized
+# Project. A check can ask for whole directory trees to be watched (the
+# build context checks watch wp-content/), not just the files it reads, and
+# the git check watches .git/HEAD and .git/config. Uses inotify on Linux
+# (through ctypes, no extra dependency) and falls back to polling file
+# stats elsewhere. Bursts of events (editors often write, rename and chmod in
+# one save) are debounced into a single re-validation.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+import validate_setup
+from validate_cache import CACHE_DIR
+
+# Never watched as part of a tree: the git check watches the files in .git
+# it reads, and every run writes the result cache
+SKIP_DIRS = ('.git', CACHE_DIR)
+
+DEBOUNCE = 0.03
+POLL_INTERVAL = 0.05
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+              | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+
+_EVENT = struct.Struct('iIII')
+
+
+def watched_files(checks):
+    """Files and directory trees ('dir/') to watch for `checks`."""
+    files = set()
+    for check in checks:
+        files.update(check.watch)
+    return sorted(files)
+
+
+def _tree(entry):
+    """Path prefix a watched tree covers ('' for the project), or None for a file."""
+    if not entry.endswith('/'):
+        return None
+    return '' if entry == './' else entry
+
+
+def _skipped(rel):
+    return rel.split('/', 1)[0] in SKIP_DIRS
+
+
+def _covers(entry, rel):
+    tree = _tree(entry)
+    if tree is None:
+        return rel == entry
+    return rel.startswith(tree) and not _skipped(rel)
+
+
+def affected_checks(changed, checks):
+    """Names of the checks that must re-run after the files in `changed` changed."""
+    # A check that declares neither inputs nor watch scopes could read
+    # anything, so any change re-runs it.
+    names = {c.name for c in checks
+             if not c.watch or any(_covers(entry, rel) for entry in c.watch for rel in changed)}
+    while True:
+        dependents = {c.name for c in checks if c.name not in names and names.intersection(c.deps)}
+        if not dependents:
+            return names
+        names |= dependents
+
+
+def _walk(root, tree):
+    """(directories, files) under a watched tree, relative to `root`, skipping SKIP_DIRS."""
+    dirs, files = [], []
+    for dirpath, dirnames, filenames in os.walk(os.path.join(root, tree) if tree else root):
+        rel = os.path.relpath(dirpath, root).replace(os.sep, '/')
+        prefix = '' if rel == '.' else rel + '/'
+        dirnames[:] = [d for d in dirnames if not _skipped(prefix + d)]
+        dirs.append(prefix.rstrip('/'))
+        files.extend(prefix + name for name in filenames)
+    return dirs, files
+
+
+class PollWatcher:
+    """Portable fallback: compares (mtime, size) of every watched file."""
+
+    def __init__(self, root, files, interval=POLL_INTERVAL):
+        self.root = root
+        self.files = files
+        self.interval = interval
+        self._stats = self._snapshot()
+
+    def _stat(self, rel):
+        try:
+            st = os.stat(os.path.join(self.root, rel))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _snapshot(self):
+        stats = {}
+        for entry in self.files:
+            tree = _tree(entry)
+            for rel in [entry] if tree is None else _walk(self.root, tree)[1]:
+                stats[rel] = self._stat(rel)
+        return stats
+
+    def changes(self, timeout=None):
+        """Block until something changes (or `timeout`); return the set of changed files."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self._snapshot()
+            changed = {rel for rel in set(stats) | set(self._stats) if stats.get(rel) != self._stats.get(rel)}
+            self._stats = stats
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watches the directories holding the watched files with inotify(7).
+
+    Directories are watched rather than files so that editors which save by
+    writing a temp file and renaming it over the original are still seen.
+    """
+
+    def __init__(self, root, files):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.root = root
+        self.files = set(files)
+        self._dirs = {}
+        self._watch_dirs()
+
+    def _covered(self, rel):
+        return rel in self.files or any(_covers(entry, rel) for entry in self.files if entry.endswith('/'))
+
+    def _watch_dirs(self):
+        # Watch every existing ancestor so that missing directories
+        # (.github/workflows before it is created) are picked up later,
+        # and every directory of a watched tree.
+        wanted = {''}
+        for rel in self.files:
+            tree = _tree(rel)
+            if tree is not None:
+                wanted.update(_walk(self.root, tree)[0])
+                rel = tree.rstrip('/')
+            parent = os.path.dirname(rel) if tree is None else rel
+            while parent:
+                wanted.add(parent)
+                parent = os.path.dirname(parent)
+        watched = set(self._dirs.values())
+        for rel in wanted:
+            if rel in watched:
+                continue
+            path = os.path.join(self.root, rel) or '.'
+            if os.path.isdir(path):
+                wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+                if wd >= 0:
+                    self._dirs[wd] = rel
+
+    def _read(self):
+        changed = set()
+        rescan = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+                offset += length
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                rel = os.path.join(directory, name) if directory else name
+                if mask & IN_ISDIR:
+                    rescan = True
+                if self._covered(rel):
+                    changed.add(rel)
+                elif mask & IN_ISDIR and any(f.startswith(rel + '/') for f in self.files):
+                    # a whole directory appeared or vanished
+                    changed.update(f for f in self.files if f.startswith(rel + '/'))
+        if rescan:
+            self._watch_dirs()
+        return changed
+
+    def changes(self, timeout=None):
+        """Block until a watched file changes (or `timeout`); return the set of changed files."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+            changed = self._read()
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(root, files, poll=False):
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, files)
+        except (OSError, AttributeError):
+            pass
+    return PollWatcher(root, files)
+
+
+def debounced(watcher, delay=DEBOUNCE):
+    """Changed files from one burst of events: wait for a change, then until `delay` of quiet."""
+    changed = watcher.changes()
+    while True:
+        more = watcher.changes(timeout=delay)
+        if not more:
+            return changed
+        changed |= more
+
+
+def _summary(results, color):
+    errors = sum(1 for rs in results.values() for r in rs if r.status == validate_setup.FAIL)
+    if errors == 0:
+        return validate_setup.paint(validate_setup.PASS, '✅ ALL CHECKS PASSED!', color)
+    return validate_setup.paint(validate_setup.FAIL, '❌ %d ISSUES FOUND' % errors, color)
+
+
+def watch(root='.', jobs=None, color=False, poll=False, checks=None, out=None, options=None):
+    """Validate `root`, then re-validate on every change until interrupted.
+
+    Returns the exit code of the last validation.
+    """
+    out = out or sys.stdout
+    checks = validate_setup.CHECKS if checks is None else checks
+    project = validate_setup.Project(root, options)
+    headings = {c.name: c.heading for c in checks}
+
+    def emit(text):
+        out.write(text + '\n')
+        out.flush()
+
+    report = validate_setup.validate(root, project=project, checks=checks, jobs=jobs)
+    emit(validate_setup.format_report(report, color=color))
+    results = {name: rs for name, _, rs in report.groups}
+
+    watcher = make_watcher(root, watched_files(checks), poll=poll)
+    kind = 'polling' if isinstance(watcher, PollWatcher) else 'inotify'
+    emit('\n👀 Watching %s for changes (%s, Ctrl-C to stop)...' % (root, kind))
+    try:
+        while True:
+            changed = debounced(watcher)
+            names = affected_checks(changed, checks)
+            if not names:
+                continue
+            for rel in changed:
+                project.invalidate(rel)
+
+            start = time.perf_counter()
+            emit('\n🔁 %s changed' % ', '.join(sorted(changed)))
+
+            def show(name, rs, _timing):
+                emit(validate_setup.format_group(headings[name], rs, color))
+
+            done = {name: rs for name, rs in results.items() if name not in names}
+            results, _ = validate_setup.run_checks(project, checks, jobs, done, on_result=show)
+            elapsed = (time.perf_counter() - start) * 1000
+            emit('%s  (%d check%s in %.1f ms)' % (
+                _summary(results, color), len(names), '' if len(names) == 1 else 's', elapsed,
+            ))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    failed = any(r.status == validate_setup.FAIL for rs in results.values() for r in rs)
+    return 1 if failed else 0